@@ -2,24 +2,16 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 
+from simu_ecs.chauffe import chauffe_modulee
+from simu_ecs.echange import echange_serpentin
+from simu_ecs.profilage import Profileur
+
 # =========================================================
 # CONSTANTES
 # =========================================================
 cp = 4180        # J/kg/K
 rho = 1000       # kg/m3
 
-# =========================================================
-# ΔT LOGARITHMIQUE MOYEN STABLE
-# =========================================================
-def delta_T_lm_stable(ΔT1, ΔT2):
-    eps = 1e-6
-    ΔT1 = max(ΔT1, eps)
-    ΔT2 = max(ΔT2, eps)
-
-    if abs(ΔT1 - ΔT2) < 1e-3:
-        return ΔT1  # limite mathématique
-    return (ΔT1 - ΔT2) / np.log(ΔT1 / ΔT2)
-
 # =========================================================
 # INTERFACE
 # =========================================================
@@ -39,7 +31,10 @@ volume = st.sidebar.number_input("Volume ballon (L)", 200, 3000, 1000, 50)
 T_init = st.sidebar.number_input("Température initiale ballon (°C)", 5.0, 30.0, 10.0, 1.0)
 T_consigne = st.sidebar.number_input("Consigne ballon (°C)", 40.0, 65.0, 60.0, 1.0)
 
-dt = 10  # s
+st.sidebar.header("⏱️ Performance")
+mesurer = st.sidebar.checkbox("Mesurer les étapes", help="Chronomètres et compteurs, affichés en bas de page")
+avec_cprofile = st.sidebar.checkbox("Profil cProfile complet", disabled=not mesurer)
+prof = Profileur(actif=mesurer, cprofile=avec_cprofile)
 
 # =========================================================
 # CONVERSIONS
@@ -48,77 +43,40 @@ P_pac_max = P_pac_max_kw * 1000
 UA = U * A_serp
 masse_ballon = volume / 1000 * rho
 
-# Température départ PAC MAX (PAC ne suit pas indéfiniment le ballon)
-T_depart_max = T_consigne + delta_depart
-
-# =========================================================
-# INITIALISATION
-# =========================================================
-T_ballon = T_init
-temps = 0
-
-temps_list = []
-T_list = []
-P_list = []
-P_serp_list = []
+# Puissance maximale du serpentin : le départ suit le ballon, ΔTlm constant
+P_serp_max = echange_serpentin(T_consigne + delta_depart, delta_hyd, T_consigne, U, A_serp, dT2_min=1e-6).P_serpentin
 
 # =========================================================
 # SIMULATION
 # =========================================================
-while T_ballon < T_consigne:
-    # Température départ PAC plafonnée
-    T_depart = min(T_ballon + delta_depart, T_depart_max)
-    T_retour = T_depart - delta_hyd
-
-    # Puissance PAC disponible (inverter simplifié)
-    facteur_modulation = max(0.3, (T_consigne - T_ballon) / (T_consigne - T_init))
-    P_pac = P_pac_max * facteur_modulation
-
-    # Débit régulé par la PAC
-    m_dot = P_pac / (cp * delta_hyd)
-
-    # ΔTlm
-    ΔT1 = T_depart - T_ballon
-    ΔT2 = T_retour - T_ballon
-    ΔT_lm = delta_T_lm_stable(ΔT1, ΔT2)
-
-    # Limitation serpentin
-    P_serp_max = UA * ΔT_lm
-
-    # Puissance réellement échangée
-    P_echange = min(P_pac, P_serp_max)
-
-    # Évolution ballon
-    dT = P_echange * dt / (masse_ballon * cp)
-    T_ballon += dT
-
-    # Stockage
-    temps_list.append(temps / 60)
-    T_list.append(T_ballon)
-    P_list.append(P_echange)
-    P_serp_list.append(P_serp_max)
-
-    temps += dt
-    if temps > 8 * 3600:
-        break
+# Régimes exacts : serpentin limitant, modulation linéaire, plancher de modulation
+with prof.etape("chauffe"):
+    chauffe = chauffe_modulee(T_init, T_consigne, volume, UA, delta_depart, delta_hyd, P_pac_max)
+with prof.etape("courbe"):
+    t_courbe, T_courbe, _ = chauffe.courbe(200)
+prof.compter("regimes", len(chauffe.regimes))
 
 # =========================================================
 # GRAPHIQUE
 # =========================================================
-fig, ax = plt.subplots()
-ax.plot(temps_list, T_list, label="Température ballon")
-ax.set_xlabel("Temps (min)")
-ax.set_ylabel("Température (°C)")
-ax.set_title("Montée en température du ballon ECS")
-ax.grid(True)
-ax.legend()
-st.pyplot(fig)
+with prof.etape("graphique"):
+    fig, ax = plt.subplots()
+    ax.plot(t_courbe / 60, T_courbe, label="Température ballon")
+    for T_b, t_b, regime in chauffe.bascules:
+        ax.plot(t_b / 60, T_b, "o", color="grey")
+        ax.annotate(regime, (t_b / 60, T_b), textcoords="offset points", xytext=(5, -12), fontsize=8)
+    ax.set_xlabel("Temps (min)")
+    ax.set_ylabel("Température (°C)")
+    ax.set_title("Montée en température du ballon ECS")
+    ax.grid(True)
+    ax.legend()
+    st.pyplot(fig)
 
 # =========================================================
 # BILAN ÉNERGÉTIQUE
 # =========================================================
-temps_h = temps / 3600
-energie_kWh = np.trapz(P_list, dx=dt) / 3.6e6
+temps_h = chauffe.duree / 3600
+energie_kWh = chauffe.energie
 
 st.subheader("📊 Bilan énergétique")
 
@@ -130,9 +88,28 @@ st.write(f"🌀 UA serpentin : **{UA:.0f} W/K**")
 st.write(f"📐 Surface serpentin : **{A_serp:.2f} m²**")
 st.write(f"🌡️ Coefficient U : **{U:.0f} W/m²·K**")
 
-if min(P_serp_list) < P_pac_max:
+if not chauffe.atteinte:
+    st.warning(f"⚠️ Consigne non atteinte en 8 h : {chauffe.T_final:.1f} °C")
+
+if P_serp_max < P_pac_max:
     st.warning("⚠️ En fin de chauffe, la PAC est limitée par le serpentin")
 else:
     st.success("✅ Le serpentin n'est jamais limitant")
 
-st.write(f"💧 Débit primaire moyen : **{np.mean(P_list)/(cp*delta_hyd)*3600/rho:.2f} m³/h**")
+P_moyenne = energie_kWh * 3.6e6 / chauffe.duree if chauffe.duree > 0 else 0.0
+st.write(f"💧 Débit primaire moyen : **{P_moyenne/(cp*delta_hyd)*3600/rho:.2f} m³/h**")
+
+# =========================================================
+# PERFORMANCE
+# =========================================================
+if prof.actif:
+    prof.terminer()
+    with st.expander("⏱️ Performance"):
+        st.caption(f"Script complet : {prof.total:.3f} s")
+        st.dataframe(prof.vers_dataframe(), hide_index=True)
+        st.write(prof.compteurs)
+        e1, e2 = st.columns(2)
+        e1.download_button("Exporter (JSON)", prof.vers_json(), "performance.json", "application/json")
+        if prof.avec_cprofile:
+            e2.download_button("Exporter (pstats)", prof.octets_pstats(), "profil.pstats")
+            st.code(prof.resume_pstats())
@@ -4,19 +4,23 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import time
 
+from simu_ecs import (
+    Parametres,
+    cle_stable,
+    format_duration,
+    lire_tarifs,
+    optimiser,
+)
+from simu_ecs.cycles import analyser_cycles, libelles_classes
+from simu_ecs.interface import afficher_regime, cache_simulation, performances_pac, simulation_incrementale
+from simu_ecs.periodique import regime_periodique
+from simu_ecs.profilage import Profileur
+from simu_ecs.rendu import indices_affichage
+
 # Configuration
 st.set_page_config(page_title="Simulateur ECS Hybride", layout="wide")
 st.title("Simulateur ECS : PAC + Chaudière (Bilan Complet & Temps de chauffe)")
 
-# --- Constantes physiques ---
-RHO_WATER = 1000 
-CP_WATER = 4180  
-
-def format_duration(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    return f"{hours}h {minutes:02d}min"
-
 # --- Barre latérale (Sidebar) ---
 with st.sidebar:
     st.header("⚡ Paramètres PAC")
@@ -25,6 +29,8 @@ with st.sidebar:
     cop_moyen = st.slider("COP moyen de la PAC", 1.5, 5.0, 2.0, 0.1)
     t_delay_min = st.number_input("Temps montée en T° / démarrage (min)", 0, 15, 3)
     t_anti_cycle_min = st.number_input("Arrêt minimum anti-court-cycle (min)", 0, 30, 10)
+
+    performances = performances_pac(T_prim, "puissance thermique")
     
     st.header("🔥 Chaudière d'appoint")
     P_chaud = st.number_input("Puissance Chaudière (kW)", 0.0, 100.0, 50.0)
@@ -39,10 +45,21 @@ with st.sidebar:
     st.header("🚿 Consignes")
     T_cons = st.number_input("T° Consigne (°C)", 40.0, 65.0, 60.0)
     dT_restart = st.number_input("Delta T redémarrage (°C)", 1.0, 15.0, 7.0)
-    T_init = st.number_input("T° initiale (°C)", 5.0, 65.0, 55.0)
+    regime_etabli = st.checkbox(
+        "Journée type en régime établi",
+        help="La journée part de l'état qu'elle restitue à son terme (jours identiques répétés) : "
+             "le résultat ne dépend plus de la T° initiale",
+    )
+    T_init = st.number_input("T° initiale (°C)", 5.0, 65.0, 55.0, disabled=regime_etabli)
     T_eau_froide = st.number_input("T° Eau froide (°C)", 5.0, 25.0, 10.0)
 
-    dt = st.number_input("Pas de temps de calcul (s)", 1, 60, 10)
+    dt = st.number_input("Pas de temps des courbes (s)", 1, 60, 10, help="Le calcul est exact, ce pas ne fixe que l'échantillonnage des résultats")
+
+    st.header("⏱️ Performance")
+    mesurer = st.checkbox("Mesurer les étapes", help="Chronomètres et compteurs, affichés en bas de page")
+    avec_cprofile = st.checkbox("Profil cProfile complet", disabled=not mesurer)
+
+prof = Profileur(actif=mesurer, cprofile=avec_cprofile)
 
 # --- Profil de Consommation ---
 st.subheader("📅 Profil de consommation journalier (24h)")
@@ -58,104 +75,68 @@ with c1:
     hour_volumes = ratios * v_total_jour
 
 # --- Simulation ---
+params = Parametres(
+    modele="pac_fixe", P_pac_nom=P_pac_th, T_prim=T_prim, cop_moyen=cop_moyen,
+    t_delay_min=t_delay_min, t_anti_cycle_min=t_anti_cycle_min,
+    P_chaud_nom=P_chaud, t_secours_min=t_secours_min,
+    V_ball=V_ball, ua_ballon=ua_ballon, P_bouclage_kW=P_bouclage_kW, T_amb=T_amb,
+    T_cons=T_cons, dT_restart=dT_restart, T_init=T_init, T_eau_froide=T_eau_froide,
+)
 t_max_min = 1440
-t_steps = int((t_max_min * 60) / dt)
-time_array = np.arange(0, t_steps * dt, dt)
-
-T = np.zeros_like(time_array, dtype=float)
-P_pac_active_th = np.zeros_like(time_array, dtype=float)
-P_chaud_active = np.zeros_like(time_array, dtype=float)
-P_tirage_array = np.zeros_like(time_array, dtype=float)
-T[0] = T_init
-
-pac_state = "OFF"
-wait_timer = 0.0
-chauffe_timer = 0.0
-time_since_last_stop = 9999.0 
-
-for i in range(1, len(time_array)):
-    Ti = T[i-1]
-    curr_hour = int((time_array[i] / 3600) % 24)
-    vol_h = hour_volumes[curr_hour]
-    # Calcul du tirage (énergie extraite du ballon)
-    p_tirage = (vol_h / 3600) * CP_WATER * (60 - T_eau_froide)
-    P_tirage_array[i] = p_tirage
-
-    p_pac_inst = 0.0
-    p_chaud_inst = 0.0
-
-    if pac_state == "OFF":
-        time_since_last_stop += dt
-        if Ti <= (T_cons - dT_restart):
-            if time_since_last_stop >= (t_anti_cycle_min * 60):
-                pac_state = "STARTING" # Phase de montée en température
-                wait_timer = 0.0
-                chauffe_timer = 0.0
-
-    elif pac_state == "STARTING":
-        wait_timer += dt
-        chauffe_timer += dt 
-        
-        # --- AJOUT ICI ---
-        # On met une valeur infime pour que ce temps soit comptabilisé 
-        # dans le temps de fonctionnement sans chauffer le ballon.
-        p_pac_inst = 1e-6 
-        # ------------------
-
-        if chauffe_timer > (t_secours_min * 60):
-            p_chaud_inst = P_chaud * 1000
-            
-        if wait_timer >= (t_delay_min * 60):
-            pac_state = "HEATING"
-
-    # elif pac_state == "STARTING":
-    #     wait_timer += dt
-    #     chauffe_timer += dt # Le chrono chaudière tourne déjà pendant la montée en T°
-        
-    #     # Enclenchement de la chaudière si le secours est court
-    #     if chauffe_timer > (t_secours_min * 60):
-    #         p_chaud_inst = P_chaud * 1000
-            
-    #     if wait_timer >= (t_delay_min * 60):
-    #         pac_state = "HEATING"
-
-    
+cache = cache_simulation()
+etat_initial = None
+if regime_etabli:
+    with prof.etape("régime établi", cache=cache):
+        regime = cache.obtenir_ou_calculer(
+            cle_stable("regime", params, hour_volumes, performances),
+            lambda: regime_periodique(params, hour_volumes, performances=performances),
+        )
+    etat_initial = regime.etat
+with prof.etape("simulation", cache=cache):
+    res = cache.obtenir_ou_calculer(
+        cle_stable(params, hour_volumes, dt, t_max_min, performances, etat_initial),
+        lambda: simulation_incrementale(params, dt, t_max_min * 60, performances, etat_initial).calculer(hour_volumes),
+    )
+prof.ajouter(res.compteurs)
+time_array = res.t
+T = res.T
+P_pac_active_th = res.P_pac
+P_chaud_active = res.P_chaud
+P_tirage_array = res.P_tirage
+bilan = res.bilan
 
-    elif pac_state == "HEATING":
-        if Ti >= T_cons or T_prim <= Ti:
-            pac_state = "OFF"
-            time_since_last_stop = 0.0
-            chauffe_timer = 0.0
-        else:
-            p_pac_inst = P_pac_th * 1000
-            chauffe_timer += dt
-            if chauffe_timer > (t_secours_min * 60):
-                p_chaud_inst = P_chaud * 1000
-
-    P_pac_active_th[i] = p_pac_inst
-    P_chaud_active[i] = p_chaud_inst
-
-    # Bilan énergétique du pas de temps
-    p_pertes = (ua_ballon * (Ti - T_amb)) + (P_bouclage_kW * 1000)
-    m_ball = (V_ball/1000 * RHO_WATER)
-    dT_step = (p_pac_inst + p_chaud_inst - p_pertes - p_tirage) * dt / (m_ball * CP_WATER)
-    T[i] = max(T_eau_froide, Ti + dT_step)
+with st.sidebar:
+    st.caption(f"🗄️ Cache simulation : {cache.hits} succès / {cache.misses} calculs ({len(cache)} en mémoire)")
+if etat_initial is not None:
+    afficher_regime(regime)
 
 # --- Graphiques ---
-df_res = pd.DataFrame({"h": time_array/3600, "T": T, "P_pac_th": P_pac_active_th/1000, "P_chaud": P_chaud_active/1000, "P_tirage": P_tirage_array/1000})
-with c2:
+with prof.etape("tableau"):
+    df_res = pd.DataFrame({"h": time_array/3600, "T": T, "P_pac_th": P_pac_active_th/1000, "P_chaud": P_chaud_active/1000, "P_tirage": P_tirage_array/1000})
+with c2, prof.etape("graphiques"):
+    h_debut, h_fin = st.slider("Fenêtre affichée (h)", 0.0, 24.0, (0.0, 24.0), 0.25)
+    h_fin = max(h_fin, h_debut + 0.25)
+    # Décimation à la largeur du graphique, recalculée depuis la pleine résolution à chaque zoom
+    idx = indices_affichage(
+        df_res["h"].values,
+        [df_res["T"].values, df_res["P_pac_th"].values, df_res["P_chaud"].values, df_res["P_tirage"].values],
+        n_pixels=1000, x_min=h_debut, x_max=h_fin,
+    )
+    df_plot = df_res.iloc[idx]
+
     fig1, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True, gridspec_kw={'height_ratios': [3, 1]})
-    ax1.plot(df_res["h"], df_res["T"], color="#007bff", lw=2, label="T° Ballon")
+    ax1.plot(df_plot["h"], df_plot["T"], color="#007bff", lw=2, label="T° Ballon")
     ax1.axhline(T_cons, color="red", ls="-", alpha=0.6, label="Consigne")
     ax1.axhline(T_cons - dT_restart, color="orange", ls="--", alpha=0.8, label="Seuil Relance")
     ax1.set_ylabel("Température (°C)")
     ax1.grid(True, alpha=0.2)
     ax1.legend()
 
-    ax2.stackplot(df_res["h"], df_res["P_pac_th"], df_res["P_chaud"], labels=['PAC (Th)', 'Chaudière'], colors=['#ffa500', '#ff4500'], alpha=0.6)
-    ax2.plot(df_res["h"], df_res["P_tirage"], color="blue", lw=1, label="Tirage")
-    ax2.set_xlim(0, 24)
-    ax2.set_xticks(range(0, 25, 2))
+    ax2.stackplot(df_plot["h"], df_plot["P_pac_th"], df_plot["P_chaud"], labels=['PAC (Th)', 'Chaudière'], colors=['#ffa500', '#ff4500'], alpha=0.6)
+    ax2.plot(df_plot["h"], df_plot["P_tirage"], color="blue", lw=1, label="Tirage")
+    ax2.set_xlim(h_debut, h_fin)
+    if h_fin - h_debut > 6:
+        ax2.set_xticks(range(int(h_debut), int(h_fin) + 1, 2))
     ax2.set_ylabel("Puissance (kW)")
     ax2.legend(loc='upper right', fontsize='small')
     st.pyplot(fig1)
@@ -164,35 +145,39 @@ with c2:
 st.divider()
 st.subheader("📊 Bilan Énergétique & Technique Complet")
 
-e_th_pac = np.sum(P_pac_active_th * dt) / 3600000
-e_elec_pac = e_th_pac / cop_moyen
-e_th_chaud = np.sum(P_chaud_active * dt) / 3600000
+e_th_pac = bilan.e_th_pac
+e_elec_pac = bilan.e_elec_pac(cop_moyen)
+e_th_chaud = bilan.e_th_chaud
 e_total_produite = e_th_pac + e_th_chaud
 e_enr = e_th_pac - e_elec_pac
 
-e_utile_tirage = np.sum(P_tirage_array * dt) / 3600000
-e_bouclage_kwh = P_bouclage_kW * 24
-e_pertes_statiques = np.sum((ua_ballon * (T - T_amb)) * dt) / 3600000
+e_utile_tirage = bilan.e_tirage
+e_bouclage_kwh = bilan.e_bouclage
+e_pertes_statiques = bilan.e_pertes_cuve
 e_besoin_total = e_utile_tirage + e_bouclage_kwh + e_pertes_statiques
 
-demarrages = len([i for i in range(1, len(P_pac_active_th)) if P_pac_active_th[i] > 0 and P_pac_active_th[i-1] == 0])
+demarrages = bilan.demarrages
 
 m1, m2, m3, m4 = st.columns(4)
 m1.metric("Production Totale", f"{e_total_produite:.2f} kWh")
 m2.metric("Besoin Global", f"{e_besoin_total:.2f} kWh")
 m3.metric("Nombre Démarrages PAC", f"{demarrages}")
+m4.metric("Fermeture du bilan", f"{bilan.residu:.3f} kWh",
+          help=f"Stockage - (production - besoins) ; dont écrêtage à l'eau froide : {bilan.e_ecretee:.3f} kWh")
 
 col_a, col_b, col_c = st.columns([1, 1, 1])
 with col_a:
     st.write("**📡 Bilan Pompe à Chaleur**")
     st.metric("P. Thermique Fournie", f"{e_th_pac:.2f} kWh_th")
     st.metric("P. Élec Consommée", f"{e_elec_pac:.2f} kWh_elec")
-    st.write(f"Temps de marche PAC : **{format_duration(np.sum(P_pac_active_th > 0) * dt)}**")
+    st.write(f"Temps de marche PAC : **{format_duration(bilan.temps_marche_pac)}**")
+    if performances is not None and e_elec_pac > 0:
+        st.write(f"COP réalisé (carte) : **{e_th_pac / e_elec_pac:.2f}**")
 
 with col_b:
     st.write("**🔥 Bilan Chaudière**")
     st.metric("Apport Chaudière", f"{e_th_chaud:.2f} kWh")
-    st.write(f"Temps de marche Chaud. : **{format_duration(np.sum(P_chaud_active > 0) * dt)}**")
+    st.write(f"Temps de marche Chaud. : **{format_duration(bilan.temps_marche_chaud)}**")
     part_chaud = (e_th_chaud/e_total_produite*100 if e_total_produite>0 else 0)
     st.write(f"Part Chaudière : {part_chaud:.1f} %")
 
@@ -207,11 +192,122 @@ with col_c:
 if e_total_produite > 0:
     st.write("---")
     st.write("**Répartition du bilan énergétique**")
-    fig2, ax_pie = plt.subplots(figsize=(4, 3))
-    ax_pie.pie([e_enr, e_elec_pac, e_th_chaud], 
-                labels=['ENR Gratuit', 'Consommation Elec PAC', 'Consommation Chaudière'], 
-                autopct='%1.1f%%', colors=['#4CAF50', '#FFC107', '#FF5722'], startangle=90)
-    st.pyplot(fig2)
+    with prof.etape("camembert"):
+        fig2, ax_pie = plt.subplots(figsize=(4, 3))
+        ax_pie.pie([e_enr, e_elec_pac, e_th_chaud], 
+                    labels=['ENR Gratuit', 'Consommation Elec PAC', 'Consommation Chaudière'], 
+                    autopct='%1.1f%%', colors=['#4CAF50', '#FFC107', '#FF5722'], startangle=90)
+        st.pyplot(fig2)
 
 if demarrages / 24 > 3:
-    st.error(f"⚠️ Risque de court-cycle ({demarrages/24:.1f} cycles/h).")
\ No newline at end of file
+    st.error(f"⚠️ Risque de court-cycle ({demarrages/24:.1f} cycles/h).")
+
+# --- Analyse des cycles ---
+with prof.etape("analyse cycles"):
+    analyse = analyser_cycles(P_pac_active_th, P_chaud_active, T, dt, t_anti_cycle_min)
+prof.compter("cycles_pac", len(analyse.pac))
+with st.expander("🔁 Analyse des cycles PAC"), prof.etape("rendu cycles"):
+    k1, k2, k3 = st.columns(3)
+    k1.metric("Cycles PAC", len(analyse.pac))
+    k2.metric("Cycles avec secours chaudière", int(analyse.pac.secours.sum()))
+    k3.metric("Arrêts < anti-court-cycle", analyse.violations_anti_cycle)
+
+    fig3, (ax_m, ax_a) = plt.subplots(1, 2, figsize=(10, 3), sharey=True)
+    classes = libelles_classes(analyse.hist_marche[1])
+    ax_m.bar(classes, analyse.hist_marche[0], color="#ffa500")
+    ax_m.set_title("Durées de marche (min)", fontsize="small")
+    ax_a.bar(classes, analyse.hist_arret[0], color="#007bff")
+    ax_a.set_title("Durées d'arrêt (min)", fontsize="small")
+    for ax in (ax_m, ax_a):
+        ax.tick_params(axis="x", labelrotation=60, labelsize="x-small")
+    st.pyplot(fig3)
+
+    df_cycles = analyse.pac.vers_dataframe()
+    df_cycles["debut"] = [format_duration(s) for s in df_cycles["debut"]]
+    df_cycles["duree"] = df_cycles["duree"] / 60
+    df_cycles["arret_avant"] = df_cycles["arret_avant"] / 60
+    st.dataframe(df_cycles.rename(columns={
+        "debut": "Démarrage", "duree": "Durée (min)", "energie": "Énergie PAC (kWh)",
+        "T_debut": "T° début (°C)", "T_fin": "T° fin (°C)", "arret_avant": "Arrêt avant (min)",
+        "secours": "Secours chaudière", "energie_secours": "Énergie chaudière (kWh)",
+    }), hide_index=True)
+
+# --- Pilotage optimisé ---
+with st.expander("💶 Pilotage optimisé (tarif horaire & surplus PV)"):
+    st.caption("Marche PAC / chaudière de coût minimal sur la journée, par pas de 5 min, "
+               "dans le respect de la T° minimale, de l'anti-court-cycle et de la temporisation. "
+               "L'électricité de la PAC est comptée au COP moyen, ou à celui de la carte de performances "
+               "quand elle est fournie (puissance PAC de la carte, heure par heure).")
+    fichier_tarifs = st.file_uploader("Tarifs horaires (CSV)", type="csv",
+                                      help="Colonne tarif (€/kWh), colonne pv facultative (surplus PV en kW), une ligne par heure")
+    o1, o2, o3 = st.columns(3)
+    prix_chaudiere = o1.number_input("Prix chaleur chaudière (€/kWh)", 0.0, 1.0, 0.12, 0.01)
+    cout_demarrage = o2.number_input("Usure par démarrage PAC (€)", 0.0, 1.0, 0.02, 0.01)
+    T_min = o3.number_input("T° minimale du ballon (°C)", 10.0, 90.0, float(T_cons - dT_restart), 0.5)
+    tarifs = None
+    if fichier_tarifs is not None:
+        try:
+            tarifs = lire_tarifs(fichier_tarifs)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+    if tarifs is not None and st.toggle("Calculer le programme optimal"):
+        tarif, pv = tarifs
+        with prof.etape("pilotage", cache=cache):
+            pilotage = cache.obtenir_ou_calculer(
+                cle_stable("pilotage", params, hour_volumes, tarif, pv, prix_chaudiere, cout_demarrage, T_min,
+                           performances),
+                lambda: optimiser(params, hour_volumes, tarif, pv, prix_chaudiere=prix_chaudiere,
+                                  cout_demarrage=cout_demarrage, T_min=T_min, performances=performances),
+            )
+        b_opt, b_hyst = pilotage.resultat.bilan, pilotage.resultat_hysteresis.bilan
+        if pilotage.programme is None:
+            st.info(f"ℹ️ Le programme optimal rejoué ({pilotage.cout_programme:.2f} €) ne fait pas mieux que "
+                    "l'hystérésis : elle est conservée.")
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("Coût hystérésis", f"{pilotage.cout_hysteresis:.2f} €")
+        p2.metric("Coût optimisé", f"{pilotage.cout:.2f} €",
+                  delta=f"{pilotage.cout - pilotage.cout_hysteresis:+.2f} €", delta_color="inverse",
+                  help=f"Prévu par l'optimisation : {pilotage.cout_prevu:.2f} €")
+        p3.metric("Démarrages PAC", f"{b_opt.demarrages}", delta=f"{b_opt.demarrages - b_hyst.demarrages:+d}",
+                  delta_color="inverse")
+        p4.metric("Sous T° minimale", format_duration(pilotage.violations),
+                  help="Après la remontée initiale depuis la T° de départ")
+        if not pilotage.respecte_T_min:
+            st.warning("⚠️ La T° minimale n'est pas tenue : puissances insuffisantes pour ce profil.")
+
+        r = pilotage.resultat
+        prog = pilotage.programme
+        fig4, (ax_t, ax_p) = plt.subplots(2, 1, figsize=(10, 6), sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+        ax_t.plot(pilotage.resultat_hysteresis.t / 3600, pilotage.resultat_hysteresis.T, color="grey", lw=1,
+                  alpha=0.7, label="T° hystérésis")
+        if prog is not None:
+            ax_t.plot(r.t / 3600, r.T, color="#007bff", lw=2, label="T° pilotage optimisé")
+        ax_t.axhline(T_min, color="orange", ls="--", alpha=0.8, label="T° minimale")
+        ax_t.set_ylabel("Température (°C)")
+        ax_t.grid(True, alpha=0.2)
+        ax_t.legend(fontsize="small")
+        if prog is not None:
+            h_prog = np.arange(len(prog.pac) + 1) * prog.pas / 3600
+            ax_p.stairs(prog.pac.astype(float), h_prog, color="#ffa500", fill=True, alpha=0.6, label="Marche PAC")
+            ax_p.stairs(prog.chaud * 0.5, h_prog, color="#ff4500", fill=True, alpha=0.6, label="Marche chaudière")
+        heures = np.arange(25)
+        ax_tarif = ax_p.twinx()
+        ax_tarif.stairs(np.asarray(tarif)[heures[:-1] % len(tarif)], heures, color="black", lw=1, label="Tarif")
+        ax_tarif.set_ylabel("€/kWh")
+        ax_p.set_yticks([])
+        ax_p.set_xticks(range(0, 25, 2))
+        ax_p.legend(loc="upper left", fontsize="small")
+        st.pyplot(fig4)
+
+# --- Performance ---
+if prof.actif:
+    prof.terminer()
+    with st.expander("⏱️ Performance"):
+        st.caption(f"Script complet : {prof.total:.3f} s")
+        st.dataframe(prof.vers_dataframe(), hide_index=True)
+        st.write(prof.compteurs)
+        e1, e2 = st.columns(2)
+        e1.download_button("Exporter (JSON)", prof.vers_json(), "performance.json", "application/json")
+        if prof.avec_cprofile:
+            e2.download_button("Exporter (pstats)", prof.octets_pstats(), "profil.pstats")
+            st.code(prof.resume_pstats())
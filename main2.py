@@ -3,19 +3,20 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from simu_ecs import (
+    Parametres,
+    cle_stable,
+    format_duration,
+)
+from simu_ecs.cycles import analyser_cycles, libelles_classes
+from simu_ecs.interface import afficher_regime, cache_simulation, performances_pac, simulation_incrementale
+from simu_ecs.periodique import regime_periodique
+from simu_ecs.profilage import Profileur
+
 # Configuration
 st.set_page_config(page_title="Simulateur ECS Physico-Technique", layout="wide")
 st.title("🚀 Simulateur ECS : PAC + Chaudière (Modèle Physique Complet)")
 
-# --- Constantes physiques ---
-RHO_WATER = 1000 
-CP_WATER = 4180  
-
-def format_duration(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    return f"{hours}h {minutes:02d}min"
-
 # --- Barre latérale (Sidebar) ---
 with st.sidebar:
     st.header("⚡ Pompe à Chaleur (PAC)")
@@ -24,6 +25,8 @@ with st.sidebar:
     cop_moyen = st.slider("COP moyen", 1.5, 5.0, 3.0, 0.1)
     t_delay_min = st.number_input("Temps montée en T° (min)", 0, 15, 3)
     t_anti_cycle_min = st.number_input("Arrêt mini anti-court-cycle (min)", 0, 30, 10)
+
+    performances = performances_pac(T_prim)
     
     st.header("🌀 Échangeur (Serpentin)")
     S_serpentin = st.number_input("Surface d'échange (m²)", 0.1, 15.0, 3.5)
@@ -43,10 +46,21 @@ with st.sidebar:
     st.header("🚿 Consignes")
     T_cons = st.number_input("T° Consigne (°C)", 40.0, 65.0, 60.0)
     dT_restart = st.number_input("Delta T redémarrage (°C)", 1.0, 15.0, 5.0)
-    T_init = st.number_input("T° initiale (°C)", 5.0, 65.0, 55.0)
+    regime_etabli = st.checkbox(
+        "Journée type en régime établi",
+        help="La journée part de l'état qu'elle restitue à son terme (jours identiques répétés) : "
+             "le résultat ne dépend plus de la T° initiale",
+    )
+    T_init = st.number_input("T° initiale (°C)", 5.0, 65.0, 55.0, disabled=regime_etabli)
     T_eau_froide = st.number_input("T° Eau froide (°C)", 5.0, 25.0, 10.0)
 
-    dt = st.number_input("Pas de temps (s)", 1, 60, 10)
+    dt = st.number_input("Pas de temps des courbes (s)", 1, 60, 10, help="Le calcul est exact, ce pas ne fixe que l'échantillonnage des résultats")
+
+    st.header("⏱️ Performance")
+    mesurer = st.checkbox("Mesurer les étapes", help="Chronomètres et compteurs, affichés en bas de page")
+    avec_cprofile = st.checkbox("Profil cProfile complet", disabled=not mesurer)
+
+prof = Profileur(actif=mesurer, cprofile=avec_cprofile)
 
 # --- Profil de Consommation ---
 st.subheader("📅 Profil de consommation journalier")
@@ -59,56 +73,42 @@ with c1:
     hour_volumes = (edited_df["Répartition (%)"].values / 100) * v_total_jour
 
 # --- Simulation ---
-t_steps = int((1440 * 60) / dt)
-time_array = np.arange(0, t_steps * dt, dt)
-T = np.zeros_like(time_array, dtype=float)
-P_pac_eff, P_chaud_eff, P_tirage_array = [np.zeros_like(time_array) for _ in range(3)]
-P_pertes_cuve = np.zeros_like(time_array)
-T[0] = T_init
-
-pac_state = "OFF"
-wait_timer, chauffe_timer, time_since_stop = 0.0, 0.0, 9999.0
-
-for i in range(1, len(time_array)):
-    Ti = T[i-1]
-    curr_hour = int((time_array[i] / 3600) % 24)
-    p_tirage = (hour_volumes[curr_hour] / 3600) * CP_WATER * (60 - T_eau_froide)
-    P_tirage_array[i] = p_tirage
-
-    p_pac_inst, p_chaud_inst = 0.0, 0.0
-
-    if pac_state == "OFF":
-        time_since_stop += dt
-        if Ti <= (T_cons - dT_restart) and time_since_stop >= (t_anti_cycle_min * 60):
-            pac_state = "STARTING"
-            wait_timer, chauffe_timer = 0.0, 0.0
-    
-    elif pac_state == "STARTING":
-        wait_timer += dt
-        chauffe_timer += dt
-        if chauffe_timer > (t_secours_min * 60): p_chaud_inst = P_chaud * 1000
-        if wait_timer >= (t_delay_min * 60): pac_state = "HEATING"
-            
-    elif pac_state == "HEATING":
-        if Ti >= T_cons or T_prim <= (Ti + 0.1):
-            pac_state = "OFF"
-            time_since_stop, chauffe_timer = 0.0, 0.0
-        else:
-            p_echange_max = us_global * (T_prim - Ti)
-            p_pac_inst = max(0, min(P_pac_nom * 1000, p_echange_max))
-            chauffe_timer += dt
-            if chauffe_timer > (t_secours_min * 60): p_chaud_inst = P_chaud * 1000
-
-    P_pac_eff[i], P_chaud_eff[i] = p_pac_inst, p_chaud_inst
-    P_pertes_cuve[i] = ua_ballon * (Ti - T_amb)
-    p_pertes_tot = P_pertes_cuve[i] + (P_bouclage_kW * 1000)
-    
-    dT_step = (p_pac_inst + p_chaud_inst - p_pertes_tot - p_tirage) * dt / ((V_ball/1000 * RHO_WATER) * CP_WATER)
-    T[i] = max(T_eau_froide, Ti + dT_step)
+params = Parametres(
+    modele="echangeur", P_pac_nom=P_pac_nom, T_prim=T_prim, cop_moyen=cop_moyen,
+    t_delay_min=t_delay_min, t_anti_cycle_min=t_anti_cycle_min,
+    S_serpentin=S_serpentin, K_echange=U_coef,
+    P_chaud_nom=P_chaud, t_secours_min=t_secours_min,
+    V_ball=V_ball, ua_ballon=ua_ballon, P_bouclage_kW=P_bouclage_kW, T_amb=T_amb,
+    T_cons=T_cons, dT_restart=dT_restart, T_init=T_init, T_eau_froide=T_eau_froide,
+)
+cache = cache_simulation()
+etat_initial = None
+if regime_etabli:
+    with prof.etape("régime établi", cache=cache):
+        regime = cache.obtenir_ou_calculer(
+            cle_stable("regime", params, hour_volumes, performances),
+            lambda: regime_periodique(params, hour_volumes, performances=performances),
+        )
+    etat_initial = regime.etat
+with prof.etape("simulation", cache=cache):
+    res = cache.obtenir_ou_calculer(
+        cle_stable(params, hour_volumes, dt, performances, etat_initial),
+        lambda: simulation_incrementale(params, dt, 86400, performances, etat_initial).calculer(hour_volumes),
+    )
+prof.ajouter(res.compteurs)
+time_array = res.t
+T, P_pac_eff, P_chaud_eff, P_tirage_array = res.T, res.P_pac, res.P_chaud, res.P_tirage
+bilan = res.bilan
+
+with st.sidebar:
+    st.caption(f"🗄️ Cache simulation : {cache.hits} succès / {cache.misses} calculs ({len(cache)} en mémoire)")
+if etat_initial is not None:
+    afficher_regime(regime)
 
 # --- Graphiques ---
-df_res = pd.DataFrame({"h": time_array/3600, "T": T, "P_pac": P_pac_eff/1000, "P_chaud": P_chaud_eff/1000, "P_tirage": P_tirage_array/1000})
-with c2:
+with prof.etape("tableau"):
+    df_res = pd.DataFrame({"h": time_array/3600, "T": T, "P_pac": P_pac_eff/1000, "P_chaud": P_chaud_eff/1000, "P_tirage": P_tirage_array/1000})
+with c2, prof.etape("graphiques"):
     fig1, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 7), sharex=True, gridspec_kw={'height_ratios': [3, 1]})
     ax1.plot(df_res["h"], df_res["T"], color="#007bff", lw=2, label="T° Ballon")
     ax1.axhline(T_cons, color="red", ls="--", label="Consigne")
@@ -124,13 +124,13 @@ st.divider()
 st.subheader("📊 Bilan Énergétique Consolidé (24h)")
 
 # Calculs énergétiques (kWh)
-e_th_pac = np.sum(P_pac_eff * dt) / 3600000
-e_elec_pac = e_th_pac / cop_moyen
-e_th_chaud = np.sum(P_chaud_eff * dt) / 3600000
+e_th_pac = bilan.e_th_pac
+e_elec_pac = bilan.e_elec_pac(cop_moyen)
+e_th_chaud = bilan.e_th_chaud
 e_enr = e_th_pac - e_elec_pac
-e_utile = np.sum(P_tirage_array * dt) / 3600000
-e_pertes_cuve = np.sum(P_pertes_cuve * dt) / 3600000
-e_pertes_bouclage = (P_bouclage_kW * 24)
+e_utile = bilan.e_tirage
+e_pertes_cuve = bilan.e_pertes_cuve
+e_pertes_bouclage = bilan.e_bouclage
 e_pertes_totales = e_pertes_cuve + e_pertes_bouclage
 e_total_genere = e_th_pac + e_th_chaud
 
@@ -151,7 +151,7 @@ col_tab, col_pie = st.columns([2, 1])
 with col_tab:
     st.table(df_bilan)
 
-with col_pie:
+with col_pie, prof.etape("camembert"):
     fig2, ax_pie = plt.subplots()
     ax_pie.pie([e_enr, e_elec_pac, e_th_chaud], labels=['Gratuit (Air)', 'Achat Élec', 'Chaudière'], 
                 autopct='%1.1f%%', colors=['#4CAF50', '#FFC107', '#FF5722'], startangle=90)
@@ -161,6 +161,51 @@ with col_pie:
 st.write("**Indicateurs de fonctionnement :**")
 i1, i2, i3, i4 = st.columns(4)
 i1.metric("Rendement Global (COP sys)", f"{(e_total_genere/(e_elec_pac+e_th_chaud)):.2f}" if (e_elec_pac+e_th_chaud)>0 else "0")
-i2.metric("Temps de marche PAC", format_duration(np.sum(P_pac_eff > 0) * dt))
-i3.metric("Temps de marche Chaudière", format_duration(np.sum(P_chaud_eff > 0) * dt))
-i4.metric("Démarrages PAC", len([i for i in range(1, len(P_pac_eff)) if P_pac_eff[i] > 0 and P_pac_eff[i-1] == 0]))
\ No newline at end of file
+i2.metric("Temps de marche PAC", format_duration(bilan.temps_marche_pac))
+i3.metric("Temps de marche Chaudière", format_duration(bilan.temps_marche_chaud))
+i4.metric("Démarrages PAC", bilan.demarrages)
+st.caption(f"Fermeture du bilan : {bilan.residu:.3f} kWh (variation du stock {bilan.e_stockee:.2f} kWh, "
+           f"dont écrêtage à l'eau froide {bilan.e_ecretee:.3f} kWh)")
+
+# --- Analyse des cycles ---
+with prof.etape("analyse cycles"):
+    analyse = analyser_cycles(P_pac_eff, P_chaud_eff, T, dt, t_anti_cycle_min)
+prof.compter("cycles_pac", len(analyse.pac))
+with st.expander("🔁 Analyse des cycles PAC"), prof.etape("rendu cycles"):
+    k1, k2, k3 = st.columns(3)
+    k1.metric("Cycles PAC", len(analyse.pac))
+    k2.metric("Cycles avec secours chaudière", int(analyse.pac.secours.sum()))
+    k3.metric("Arrêts < anti-court-cycle", analyse.violations_anti_cycle)
+
+    fig3, (ax_m, ax_a) = plt.subplots(1, 2, figsize=(10, 3), sharey=True)
+    classes = libelles_classes(analyse.hist_marche[1])
+    ax_m.bar(classes, analyse.hist_marche[0], color="#ffa500")
+    ax_m.set_title("Durées de marche (min)", fontsize="small")
+    ax_a.bar(classes, analyse.hist_arret[0], color="#007bff")
+    ax_a.set_title("Durées d'arrêt (min)", fontsize="small")
+    for ax in (ax_m, ax_a):
+        ax.tick_params(axis="x", labelrotation=60, labelsize="x-small")
+    st.pyplot(fig3)
+
+    df_cycles = analyse.pac.vers_dataframe()
+    df_cycles["debut"] = [format_duration(s) for s in df_cycles["debut"]]
+    df_cycles["duree"] = df_cycles["duree"] / 60
+    df_cycles["arret_avant"] = df_cycles["arret_avant"] / 60
+    st.dataframe(df_cycles.rename(columns={
+        "debut": "Démarrage", "duree": "Durée (min)", "energie": "Énergie PAC (kWh)",
+        "T_debut": "T° début (°C)", "T_fin": "T° fin (°C)", "arret_avant": "Arrêt avant (min)",
+        "secours": "Secours chaudière", "energie_secours": "Énergie chaudière (kWh)",
+    }), hide_index=True)
+
+# --- Performance ---
+if prof.actif:
+    prof.terminer()
+    with st.expander("⏱️ Performance"):
+        st.caption(f"Script complet : {prof.total:.3f} s")
+        st.dataframe(prof.vers_dataframe(), hide_index=True)
+        st.write(prof.compteurs)
+        e1, e2 = st.columns(2)
+        e1.download_button("Exporter (JSON)", prof.vers_json(), "performance.json", "application/json")
+        if prof.avec_cprofile:
+            e2.download_button("Exporter (pstats)", prof.octets_pstats(), "profil.pstats")
+            st.code(prof.resume_pstats())
@@ -1,20 +1,50 @@
+import os
+import time
+
 import streamlit as st
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from simu_ecs import (
+    CacheResultats,
+    Parametres,
+    Puisages,
+    cle_stable,
+    format_duration,
+)
+from simu_ecs.dimensionnement import VARIABLES, Contraintes, dimensionner
+from simu_ecs.interface import afficher_regime, cache_simulation, performances_pac, simulation_incrementale
+from simu_ecs.montecarlo import Alea, simuler_monte_carlo
+from simu_ecs.pareto import PRIX, VARIABLES as VARIABLES_PARETO, explorer_flux
+from simu_ecs.periodique import regime_periodique
+from simu_ecs.profilage import Profileur
+from simu_ecs.stratifie import iterer_stratifie
+from simu_ecs.tache import TacheSimulation
+from simu_ecs.rendu import indices_affichage
+
 # Configuration
 st.set_page_config(page_title="Simulateur ECS Hybride Expert", layout="wide")
 st.title("🚀 Simulateur ECS : PAC + Chaudière (Modèle Serpentin)")
 
-# --- Constantes physiques ---
-RHO_WATER = 1000 
-CP_WATER = 4180  
 
-def format_duration(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    return f"{hours}h {minutes:02d}min"
+@st.cache_resource
+def cache_exploration():
+    # Évaluations du front de Pareto, toujours sur disque pour servir d'une session à l'autre
+    dossier = os.environ.get("SIMU_ECS_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "simu_ecs")
+    return CacheResultats(max_entrees=20000, dossier=dossier)
+
+
+def tache_de_fond(cle, lancer):
+    # Une tâche par session ; des entrées modifiées annulent la tâche en cours au prochain morceau
+    tache = st.session_state.get("tache_stratifie")
+    if tache is not None and tache.cle != cle:
+        tache.annuler()
+        tache = None
+    if tache is None and cle is not None:
+        tache = lancer().demarrer()
+    st.session_state["tache_stratifie"] = tache
+    return tache
 
 # --- Barre latérale ---
 with st.sidebar:
@@ -28,6 +58,8 @@ with st.sidebar:
     cop_moyen = st.slider("COP moyen PAC", 1.5, 5.0, 3.0, 0.1)
     t_delay_min = st.number_input("Délai démarrage PAC (min)", 0, 15, 3)
     t_anti_cycle_min = st.number_input("Arrêt mini (min)", 0, 30, 10)
+
+    performances = performances_pac(T_prim)
     
     st.header("🔥 Appoint Chaudière")
     P_chaud_nom = st.number_input("P. Nominale Chaudière (kW)", 0.0, 100.0, 25.0)
@@ -42,9 +74,25 @@ with st.sidebar:
     st.header("🚿 Consignes")
     T_cons = st.number_input("Consigne ECS (°C)", 40.0, 70.0, 60.0)
     dT_restart = st.number_input("DeltaT Relance (°C)", 1.0, 15.0, 5.0)
-    T_init = st.number_input("T° initiale (°C)", 5.0, 70.0, 50.0)
+    regime_etabli = st.checkbox(
+        "Journée type en régime établi",
+        help="La journée part de l'état qu'elle restitue à son terme (jours identiques répétés) : "
+             "le résultat ne dépend plus de la T° initiale",
+    )
+    T_init = st.number_input("T° initiale (°C)", 5.0, 70.0, 50.0, disabled=regime_etabli)
     T_eau_froide = st.number_input("T° Eau froide (°C)", 5.0, 25.0, 10.0)
-    dt = st.number_input("Pas de temps (s)", 1, 60, 10)
+    dt = st.number_input("Pas de temps des courbes (s)", 1, 60, 10, help="Le calcul est exact, ce pas ne fixe que l'échantillonnage des résultats")
+
+    st.header("🧊 Stratification")
+    stratifie = st.checkbox("Ballon stratifié", False, help="Modèle à couches, calculé au pas de temps ci-dessus")
+    n_couches = st.slider("Nombre de couches", 2, 100, 50, disabled=not stratifie)
+    hauteur_sonde = st.slider("Hauteur de la sonde (% de la cuve)", 0, 100, 40, 5, disabled=not stratifie)
+
+    st.header("⏱️ Performance")
+    mesurer = st.checkbox("Mesurer les étapes", help="Chronomètres et compteurs, affichés en bas de page")
+    avec_cprofile = st.checkbox("Profil cProfile complet", disabled=not mesurer)
+
+prof = Profileur(actif=mesurer, cprofile=avec_cprofile)
 
 # --- Profil de Consommation (Tableau de répartition) ---
 st.subheader("📅 Profil de consommation journalier")
@@ -61,74 +109,116 @@ with col_tirage:
     edited_df = st.data_editor(df_profil, hide_index=True, use_container_width=True)
     hour_volumes = (edited_df["Répartition (%)"].values / 100) * v_total_jour
 
+    # Cycle de puisages (début, durée, débit, T° livrée) : remplace le profil horaire pour la simulation
+    fichier_puisages = st.file_uploader(
+        "Cycle de puisages (CSV, optionnel)", type="csv",
+        help="Colonnes debut (s ou hh:mm), duree (s), debit (L/min), T_livree (°C) ; une ligne par puisage",
+    )
+    puisages = None
+    if fichier_puisages is not None:
+        try:
+            puisages = Puisages.lire(fichier_puisages)
+            st.caption(f"🚿 {len(puisages)} puisages, {puisages.volume_60(T_eau_froide):.0f} L équivalents à 60°C")
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+
 # --- Simulation ---
-t_steps = int((1440 * 60) / dt)
-time_array = np.arange(0, t_steps * dt, dt)
-T = np.zeros(t_steps)
-P_pac_act = np.zeros(t_steps)
-P_chaud_act = np.zeros(t_steps)
-P_tirage_act = np.zeros(t_steps)
-T[0] = T_init
-
-pac_state = "OFF"
-wait_timer, chauffe_timer, time_since_stop = 0.0, 0.0, 9999.0
-
-for i in range(1, t_steps):
-    Ti = T[i-1]
-    curr_h = int((time_array[i] / 3600) % 24)
-    # Calcul du tirage
-    p_tirage = (hour_volumes[curr_h] / 3600) * CP_WATER * (60 - T_eau_froide)
-    P_tirage_act[i] = p_tirage
-    
-    p_pac, p_chaud = 0.0, 0.0
-
-    # Logique d'état PAC / Chaudière
-    if pac_state == "OFF":
-        time_since_stop += dt
-        if Ti <= (T_cons - dT_restart) and time_since_stop >= (t_anti_cycle_min * 60):
-            pac_state = "STARTING"
-            wait_timer, chauffe_timer = 0.0, 0.0
-    elif pac_state == "STARTING":
-        wait_timer += dt
-        chauffe_timer += dt
-        if wait_timer >= (t_delay_min * 60): pac_state = "HEATING"
-        if chauffe_timer > (t_secours_min * 60):
-            p_e_max = max(0, K_echange * S_serpentin * (T_prim - Ti))
-            p_chaud = min(P_chaud_nom * 1000, p_e_max)
-    elif pac_state == "HEATING":
-        if Ti >= T_cons or Ti >= T_prim - 0.5:
-            pac_state = "OFF"
-            time_since_stop = 0.0
-        else:
-            p_e_max = max(0, K_echange * S_serpentin * (T_prim - Ti))
-            p_pac = min(P_pac_nom * 1000, p_e_max)
-            chauffe_timer += dt
-            if chauffe_timer > (t_secours_min * 60):
-                p_chaud = min(P_chaud_nom * 1000, max(0, p_e_max - p_pac))
-
-    # Bilan énergétique du pas de temps
-    p_pertes = (ua_ballon * (Ti - T_amb)) + (P_bouclage_kW * 1000)
-    m_ball = (V_ball/1000 * RHO_WATER)
-    dT_step = (p_pac + p_chaud - p_pertes - p_tirage) * dt / (m_ball * CP_WATER)
-    T[i] = max(T_eau_froide, Ti + dT_step)
-    P_pac_act[i], P_chaud_act[i] = p_pac, p_chaud
+params = Parametres(
+    modele="serpentin", P_pac_nom=P_pac_nom, T_prim=T_prim, cop_moyen=cop_moyen,
+    t_delay_min=t_delay_min, t_anti_cycle_min=t_anti_cycle_min,
+    S_serpentin=S_serpentin, K_echange=K_echange,
+    P_chaud_nom=P_chaud_nom, t_secours_min=t_secours_min,
+    V_ball=V_ball, ua_ballon=ua_ballon, P_bouclage_kW=P_bouclage_kW, T_amb=T_amb,
+    T_cons=T_cons, dT_restart=dT_restart, T_init=T_init, T_eau_froide=T_eau_froide,
+)
+if stratifie and regime_etabli:
+    st.info("ℹ️ Le ballon stratifié part toujours de la T° initiale : régime établi non disponible.")
+if stratifie and performances is not None:
+    st.warning("⚠️ Le ballon stratifié n'utilise pas la carte de performances : puissance nominale et COP moyen appliqués.")
+    performances = None
+cache = cache_simulation()
+soutirage = hour_volumes if puisages is None else puisages
+profil = hour_volumes if puisages is None else puisages.profil(T_eau_froide)
+etat_initial = None
+if regime_etabli and not stratifie:
+    with prof.etape("régime établi", cache=cache):
+        regime = cache.obtenir_ou_calculer(
+            cle_stable("regime", params, soutirage, performances),
+            lambda: regime_periodique(params, profil, performances=performances),
+        )
+    etat_initial = regime.etat
+# Ballon stratifié : calcul long, mené dans un thread par tranches d'une heure affichées au fil de l'eau
+cle_strat = cle_stable("stratifie", params, soutirage, dt, n_couches, hauteur_sonde) if stratifie else None
+# La suite dépend de la valeur lue, pas du test d'appartenance (qui évite de compter un calcul) :
+# une entrée périmée entre les deux donne None et relance le calcul
+res_strat = cache.obtenir(cle_strat) if stratifie and cle_strat in cache else None
+tache = tache_de_fond(cle_strat if stratifie and res_strat is None else None, lambda: TacheSimulation(
+    cle_strat,
+    iterer_stratifie(params, profil, dt, n_couches=n_couches, hauteur_sonde=hauteur_sonde / 100, pas_morceau=3600),
+    86400,
+))
+with prof.etape("simulation", cache=cache):
+    if stratifie and tache is None:
+        res = res_strat
+    elif stratifie:
+        res = tache.partiel
+        while res is None and tache.en_cours:
+            res = tache.attendre(0.5)
+        if tache.erreur is not None:
+            st.session_state["tache_stratifie"] = None
+            raise tache.erreur
+        if tache.terminee:
+            # Le dernier morceau a pu arriver depuis la lecture de partiel
+            res = tache.resultat
+            cache.mettre(cle_strat, res)
+            st.session_state["tache_stratifie"] = tache = None
+    else:
+        res = cache.obtenir_ou_calculer(
+            cle_stable(params, soutirage, dt, performances, etat_initial),
+            lambda: simulation_incrementale(params, dt, 86400, performances, etat_initial).calculer(profil),
+        )
+prof.ajouter(res.compteurs)
+time_array = res.t
+T, P_pac_act, P_chaud_act, P_tirage_act = res.T, res.P_pac, res.P_chaud, res.P_tirage
+bilan = res.bilan
+
+with st.sidebar:
+    st.caption(f"🗄️ Cache simulation : {cache.hits} succès / {cache.misses} calculs ({len(cache)} en mémoire)")
+if etat_initial is not None:
+    afficher_regime(regime)
+if tache is not None:
+    st.progress(tache.progression, text=f"⏳ Ballon stratifié : {res.bilan.duree / 3600:.0f} h simulées sur 24, "
+                                        "résultats partiels ci-dessous")
 
 # --- Graphiques ---
 with col_graph:
+    h_debut, h_fin = st.slider("Fenêtre affichée (h)", 0.0, 24.0, (0.0, 24.0), 0.25)
+    h_fin = max(h_fin, h_debut + 0.25)
+    # Décimation à la largeur du graphique, recalculée depuis la pleine résolution à chaque zoom
+    with prof.etape("décimation"):
+        idx = indices_affichage(time_array, [T, P_pac_act, P_chaud_act, P_tirage_act],
+                                n_pixels=1000, x_min=h_debut * 3600, x_max=h_fin * 3600)
+    h_plot = time_array[idx] / 3600
+    prof.compter("points_traces", len(idx))
+
+with col_graph, prof.etape("graphiques"):
     fig1, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
-    ax1.plot(time_array/3600, T, color='#007bff', lw=2, label="Température Ballon")
+    if stratifie:
+        ax1.plot(h_plot, res.T_couches[idx, -1], color='#d62728', lw=1, label="Haut de cuve")
+        ax1.plot(h_plot, res.T_couches[idx, 0], color='#17becf', lw=1, label="Bas de cuve")
+    ax1.plot(h_plot, T[idx], color='#007bff', lw=2, label="Température Sonde" if stratifie else "Température Ballon")
     ax1.axhline(T_cons, color='red', ls='--', alpha=0.5, label="Consigne")
     ax1.set_ylabel("Température (°C)")
     ax1.legend()
     ax1.grid(True, alpha=0.2)
 
-    ax2.stackplot(time_array/3600, P_pac_act/1000, P_chaud_act/1000, 
+    ax2.stackplot(h_plot, P_pac_act[idx]/1000, P_chaud_act[idx]/1000, 
                   labels=["Puissance PAC", "Puissance Chaudière"], 
                   colors=['#ffa500', '#ff4500'], alpha=0.7)
-    ax2.plot(time_array/3600, P_tirage_act/1000, color='black', lw=1, label="Tirage (Demande)")
+    ax2.plot(h_plot, P_tirage_act[idx]/1000, color='black', lw=1, label="Tirage (Demande)")
     ax2.set_ylabel("Puissance (kW)")
     ax2.set_xlabel("Heures de la journée")
-    ax2.set_xlim(0, 24)
+    ax2.set_xlim(h_debut, h_fin)
     ax2.legend(loc='upper right')
     ax2.grid(True, alpha=0.2)
     st.pyplot(fig1)
@@ -137,15 +227,15 @@ with col_graph:
 st.divider()
 st.subheader("📊 Bilan Énergétique Récapitulatif")
 
-e_th_pac = np.sum(P_pac_act * dt) / 3600000
-e_elec_pac = e_th_pac / cop_moyen
+e_th_pac = bilan.e_th_pac
+e_elec_pac = bilan.e_elec_pac(cop_moyen)
 e_enr = e_th_pac - e_elec_pac
-e_th_chaud = np.sum(P_chaud_act * dt) / 3600000
+e_th_chaud = bilan.e_th_chaud
 e_total_gen = e_th_pac + e_th_chaud
 
-e_utile = np.sum(P_tirage_act * dt) / 3600000
-e_pertes_statiques = np.sum((ua_ballon * (T - T_amb)) * dt) / 3600000
-e_pertes_bouclage = (P_bouclage_kW * 24)
+e_utile = bilan.e_tirage
+e_pertes_statiques = bilan.e_pertes_cuve
+e_pertes_bouclage = bilan.e_bouclage
 
 c1, c2, c3 = st.columns(3)
 with c1:
@@ -161,16 +251,158 @@ with c2:
 with c3:
     cop_sys = e_utile / (e_elec_pac + e_th_chaud) if (e_elec_pac + e_th_chaud) > 0 else 0
     st.metric("COP Système Global", f"{cop_sys:.2f}")
-    st.write(f"Temps de marche PAC : {format_duration(np.sum(P_pac_act > 0) * dt)}")
+    st.write(f"Temps de marche PAC : {format_duration(bilan.temps_marche_pac)}")
+    st.write(f"Fermeture du bilan : {bilan.residu:.3f} kWh (dont écrêtage {bilan.e_ecretee:.3f} kWh)")
 
 # --- Camembert ---
 if e_total_gen > 0:
     st.write("### Répartition de l'énergie finale consommée")
-    fig2, ax_pie = plt.subplots(figsize=(5, 4))
-    ax_pie.pie([e_enr, e_elec_pac, e_th_chaud], 
-                labels=['EnR (Air)', 'Élec PAC', 'Chaudière'], 
-                autopct='%1.1f%%', colors=['#4CAF50', '#FFC107', '#FF5722'], 
-                startangle=90, pctdistance=0.85)
-    centre_circle = plt.Circle((0,0),0.70,fc='white')
-    fig2.gca().add_artist(centre_circle)
-    st.pyplot(fig2)
\ No newline at end of file
+    with prof.etape("camembert"):
+        fig2, ax_pie = plt.subplots(figsize=(5, 4))
+        ax_pie.pie([e_enr, e_elec_pac, e_th_chaud], 
+                    labels=['EnR (Air)', 'Élec PAC', 'Chaudière'], 
+                    autopct='%1.1f%%', colors=['#4CAF50', '#FFC107', '#FF5722'], 
+                    startangle=90, pctdistance=0.85)
+        centre_circle = plt.Circle((0,0),0.70,fc='white')
+        fig2.gca().add_artist(centre_circle)
+        st.pyplot(fig2)
+# --- Dimensionnement automatique ---
+with st.expander("🎯 Dimensionnement automatique"):
+    libelles = {"S_serpentin": "Surface du serpentin (m²)", "V_ball": "Volume (L)", "P_pac_nom": "P. Nominale PAC (kW)"}
+    d1, d2, d3, d4 = st.columns(4)
+    variable = d1.selectbox("Variable", list(VARIABLES), format_func=libelles.get)
+    part_max = d2.number_input("Part chaudière max (%)", 0.0, 100.0, 10.0)
+    T_min_req = d3.number_input("T° ballon mini (°C)", 5.0, 70.0, 50.0)
+    dem_max = d4.number_input("Démarrages max par heure", 1, 20, 3)
+    # La carte fixe la puissance PAC : dimensionner celle-ci n'a de sens qu'à puissance nominale
+    perf_dim = None if variable == "P_pac_nom" else performances
+    if performances is not None and perf_dim is None:
+        st.warning("⚠️ La carte de performances remplace la puissance nominale : la PAC est dimensionnée "
+                   "sans la carte (puissance nominale et COP moyen).")
+    if st.button("Dimensionner"):
+        # Évaluations sur une journée après un jour de préchauffe (profil horaire ou puisages),
+        # partagées avec le cache des courbes
+        with prof.etape("dimensionnement", cache=cache):
+            dim = dimensionner(params, profil, variable, Contraintes(part_max, T_min_req, dem_max), cache=cache,
+                               performances=perf_dim)
+        prof.compter("simulations_dimensionnement", dim.n_simulations)
+        if dim.faisable:
+            st.success(f"{libelles[variable]} minimale : {dim.valeur:.2f} ({dim.n_simulations} simulations)")
+        else:
+            st.error(f"Contraintes non tenues même à {VARIABLES[variable][1]:g} ({dim.n_simulations} simulations)")
+        st.dataframe(pd.DataFrame({
+            libelles[variable]: [e.valeur for e in dim.evaluations],
+            "Part chaudière (%)": [e.bilan.part_chaudiere for e in dim.evaluations],
+            "T° mini (°C)": [e.bilan.T_min for e in dim.evaluations],
+            "Démarrages / h": [e.demarrages_h for e in dim.evaluations],
+            "Faisable": [e.faisable for e in dim.evaluations],
+        }), hide_index=True)
+
+# --- Monte Carlo sur des profils aléatoires ---
+with st.expander("🎲 Monte Carlo : journées aléatoires autour du profil"):
+    m1, m2, m3, m4, m5 = st.columns(5)
+    n_mc = m1.number_input("Journées", 100, 100000, 2000, step=100)
+    cv_volume = m2.number_input("Variation du volume (%)", 0.0, 100.0, 20.0) / 100
+    cv_horaire = m3.number_input("Variation horaire (%)", 0.0, 200.0, 30.0) / 100
+    jitter_min = m4.number_input("Décalage des créneaux (min)", 0.0, 180.0, 30.0)
+    graine = m5.number_input("Graine", 0, 2**31 - 1, 0)
+    T_critique = st.number_input("T° critique (°C)", 20.0, 70.0, 45.0)
+    alea = Alea(cv_volume, cv_horaire, jitter_min)
+    cle_mc = cle_stable("monte_carlo", params, soutirage, n_mc, graine, alea, performances)
+    if st.button("Lancer le Monte Carlo") or cle_mc in cache:
+        with st.spinner("Simulation des journées sur tous les cœurs..."), prof.etape("monte carlo", cache=cache):
+            mc = cache.obtenir_ou_calculer(cle_mc, lambda: simuler_monte_carlo(params, profil, n_mc, graine, alea,
+                                                                                performances=performances))
+        stats = mc.percentiles(("e_th_pac", "e_th_chaud", "e_tirage", "e_pertes_cuve", "part_chaudiere", "T_min", "demarrages"),
+                               q=(5, 50, 95))
+        st.metric(f"Probabilité que le ballon passe sous {T_critique:g} °C", f"{mc.probabilite_sous('T_min', T_critique) * 100:.1f} %")
+        st.dataframe(pd.DataFrame(stats).T.rename(columns=lambda q: f"P{q}"), use_container_width=True)
+        fig_mc, (ax_c, ax_t) = plt.subplots(1, 2, figsize=(10, 3))
+        ax_c.hist(mc.valeurs("e_th_chaud"), bins=40, color='#ff4500', alpha=0.7)
+        ax_c.axvline(stats["e_th_chaud"][95], color='black', ls='--', label="P95")
+        ax_c.set_xlabel("Énergie chaudière (kWh/j)")
+        ax_c.legend()
+        ax_t.hist(mc.valeurs("T_min"), bins=40, color='#007bff', alpha=0.7)
+        ax_t.axvline(T_critique, color='red', ls='--')
+        ax_t.set_xlabel("T° mini du jour (°C)")
+        st.pyplot(fig_mc)
+
+# --- Front de Pareto ---
+with st.expander("🧭 Front de Pareto : énergie chaudière / démarrages PAC / investissement"):
+    libelles_pareto = {
+        "V_ball": "Volume (L)", "S_serpentin": "Surface du serpentin (m²)", "P_pac_nom": "P. Nominale PAC (kW)",
+        "P_chaud_nom": "P. Nominale Chaudière (kW)", "t_secours_min": "Temporisation secours (min)",
+    }
+    choisies = st.multiselect("Variables explorées (les autres restent à leur valeur de la barre latérale)",
+                              list(VARIABLES_PARETO), default=list(VARIABLES_PARETO), format_func=libelles_pareto.get)
+    bornes_pareto = {}
+    for col, v in zip(st.columns(max(len(choisies), 1)), choisies):
+        bas, haut, resolution = VARIABLES_PARETO[v]
+        bornes_pareto[v] = (*col.slider(libelles_pareto[v], bas, haut, (bas, haut), resolution), resolution)
+    x1, x2, x3 = st.columns(3)
+    n_eval = x1.number_input("Budget (dimensionnements)", 20, 5000, 300, step=20)
+    T_min_pareto = x2.number_input("T° ballon mini exigée (°C)", 5.0, 70.0, 50.0, key="T_min_pareto")
+    graine_pareto = x3.number_input("Graine", 0, 2**31 - 1, 0, key="graine_pareto")
+    prix = {v: c.number_input(f"Prix {unite}", 0.0, 10000.0, PRIX[v], key=f"prix_{v}")
+            for (v, unite), c in zip((("V_ball", "ballon (€/L)"), ("S_serpentin", "serpentin (€/m²)"),
+                                      ("P_pac_nom", "PAC (€/kW)"), ("P_chaud_nom", "chaudière (€/kW)")),
+                                     st.columns(4))}
+    # Comme pour le dimensionnement : la carte remplace la puissance PAC explorée
+    perf_pareto = None if "P_pac_nom" in choisies else performances
+    if performances is not None and perf_pareto is None:
+        st.warning("⚠️ La carte de performances remplace la puissance nominale : le front est exploré "
+                   "sans la carte (puissance nominale et COP moyen).")
+    cle_pareto = cle_stable("exploration", params, soutirage, perf_pareto, choisies, bornes_pareto, n_eval,
+                            T_min_pareto, prix, graine_pareto)
+    exploration = cache.obtenir(cle_pareto) if choisies and cle_pareto in cache else None
+    if choisies and (st.button("Explorer") or exploration is not None):
+        if exploration is None:
+            barre = st.progress(0.0)
+            with prof.etape("front de Pareto", cache=cache_exploration()):
+                for exploration in explorer_flux(params, profil, choisies, bornes_pareto, n_eval,
+                                                 T_min=T_min_pareto, prix=prix, graine=graine_pareto,
+                                                 cache=cache_exploration(), performances=perf_pareto):
+                    barre.progress(len(exploration.points) / exploration.n_budget,
+                                   text=f"{len(exploration.points)} dimensionnements, {len(exploration.front)} sur le front")
+            barre.empty()
+            prof.compter("simulations_pareto", exploration.n_simulations)
+            cache.mettre(cle_pareto, exploration)
+        st.caption(f"{len(exploration.points)} dimensionnements évalués, dont {exploration.n_simulations} simulés "
+                   f"(les autres lus dans le cache disque) ; {len(exploration.front)} non dominés")
+        noms = {**libelles_pareto, "e_th_chaud": "Énergie chaudière (kWh/j)", "demarrages": "Démarrages PAC / j",
+                "investissement": "Investissement (€)", "T_min": "T° mini (°C)", "demarrages_h": "Démarrages / h max",
+                "faisable": "T° mini tenue"}
+        df_front = exploration.vers_dataframe()
+        selection = st.dataframe(df_front.rename(columns=noms), hide_index=True, on_select="rerun",
+                                 selection_mode="single-row", key="table_pareto")
+        df_tous = exploration.vers_dataframe(front_seul=False)
+        df_tous["Statut"] = np.where(df_tous["faisable"], "dominé", "T° mini non tenue")
+        sur_front = df_tous[list(exploration.variables)].apply(tuple, axis=1).isin(
+            df_front[list(exploration.variables)].apply(tuple, axis=1))
+        df_tous.loc[sur_front, "Statut"] = "front"
+        if selection.selection.rows:
+            choisi = df_front.iloc[selection.selection.rows[0]][list(exploration.variables)]
+            df_tous.loc[(df_tous[list(exploration.variables)] == choisi).all(axis=1), "Statut"] = "sélection"
+            st.info(" ; ".join(f"{libelles_pareto[v]} : {choisi[v]:g}" for v in exploration.variables))
+        df_tous = df_tous.rename(columns=noms)
+        g1, g2 = st.columns(2)
+        for g, y in ((g1, "e_th_chaud"), (g2, "demarrages")):
+            g.scatter_chart(df_tous, x=noms["investissement"], y=noms[y], color="Statut")
+
+# --- Performance ---
+if prof.actif:
+    prof.terminer()
+    with st.expander("⏱️ Performance"):
+        st.caption(f"Script complet : {prof.total:.3f} s")
+        st.dataframe(prof.vers_dataframe(), hide_index=True)
+        st.write(prof.compteurs)
+        e1, e2 = st.columns(2)
+        e1.download_button("Exporter (JSON)", prof.vers_json(), "performance.json", "application/json")
+        if prof.avec_cprofile:
+            e2.download_button("Exporter (pstats)", prof.octets_pstats(), "profil.pstats")
+            st.code(prof.resume_pstats())
+
+# Résultats partiels : rafraîchissement tant que la tâche de fond avance
+if tache is not None:
+    time.sleep(0.5)
+    st.rerun()
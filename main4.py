@@ -1,5 +1,6 @@
 import streamlit as st
-import numpy as np
+
+from simu_ecs.echange import echange_serpentin
 
 st.set_page_config(page_title="Dimensionnement Serpentin PAC", layout="centered")
 
@@ -31,15 +32,9 @@ DT2 = T_sortie - T_ballon
 if DT1 <= 0 or DT2 <= 0:
     st.error("⚠️ Les températures ne permettent pas d'échange thermique (ΔT <= 0).")
 else:
-    # Delta T logarithmique
-    DTlm = (DT1 - DT2) / np.log(DT1 / DT2)
-
-    # Puissance échangée
-    P = U * surface * DTlm   # Watts
-
-    # Débit nécessaire
-    m_dot = P / (Cp * delta_T)  # kg/s
-    Q_m3_h = m_dot * 3600 / rho
+    # Delta T logarithmique, puissance échangée (W) et débit nécessaire (m³/h)
+    echange = echange_serpentin(T_depart, delta_T, T_ballon, U, surface)
+    DTlm, P, Q_m3_h = echange.dT_lm, echange.P, echange.debit
 
     # --- Affichage résultats ---
     st.divider()
@@ -56,3 +51,4 @@ else:
         st.metric("Température retour PAC", f"{T_sortie:.1f} °C")
 
     st.info("💡 La puissance réelle sera limitée par la PAC si P dépasse sa puissance nominale.")
+
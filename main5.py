@@ -1,7 +1,16 @@
+import tempfile
+
 import streamlit as st
 import numpy as np
 import pandas as pd
 
+from simu_ecs import cle_stable, format_duration
+from simu_ecs.chauffe import chauffe_serpentin
+from simu_ecs.echange import echange_serpentin
+from simu_ecs.profilage import Profileur
+from simu_ecs.rendu import indices_minmax
+from simu_ecs.stockage import Enregistreur, ouvrir
+
 st.title("🔥 Chauffe ballon ECS – PAC limitée + bilan énergétique")
 
 # -----------------------
@@ -23,7 +32,12 @@ T_init = st.sidebar.number_input("Température initiale ballon (°C)", value=20.
 T_consigne = st.sidebar.number_input("Température consigne ballon (°C)", value=55.0)
 Volume = st.sidebar.number_input("Volume ballon (litres)", value=300.0)
 
-dt = st.sidebar.number_input("Pas de temps (secondes)", value=10)
+dt = st.sidebar.number_input("Pas d'affichage (secondes)", value=10, help="La durée de chauffe est calculée exactement, ce pas ne fixe que les lignes du tableau")
+
+st.sidebar.header("⏱️ Performance")
+mesurer = st.sidebar.checkbox("Mesurer les étapes", help="Chronomètres et compteurs, affichés en bas de page")
+avec_cprofile = st.sidebar.checkbox("Profil cProfile complet", disabled=not mesurer)
+prof = Profileur(actif=mesurer, cprofile=avec_cprofile)
 
 # -----------------------
 # ⚙️ Constantes physiques
@@ -34,100 +48,111 @@ cp = 4180         # J/kg/K
 m_ballon = Volume / 1000 * rho
 P_pac_max = P_pac_max_kw * 1000   # W
 
-# -----------------------
-# 🧮 Fonctions
-# -----------------------
-
-def calcul_echange(T_ballon):
-    """
-    Retourne :
-    - Puissance réelle injectée (W)
-    - Débit primaire (m3/h)
-    - Température sortie serpentin (°C)
-    - DeltaTlm (K)
-    - Puissance théorique serpentin (W)
-    """
-
-    # Température sortie primaire imposée par deltaT PAC
-    T_sortie = T_depart - DeltaT_primaire
-    T_sortie = max(T_sortie, T_ballon)
-
-    dT1 = T_depart - T_ballon
-    dT2 = max(T_sortie - T_ballon, 0.01)
-
-    if abs(dT1 - dT2) < 1e-6:
-        DeltaT_lm = dT1
-    else:
-        DeltaT_lm = (dT1 - dT2) / np.log(dT1 / dT2)
-
-    # Puissance échangeur théorique
-    P_serpentin = U * S * DeltaT_lm   # W
-
-    # Limitation par la PAC
-    P_reelle = min(P_serpentin, P_pac_max)
-
-    # Débit cohérent avec la puissance réelle
-    m_dot = P_reelle / (cp * DeltaT_primaire)   # kg/s
-    debit_m3_h = m_dot * 3600 / rho
-
-    return P_reelle, debit_m3_h, T_sortie, DeltaT_lm, P_serpentin
+COLONNES_CHAUFFE = ("t", "T", "P", "P_serpentin", "debit")
+LIBELLES = {
+    "t": "Temps (min)",
+    "T": "Température ballon (°C)",
+    "P": "Puissance réelle (kW)",
+    "P_serpentin": "Puissance serpentin théorique (kW)",
+    "debit": "Débit primaire (m3/h)",
+}
 
 # -----------------------
 # ▶️ Simulation
 # -----------------------
 
-if st.button("▶️ Lancer la simulation"):
-
-    T = T_init
-    t = 0
-
-    temps = []
-    temperatures = []
-    puissances = []
-    puissances_serp = []
-    debits = []
-
-    while T < T_consigne and t < 6 * 3600:
-
-        P, debit, T_sortie, DeltaT_lm, P_serp = calcul_echange(T)
-
-        # Bilan énergétique ballon
-        dT = (P * dt) / (m_ballon * cp)
-        T = T + dT
-        t = t + dt
+entrees = cle_stable(U, S, T_depart, DeltaT_primaire, P_pac_max, T_init, T_consigne, Volume, dt)
 
-        temps.append(t / 60)
-        temperatures.append(T)
-        puissances.append(P / 1000)
-        puissances_serp.append(P_serp / 1000)
-        debits.append(debit)
-
-    df = pd.DataFrame({
-        "Temps (min)": temps,
-        "Température ballon (°C)": temperatures,
-        "Puissance réelle (kW)": puissances,
-        "Puissance serpentin théorique (kW)": puissances_serp,
-        "Débit primaire (m3/h)": debits
-    })
+if st.button("▶️ Lancer la simulation"):
 
+    # Durée exacte par régimes (PAC limitante, serpentin limitant), courbes échantillonnées au pas d'affichage
+    with prof.etape("chauffe"):
+        chauffe = chauffe_serpentin(T_init, T_consigne, Volume, U, S, T_depart, DeltaT_primaire, P_pac_max)
+    with prof.etape("échantillonnage"):
+        t_aff = np.append(np.arange(dt, chauffe.duree, dt), chauffe.duree)
+        temperatures = chauffe.temperatures(t_aff)
+        echange = echange_serpentin(T_depart, DeltaT_primaire, temperatures, U, S, P_pac_max)
+    prof.compter("regimes", len(chauffe.regimes))
+    prof.compter("lignes", len(t_aff))
+
+    # Séries écrites sur disque (une page par heure), relues page par page à l'affichage.
+    # Le dossier temporaire appartient à la session : supprimé quand une simulation le
+    # remplace, quand la session est libérée ou à l'arrêt du serveur.
+    with prof.etape("écriture"):
+        precedent = st.session_state.pop("chauffe", None)
+        if precedent is not None:
+            precedent[2].cleanup()
+        dossier = tempfile.TemporaryDirectory(prefix="chauffe_")
+        with Enregistreur(dossier.name, len(t_aff), dt, duree_page=3600, colonnes=COLONNES_CHAUFFE) as ecriture:
+            ecriture.ajouter(t=t_aff, T=temperatures, P=echange.P / 1000,
+                             P_serpentin=echange.P_serpentin / 1000, debit=echange.debit)
+    st.session_state["chauffe"] = (entrees, chauffe, dossier)
     st.success("Simulation terminée ✅")
 
+dernier = st.session_state.get("chauffe")
+if dernier is not None and dernier[0] != entrees:
+    st.info("Paramètres modifiés : relancer la simulation.")
+elif dernier is not None:
+    _, chauffe, dossier = dernier
+    run = ouvrir(dossier.name)
+
+    c1, c2 = st.columns(2)
+    c1.metric("Temps de chauffe", format_duration(chauffe.duree))
+    c2.metric("Énergie injectée", f"{chauffe.energie:.2f} kWh")
+    if not chauffe.atteinte:
+        st.warning(f"⚠️ Consigne non atteinte en 6 h : {chauffe.T_final:.2f} °C")
+    for T_b, t_b, regime in chauffe.bascules:
+        st.write(f"🔀 Bascule vers le régime « {regime} » à **{T_b:.3f} °C** ({t_b / 60:.1f} min)")
+
     # -----------------------
     # 📈 Graphiques
     # -----------------------
 
-    st.subheader("🌡️ Température ballon")
-    st.line_chart(df.set_index("Temps (min)")["Température ballon (°C)"])
+    with prof.etape("graphiques"):
+        # Courbes décimées page par page (min/max par paquet) : une seule heure lue à la fois
+        n_pixels = max(1000 // run.n_pages, 50)
+        morceaux = []
+        for page in run.pages():
+            idx = indices_minmax([page[c] for c in COLONNES_CHAUFFE[1:]], n_pixels)
+            morceaux.append({c: page[c][idx] for c in COLONNES_CHAUFFE})
+        df = pd.DataFrame({LIBELLES[c]: np.concatenate([m[c] for m in morceaux]) for c in COLONNES_CHAUFFE})
+        prof.compter("points tracés", len(df))
+        df["Temps (min)"] /= 60
+
+        st.subheader("🌡️ Température ballon")
+        st.line_chart(df.set_index("Temps (min)")["Température ballon (°C)"])
+
+        st.subheader("⚡ Puissance : PAC vs serpentin")
+        st.line_chart(
+            df.set_index("Temps (min)")[
+                ["Puissance réelle (kW)", "Puissance serpentin théorique (kW)"]
+            ]
+        )
+
+        st.subheader("🚿 Débit primaire")
+        st.line_chart(df.set_index("Temps (min)")["Débit primaire (m3/h)"])
+
+    with prof.etape("tableau détaillé"):
+        st.subheader("📊 Résultats détaillés")
+        heure = st.number_input(f"Heure affichée (sur {run.n_pages})", 1, run.n_pages, 1) - 1
+        T_page = run.agregats("T")
+        st.caption(f"T° ballon sur l'heure : {T_page['min'][heure]:.1f} → {T_page['max'][heure]:.1f} °C")
+        page = run.page_dataframe(heure).rename(columns=LIBELLES)
+        page["Temps (min)"] /= 60
+        st.dataframe(page, hide_index=True)
 
-    st.subheader("⚡ Puissance : PAC vs serpentin")
-    st.line_chart(
-        df.set_index("Temps (min)")[
-            ["Puissance réelle (kW)", "Puissance serpentin théorique (kW)"]
-        ]
-    )
-
-    st.subheader("🚿 Débit primaire")
-    st.line_chart(df.set_index("Temps (min)")["Débit primaire (m3/h)"])
+# -----------------------
+# ⏱️ Performance
+# -----------------------
 
-    st.subheader("📊 Résultats détaillés")
-    st.dataframe(df)
+if prof.actif:
+    prof.terminer()
+    with st.expander("⏱️ Performance"):
+        st.caption(f"Script complet : {prof.total:.3f} s")
+        st.dataframe(prof.vers_dataframe(), hide_index=True)
+        st.write(prof.compteurs)
+        e1, e2 = st.columns(2)
+        e1.download_button("Exporter (JSON)", prof.vers_json(), "performance.json", "application/json")
+        if prof.avec_cprofile:
+            e2.download_button("Exporter (pstats)", prof.octets_pstats(), "profil.pstats")
+            st.code(prof.resume_pstats())
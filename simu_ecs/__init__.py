@@ -0,0 +1,41 @@
+"""
+Physique des simulateurs ECS (PAC + chaudière + ballon), sans dépendance à Streamlit
+(hors interface.py, réservé aux applications).
+
+Les noms ci-dessous sont importés à la première utilisation (from simu_ecs import X
+charge alors le module qui le définit) : importer un sous-module, comme le lanceur
+en ligne de commande, ne charge ni NumPy ni les autres moteurs.
+"""
+import importlib
+
+_MODULES = {
+    "parametres": ("CP_WATER", "HEATING", "MODELES", "OFF", "RHO_WATER", "STARTING", "Parametres",
+                   "format_duration", "puissance_puisage", "puissance_tirage"),
+    "profils": ("ProfilTirage",),
+    "puisages": ("Puisages",),
+    "resultats": ("Bilan", "EtatSimulation", "Resultat"),
+    "evenements": ("simuler", "simuler_journee"),
+    "reference": ("simuler_pas_fixe",),
+    "lot": ("BilanLot", "MoteurLot", "grille", "simuler_lot"),
+    "parc": ("lire_parc", "simuler_parc", "simuler_parc_flux"),
+    "annuel": ("eau_froide_saisonniere", "simuler_annee", "simuler_flux"),
+    "cache": ("CacheResultats", "cle_stable"),
+    "carte_pac": ("CartePAC", "PerformancesPAC", "lire_temperatures"),
+    "stratifie": ("simuler_stratifie",),
+    "pilotage": ("Programme", "cout_simulation", "lire_tarifs", "optimiser"),
+    "periodique": ("RegimePeriodique", "regime_periodique"),
+}
+_ORIGINE = {nom: module for module, noms in _MODULES.items() for nom in noms}
+__all__ = list(_ORIGINE)
+
+
+def __getattr__(nom):
+    if nom not in _ORIGINE:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    valeur = getattr(importlib.import_module("." + _ORIGINE[nom], __name__), nom)
+    globals()[nom] = valeur
+    return valeur
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,113 @@
+"""
+Simulation annuelle (8760 h) en flux.
+
+L'année est simulée jour par jour avec le moteur par événements en reportant l'état
+d'un jour sur l'autre. Le générateur produit des blocs d'un jour ou d'une semaine ;
+les bilans sont cumulés au fil de l'eau et l'année complète n'est jamais gardée en
+mémoire, sauf demande explicite (conserver_series=True).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .evenements import simuler
+from .profils import ProfilTirage
+from .resultats import Bilan, EtatSimulation, Resultat
+
+JOURS_AN = 365
+TAILLES_BLOC = {"jour": 1, "semaine": 7}
+
+
+def eau_froide_saisonniere(T_moy=12.0, amplitude=4.0, jour_min=45, n_jours=JOURS_AN):
+    """T° d'eau froide journalière, sinusoïde annuelle de minimum au jour `jour_min`."""
+    j = np.arange(n_jours)
+    return T_moy - amplitude * np.cos(2 * np.pi * (j - jour_min) / JOURS_AN)
+
+
+@dataclass
+class Bloc:
+    """Un bloc de l'année : séries (ou None), bilan du bloc, cumul depuis le début et état final."""
+    jour_debut: int
+    n_jours: int
+    t: np.ndarray
+    T: np.ndarray
+    P_pac: np.ndarray
+    P_chaud: np.ndarray
+    P_tirage: np.ndarray
+    bilan: Bilan
+    cumul: Bilan
+    etat: EtatSimulation
+
+
+def _profil_du_jour(j, hour_volumes, hour_volumes_weekend, premier_jour):
+    if hour_volumes_weekend is not None and (premier_jour + j) % 7 >= 5:
+        return hour_volumes_weekend
+    return hour_volumes
+
+
+def simuler_flux(p, hour_volumes, hour_volumes_weekend=None, T_eau_froide=None,
+                 n_jours=JOURS_AN, premier_jour=0, dt=10, bloc="jour", series=True, etat=None,
+                 performances=None):
+    """
+    Générateur de blocs d'un jour ou d'une semaine.
+
+    hour_volumes         : profil horaire des jours ouvrés (L/h à 60°C)
+    hour_volumes_weekend : profil du samedi et du dimanche (par défaut le même)
+    T_eau_froide         : T° d'eau froide par jour (n_jours,), scalaire ou None (p.T_eau_froide)
+    premier_jour         : jour de la semaine du 1er jour simulé (0 = lundi)
+    series               : False pour ne produire que les bilans (aucune série allouée)
+    performances         : carte_pac.PerformancesPAC, typiquement avec 8760 T° extérieures horaires
+    """
+    if bloc not in TAILLES_BLOC:
+        raise ValueError(f"Bloc inconnu : {bloc!r} (attendu : {', '.join(TAILLES_BLOC)})")
+    if T_eau_froide is None:
+        T_eau_froide = p.T_eau_froide
+    T_ef = np.broadcast_to(np.asarray(T_eau_froide, dtype=float), (n_jours,))
+    s = EtatSimulation.initial(p) if etat is None else etat.copie()
+    cumul = Bilan()
+    taille = TAILLES_BLOC[bloc]
+
+    for debut in range(0, n_jours, taille):
+        fin = min(debut + taille, n_jours)
+        bilan_bloc = Bilan()
+        morceaux = []
+        for j in range(debut, fin):
+            p_j = p.remplacer(T_eau_froide=float(T_ef[j]))
+            hv = _profil_du_jour(j, hour_volumes, hour_volumes_weekend, premier_jour)
+            profil = ProfilTirage.horaire(hv, p_j.T_eau_froide)
+            t_sortie = s.t + np.arange(0, 86400, dt) if series else None
+            res = simuler(p_j, profil, duree=86400, t_sortie=t_sortie, etat=s, performances=performances)
+            s = res.etat_final
+            bilan_bloc = bilan_bloc.cumuler(res.bilan)
+            if series:
+                morceaux.append(res)
+        cumul = cumul.cumuler(bilan_bloc)
+        if series:
+            t, T, P_pac, P_chaud, P_tirage = (
+                np.concatenate([getattr(r, c) for r in morceaux])
+                for c in ("t", "T", "P_pac", "P_chaud", "P_tirage")
+            )
+        else:
+            t = T = P_pac = P_chaud = P_tirage = None
+        yield Bloc(debut, fin - debut, t, T, P_pac, P_chaud, P_tirage, bilan_bloc, cumul, s.copie())
+
+
+def simuler_annee(p, hour_volumes, conserver_series=False, **options):
+    """
+    Simule l'année et retourne un Resultat. Sans conserver_series, seules les
+    grandeurs cumulées sont gardées (les séries du Resultat valent None).
+    """
+    options.setdefault("bloc", "semaine")
+    bilan, etat = Bilan(), None
+    morceaux = []
+    for b in simuler_flux(p, hour_volumes, series=conserver_series, **options):
+        bilan, etat = b.cumul, b.etat
+        if conserver_series:
+            morceaux.append(b)
+    if not conserver_series:
+        return Resultat(None, None, None, None, None, bilan, etat)
+    t, T, P_pac, P_chaud, P_tirage = (
+        np.concatenate([getattr(b, c) for b in morceaux])
+        for c in ("t", "T", "P_pac", "P_chaud", "P_tirage")
+    )
+    return Resultat(t, T, P_pac, P_chaud, P_tirage, bilan, etat)
@@ -0,0 +1,308 @@
+"""
+Banc de mesure des moteurs : vitesse, mémoire et précision.
+
+    python -m simu_ecs.bench                              # toutes les mesures
+    python -m simu_ecs.bench --horizons jour semaine --dt 10 60
+    python -m simu_ecs.bench --enregistrer base.json      # référence de la machine
+    python -m simu_ecs.bench --comparer base.json         # code de sortie 1 si régression
+
+Cas mesurés (un par modèle de puissance pac_fixe / echangeur / serpentin quand il
+y a lieu) :
+- pas_fixe    : boucles de main.py, main2.py, main3_serp.py (reference.py) ;
+- evenements  : moteur exact, séries échantillonnées au pas dt ;
+- lot         : MoteurLot, LOT_VOIES voies identiques (débit compté en voies x pas) ;
+- stratifie   : ballon à STRAT_COUCHES couches ;
+- chauffe_serpentin (main5.py) et chauffe_modulee (app_serpentin_pac.py) : montée
+  en température, courbe échantillonnée au pas dt.
+
+Pour chaque cas : temps (meilleur de plusieurs passages), débit en pas/s (durée / dt)
+et pic mémoire (tracemalloc, passage séparé). La précision est l'écart sur
+e_th_pac, e_th_chaud, demarrages et T_final à la référence dt = 1 s du même modèle
+(boucle à pas fixe ; Euler explicite à 1 s pour les chauffes). Quand la référence
+dépasse le budget de calcul, le moteur par événements, limite exacte dt -> 0, la
+remplace. Les tolérances sont celles de TOLERANCES.
+
+Comparaison à une base : régression si le débit baisse de plus de --marge-vitesse,
+si un écart sort de sa tolérance, ou si son score (écart / tolérance) augmente de
+plus de --marge-precision.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .chauffe import chauffe_modulee, chauffe_serpentin
+from .evenements import simuler
+from .lot import simuler_lot
+from .parametres import CP_WATER, RHO_WATER, Parametres
+from .reference import simuler_pas_fixe
+from .scenarios import REPARTITION_DEFAUT
+from .stratifie import simuler_stratifie
+
+HORIZONS = {"jour": 86400, "semaine": 7 * 86400, "annee": 365 * 86400}
+PAS = (1, 10, 60)
+MODELES = ("pac_fixe", "echangeur", "serpentin")
+LOT_VOIES = 64
+STRAT_COUCHES = 50
+# Coût relatif d'un pas (pas_fixe = 1), pour le budget --max-cout
+COUTS = {"pas_fixe": 1, "evenements": 0.2, "lot": 16, "stratifie": 30, "chauffe": 0}
+TEMPS_MIN = 0.5   # durée cumulée minimale des passages chronométrés (s)
+PASSAGES_MIN = 3
+
+# Tolérances d'écart à la référence dt = 1 s
+# énergies : fraction de l'énergie produite par la référence (PAC + chaudière)
+# demarrages : max(par jour simulé, fraction des démarrages de la référence)
+# T_final : K ; un cycle décalé de quelques minutes place T_final n'importe où dans
+# la bande de relance (dT_restart = 5 K par défaut), d'où une tolérance de sa largeur
+TOLERANCES = {
+    "e_th_pac": 0.05,
+    "e_th_chaud": 0.05,
+    "demarrages": (1.0, 0.1),
+    "T_final": 5.0,
+}
+# Chauffes : durée (fraction), énergie (fraction), T_final (K)
+TOLERANCES_CHAUFFE = {"duree": 0.02, "energie": 0.02, "T_final": 0.1}
+
+
+def _hour_volumes(volume_jour=1500.0):
+    return np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * volume_jour
+
+
+def _indicateurs(bilan, k=None):
+    """Indicateurs comparés d'un Bilan (ou de la voie k d'un BilanLot)."""
+    v = {c: getattr(bilan, c) for c in ("e_th_pac", "e_th_chaud", "demarrages", "T_final")}
+    if k is not None:
+        v = {c: x[k] for c, x in v.items()}
+    return {c: float(x) for c, x in v.items()}
+
+
+# --- Cas de mesure ---
+# Chaque fonction simule et retourne (indicateurs, nombre de pas comptés pour le débit)
+
+def _cas_pas_fixe(modele, duree, dt):
+    p = Parametres(modele=modele)
+    r = simuler_pas_fixe(p, _hour_volumes(), dt, duree)
+    return _indicateurs(r.bilan), duree / dt
+
+
+def _cas_evenements(modele, duree, dt):
+    p = Parametres(modele=modele)
+    r = simuler(p, _hour_volumes(), duree=float(duree), t_sortie=np.arange(0.0, duree, dt))
+    return _indicateurs(r.bilan), duree / dt
+
+
+def _cas_lot(modele, duree, dt):
+    p = Parametres(modele=modele)
+    b = simuler_lot(p, {"V_ball": np.full(LOT_VOIES, p.V_ball)}, _hour_volumes(), dt, duree)
+    return _indicateurs(b, 0), LOT_VOIES * duree / dt
+
+
+def _cas_stratifie(modele, duree, dt):
+    p = Parametres(modele=modele)
+    r = simuler_stratifie(p, _hour_volumes(), dt, duree, n_couches=STRAT_COUCHES, couches=False)
+    return _indicateurs(r.bilan), duree / dt
+
+
+def _chauffe(nom):
+    if nom == "chauffe_serpentin":
+        # Valeurs par défaut de main5.py
+        return chauffe_serpentin(20.0, 55.0, 300.0, 800.0, 5.5, 62.0, 7.0, 20000.0), 300.0
+    # Valeurs par défaut de app_serpentin_pac.py
+    return chauffe_modulee(10.0, 60.0, 1000, 600.0 * 5.5, 10.0, 7.0, 6000.0), 1000.0
+
+
+def _cas_chauffe(nom, duree, dt):
+    c, _ = _chauffe(nom)
+    t = np.append(np.arange(dt, c.duree, dt), c.duree)
+    T = c.temperatures(t)
+    c.puissance(T)
+    return {"duree": c.duree, "energie": c.energie, "T_final": c.T_final}, c.duree / dt
+
+
+def _reference_chauffe(nom, duree, dt=1.0):
+    """Euler explicite au pas dt sur la même loi P(T), comme les boucles d'origine."""
+    c, volume = _chauffe(nom)
+    m_cp = volume / 1000 * RHO_WATER * CP_WATER
+    T, t, E = c.T_init, 0.0, 0.0
+    t_max = c.duree if not c.atteinte else np.inf
+    while T < c.T_consigne and t < t_max:
+        P = float(c.puissance(T))
+        T += P * dt / m_cp
+        E += P * dt
+        t += dt
+    return {"duree": t, "energie": E / 3.6e6, "T_final": T}
+
+
+CAS = {
+    "pas_fixe": (_cas_pas_fixe, MODELES),
+    "evenements": (_cas_evenements, MODELES),
+    "lot": (_cas_lot, MODELES),
+    "stratifie": (_cas_stratifie, ("serpentin",)),
+    "chauffe_serpentin": (_cas_chauffe, (None,)),
+    "chauffe_modulee": (_cas_chauffe, (None,)),
+}
+
+
+def _chronometrer(fonction, *args):
+    """(résultat, meilleur temps) sur au moins PASSAGES_MIN passages et TEMPS_MIN secondes."""
+    meilleur, total, n, resultat = np.inf, 0.0, 0, None
+    while total < TEMPS_MIN or n < PASSAGES_MIN:
+        t0 = time.perf_counter()
+        resultat = fonction(*args)
+        dt = time.perf_counter() - t0
+        meilleur, total, n = min(meilleur, dt), total + dt, n + 1
+    return resultat, meilleur
+
+
+def _pic_memoire(fonction, *args):
+    tracemalloc.start()
+    try:
+        fonction(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _tolerance(indicateur, ref, jours):
+    """Écart admis pour un indicateur, d'après la référence et la durée simulée (jours)."""
+    if "duree" in ref:
+        tol = TOLERANCES_CHAUFFE[indicateur]
+        return tol if indicateur == "T_final" else tol * max(abs(ref[indicateur]), 1e-9)
+    if indicateur == "demarrages":
+        par_jour, fraction = TOLERANCES["demarrages"]
+        return max(par_jour * jours, fraction * ref["demarrages"])
+    if indicateur == "T_final":
+        return TOLERANCES["T_final"]
+    return TOLERANCES[indicateur] * max(ref["e_th_pac"] + ref["e_th_chaud"], 1e-9)
+
+
+def mesurer(cas=None, horizons=None, pas=PAS, max_cout=4e6, memoire=True, journal=sys.stderr):
+    """
+    Exécute le banc ; retourne {clé: mesure}, clé = "cas/modele/horizon/dt".
+    Les combinaisons dont le coût estimé dépasse max_cout sont notées "ignoré".
+    """
+    cas = list(CAS) if cas is None else cas
+    horizons = list(HORIZONS) if horizons is None else horizons
+    references = {}
+    mesures = {}
+    for nom in cas:
+        fonction, modeles = CAS[nom]
+        chauffe = nom.startswith("chauffe")
+        for modele in modeles:
+            for horizon in (["chauffe"] if chauffe else horizons):
+                duree = 0 if chauffe else HORIZONS[horizon]
+                for dt in pas:
+                    cle = "/".join(str(x) for x in (nom, modele or "-", horizon, dt))
+                    cout = COUTS["chauffe" if chauffe else nom] * duree / dt
+                    if cout > max_cout:
+                        mesures[cle] = {"statut": "ignoré", "raison": f"coût estimé {cout:.3g} > {max_cout:.3g}"}
+                        print(f"{cle} : ignoré (budget)", file=journal)
+                        continue
+                    arguments = (nom if chauffe else modele, duree, dt)
+                    (valeurs, n_pas), t = _chronometrer(fonction, *arguments)
+                    pic = _pic_memoire(fonction, *arguments) if memoire else None
+
+                    # Référence dt = 1 s du même modèle (calculée une fois)
+                    cle_ref = (nom if chauffe or nom == "stratifie" else "pas_fixe", modele, horizon)
+                    if cle_ref not in references:
+                        if chauffe:
+                            references[cle_ref] = (_reference_chauffe(nom, 0), "euler_dt1")
+                        elif COUTS[cle_ref[0]] * duree <= max_cout:
+                            fonction_ref = CAS[cle_ref[0]][0]
+                            references[cle_ref] = (fonction_ref(modele, duree, 1)[0], f"{cle_ref[0]}_dt1")
+                        elif nom != "stratifie":
+                            references[cle_ref] = (_cas_evenements(modele, duree, 3600)[0], "evenements")
+                        else:
+                            references[cle_ref] = (None, None)
+                    ref, source = references[cle_ref]
+
+                    m = {"statut": "mesuré", "temps_s": t, "pas": n_pas, "pas_par_s": n_pas / t,
+                         "memoire_pic_Mo": None if pic is None else pic / 1e6, "reference": source,
+                         "valeurs": valeurs, "ecarts": {}, "scores": {}}
+                    if ref is not None:
+                        jours = max(duree / 86400, 1)
+                        for k, v in valeurs.items():
+                            ecart = v - ref[k]
+                            m["ecarts"][k] = ecart
+                            m["scores"][k] = abs(ecart) / _tolerance(k, ref, jours)
+                    m["dans_tolerance"] = all(s <= 1 for s in m["scores"].values())
+                    mesures[cle] = m
+                    print(_ligne(cle, m), file=journal)
+    return mesures
+
+
+def _ligne(cle, m):
+    if m["statut"] != "mesuré":
+        return f"{cle:<40} ignoré"
+    memoire = "" if m["memoire_pic_Mo"] is None else f"{m['memoire_pic_Mo']:8.1f} Mo"
+    score = max(m["scores"].values(), default=float("nan"))
+    etat = "ok" if m["dans_tolerance"] else "HORS TOLÉRANCE"
+    return (f"{cle:<40} {m['temps_s']:9.4f} s {m['pas_par_s']:12.3g} pas/s {memoire} "
+            f"score {score:5.2f} ({m['reference']}) {etat}")
+
+
+def comparer(mesures, base, marge_vitesse=0.3, marge_precision=0.2):
+    """Liste des régressions (textes) de mesures par rapport à la base."""
+    regressions = []
+    for cle, m in mesures.items():
+        if m["statut"] != "mesuré":
+            continue
+        if not m["dans_tolerance"]:
+            pires = {k: round(s, 2) for k, s in m["scores"].items() if s > 1}
+            regressions.append(f"{cle} : hors tolérance {pires}")
+        b = base.get(cle)
+        if b is None or b.get("statut") != "mesuré":
+            continue
+        if m["pas_par_s"] < (1 - marge_vitesse) * b["pas_par_s"]:
+            regressions.append(f"{cle} : débit {m['pas_par_s']:.3g} pas/s < {b['pas_par_s']:.3g} "
+                               f"de la base (marge {marge_vitesse:.0%})")
+        for k, s in m["scores"].items():
+            s_base = b.get("scores", {}).get(k)
+            if s_base is not None and s > s_base + marge_precision:
+                regressions.append(f"{cle} : écart {k} dégradé (score {s:.2f} contre {s_base:.2f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simu_ecs.bench", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--cas", nargs="+", choices=list(CAS), help="cas mesurés (défaut : tous)")
+    parser.add_argument("--horizons", nargs="+", choices=list(HORIZONS), help="horizons (défaut : tous)")
+    parser.add_argument("--dt", nargs="+", type=float, default=list(PAS), help="pas de temps (s)")
+    parser.add_argument("--max-cout", type=float, default=4e6,
+                        help="budget d'une mesure, en pas de boucle à pas fixe (défaut : 4e6)")
+    parser.add_argument("--sans-memoire", action="store_true", help="ne mesure pas le pic mémoire")
+    parser.add_argument("--enregistrer", metavar="JSON", help="écrit les mesures comme base")
+    parser.add_argument("--comparer", metavar="JSON", help="compare à une base, code 1 si régression")
+    parser.add_argument("--marge-vitesse", type=float, default=0.3, help="baisse de débit tolérée (défaut : 0.3)")
+    parser.add_argument("--marge-precision", type=float, default=0.2,
+                        help="hausse tolérée du score écart / tolérance (défaut : 0.2)")
+    args = parser.parse_args(argv)
+
+    pas = [int(d) if float(d).is_integer() else d for d in args.dt]
+    mesures = mesurer(args.cas, args.horizons, pas, args.max_cout, not args.sans_memoire, journal=sys.stdout)
+
+    if args.enregistrer:
+        contenu = {"machine": {"python": platform.python_version(), "numpy": np.__version__,
+                               "processeur": platform.processor() or platform.machine()},
+                   "tolerances": TOLERANCES, "mesures": mesures}
+        with open(args.enregistrer, "w", encoding="utf-8") as f:
+            json.dump(contenu, f, indent=1, ensure_ascii=False)
+        print(f"Base écrite : {args.enregistrer}")
+
+    regressions = [f"{cle} : hors tolérance" for cle, m in mesures.items()
+                   if m["statut"] == "mesuré" and not m["dans_tolerance"]]
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            base = json.load(f)["mesures"]
+        regressions = comparer(mesures, base, args.marge_vitesse, args.marge_precision)
+    for r in regressions:
+        print(f"RÉGRESSION {r}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+"""
+Cache des résultats de simulation, indexé par une empreinte stable des entrées.
+
+Niveau mémoire LRU borné en nombre d'entrées et en âge, niveau disque optionnel
+(un fichier pickle par entrée). Les compteurs de succès/échecs sont exposés pour
+l'affichage dans les applications.
+"""
+import dataclasses
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .profils import ProfilTirage
+
+
+def _alimenter(h, obj):
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(type(obj).__name__.encode())
+        _alimenter(h, {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)})
+    elif isinstance(obj, ProfilTirage):
+        h.update(b"ProfilTirage")
+        _alimenter(h, (obj.instants, obj.puissances, obj.periode))
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=str):
+            _alimenter(h, str(k))
+            _alimenter(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for v in obj:
+            _alimenter(h, v)
+        h.update(b"]")
+    elif isinstance(obj, np.ndarray) or hasattr(obj, "__array__"):
+        a = np.ascontiguousarray(np.asarray(obj))
+        if a.dtype.kind in "iub":
+            a = a.astype(np.float64)
+        h.update(f"nd{a.dtype.str}{a.shape}".encode())
+        h.update(a.tobytes())
+    elif isinstance(obj, (bool, int, float, np.integer, np.floating)):
+        # 15 et 15.0 (number_input entier ou flottant) donnent la même clé
+        h.update(b"n" + repr(float(obj)).encode())
+    elif obj is None or isinstance(obj, str):
+        h.update(b"s" + repr(obj).encode())
+    else:
+        raise TypeError(f"Type non hachable pour le cache : {type(obj).__name__}")
+    h.update(b";")
+
+
+def cle_stable(*objets):
+    """Empreinte hexadécimale, identique d'une session à l'autre pour les mêmes entrées."""
+    h = hashlib.sha256()
+    for obj in objets:
+        _alimenter(h, obj)
+    return h.hexdigest()
+
+
+class CacheResultats:
+    """
+    Cache LRU des résultats.
+
+    max_entrees : nombre d'entrées gardées en mémoire
+    age_max     : durée de validité d'une entrée (s), None pour illimitée
+    dossier     : répertoire du niveau disque, None pour le désactiver
+    """
+
+    def __init__(self, max_entrees=32, age_max=None, dossier=None):
+        self.max_entrees = max_entrees
+        self.age_max = age_max
+        self.dossier = dossier
+        self.hits = 0
+        self.hits_disque = 0
+        self.misses = 0
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        if dossier is not None:
+            os.makedirs(dossier, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def __contains__(self, cle):
+        """Même réponse que obtenir (niveau disque compris, entrées périmées exclues), sans compter."""
+        with self._verrou:
+            if self._lire_memoire(cle) is not None:
+                return True
+            entree = self._lire_disque(cle)
+            if entree is None:
+                return False
+            self._ranger(cle, *entree)
+            return True
+
+    def _perime(self, horodatage):
+        return self.age_max is not None and time.time() - horodatage > self.age_max
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, f"{cle}.pkl")
+
+    def _lire_memoire(self, cle):
+        entree = self._entrees.get(cle)
+        if entree is None:
+            return None
+        if self._perime(entree[0]):
+            del self._entrees[cle]
+            return None
+        self._entrees.move_to_end(cle)
+        return entree
+
+    def _lire_disque(self, cle):
+        if self.dossier is None:
+            return None
+        chemin = self._chemin(cle)
+        try:
+            horodatage = os.path.getmtime(chemin)
+            if self._perime(horodatage):
+                os.remove(chemin)
+                return None
+            with open(chemin, "rb") as f:
+                return horodatage, pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _ranger(self, cle, horodatage, valeur):
+        self._entrees[cle] = (horodatage, valeur)
+        self._entrees.move_to_end(cle)
+        while len(self._entrees) > self.max_entrees:
+            self._entrees.popitem(last=False)
+
+    def obtenir(self, cle, defaut=None):
+        with self._verrou:
+            entree = self._lire_memoire(cle)
+            if entree is None:
+                entree = self._lire_disque(cle)
+                if entree is not None:
+                    self.hits_disque += 1
+                    self._ranger(cle, *entree)
+            if entree is None:
+                self.misses += 1
+                return defaut
+            self.hits += 1
+            return entree[1]
+
+    def mettre(self, cle, valeur):
+        horodatage = time.time()
+        with self._verrou:
+            self._ranger(cle, horodatage, valeur)
+        if self.dossier is not None:
+            # Écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+            tmp = f"{self._chemin(cle)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(valeur, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._chemin(cle))
+
+    def obtenir_ou_calculer(self, cle, calcul):
+        manquant = object()
+        valeur = self.obtenir(cle, manquant)
+        if valeur is manquant:
+            valeur = calcul()
+            self.mettre(cle, valeur)
+        return valeur
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self.hits = self.hits_disque = self.misses = 0
@@ -0,0 +1,196 @@
+"""
+Carte de performances de la PAC : COP et puissance thermique selon (T_ext, T_eau).
+
+La carte du constructeur (points sur une grille rectiligne, pas quelconques) est
+rééchantillonnée une fois pour toutes sur une grille régulière : l'interpolation
+bilinéaire se réduit alors à un calcul d'indice, vectorisé sur toute une série.
+
+Le moteur par événements reçoit un PerformancesPAC (carte + T° extérieures horaires) :
+la carte est évaluée en un bloc sur la série pour T_eau = T_prim, puis chaque pas lit
+la puissance et le COP de son heure (coût constant). La puissance étant constante par
+heure, la solution exponentielle reste exacte ; l'électricité de la PAC est intégrée
+au COP instantané.
+
+Format CSV de la carte (séparateur « ; », « , » ou tabulation, virgule décimale acceptée avec « ; ») :
+
+    T_ext;T_eau;cop;puissance
+    -7;55;2.1;11.5
+    2;55;2.8;13.0
+
+puissance en kW thermique. Format CSV des T° extérieures : une colonne T_ext (°C),
+une ligne par heure (24 valeurs pour une journée type, 8760 pour une année) ; une
+colonne heure éventuelle est ignorée.
+"""
+import csv
+import io
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from .puisages import _normaliser
+
+COLONNES_CARTE = {
+    "t_ext": "T_ext", "text": "T_ext", "t_exterieure": "T_ext",
+    "t_eau": "T_eau", "t_prim": "T_eau", "t_depart": "T_eau",
+    "cop": "cop",
+    "puissance": "puissance", "p": "puissance", "capacite": "puissance",
+}
+COLONNES_METEO = {"t_ext": "T_ext", "text": "T_ext", "t_exterieure": "T_ext", "temperature": "T_ext"}
+
+
+def _lire_colonnes(source, colonnes_csv, quoi, facultatives=()):
+    """
+    {champ: np.ndarray} d'un CSV (chemin, fichier texte ou binaire, ex. st.file_uploader).
+    Les champs facultatifs absents du fichier sont omis.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8-sig", newline="") as f:
+            return _lire_colonnes(f, colonnes_csv, quoi, facultatives)
+    texte = source.read()
+    if isinstance(texte, bytes):
+        texte = texte.decode("utf-8-sig")
+    entete = texte.split("\n", 1)[0]
+    separateur = next((s for s in ";\t," if s in entete), ";")
+    lignes = csv.reader(io.StringIO(texte), delimiter=separateur)
+    champs = [colonnes_csv.get(_normaliser(e)) for e in next(lignes)]
+    manquants = set(colonnes_csv.values()) - set(champs) - set(facultatives)
+    if manquants:
+        raise ValueError(f"Colonnes manquantes dans le CSV {quoi} : {', '.join(sorted(manquants))}")
+    virgule = separateur != ","
+    colonnes = {c: [] for c in set(champs) - {None}}
+    for n, ligne in enumerate(lignes, start=2):
+        if not any(v.strip() for v in ligne):
+            continue
+        try:
+            for champ, v in zip(champs, ligne):
+                if champ is not None:
+                    colonnes[champ].append(float(v.strip().replace(",", ".") if virgule else v.strip()))
+        except ValueError:
+            raise ValueError(f"Ligne {n} illisible dans le CSV {quoi} : {ligne}") from None
+    return {c: np.array(v) for c, v in colonnes.items()}
+
+
+def _axe_regulier(valeurs, pas):
+    """Axe régulier couvrant les valeurs, de pas au plus `pas` (par défaut le plus petit écart)."""
+    if len(valeurs) == 1:
+        return valeurs.copy()
+    if pas is None:
+        pas = np.diff(valeurs).min()
+    n = int(np.ceil((valeurs[-1] - valeurs[0]) / pas - 1e-9)) + 1
+    return np.linspace(valeurs[0], valeurs[-1], n)
+
+
+def _interp_lignes(x, xp, table):
+    """Interpolation linéaire de chaque ligne de table (..., len(xp)) en x."""
+    if len(xp) == 1:
+        return np.repeat(table, len(x), axis=-1)
+    return np.stack([np.interp(x, xp, ligne) for ligne in table])
+
+
+@dataclass
+class CartePAC:
+    """
+    Carte sur grille régulière : cop et puissance (kW thermique) de forme
+    (len(T_ext), len(T_eau)). Hors de la grille, les valeurs du bord sont prolongées.
+    """
+    T_ext: np.ndarray
+    T_eau: np.ndarray
+    cop: np.ndarray
+    puissance: np.ndarray
+
+    def __post_init__(self):
+        self.T_ext, self.T_eau = (np.atleast_1d(np.asarray(a, dtype=float)) for a in (self.T_ext, self.T_eau))
+        forme = (len(self.T_ext), len(self.T_eau))
+        self.cop, self.puissance = (np.asarray(a, dtype=float).reshape(forme) for a in (self.cop, self.puissance))
+        for nom, axe in (("T_ext", self.T_ext), ("T_eau", self.T_eau)):
+            ecarts = np.diff(axe)
+            if len(axe) > 1 and (ecarts.min() <= 0 or not np.allclose(ecarts, ecarts[0])):
+                raise ValueError(f"Axe {nom} de la carte non régulier (voir CartePAC.regulariser)")
+        if (self.cop <= 0).any() or (self.puissance < 0).any():
+            raise ValueError("La carte doit avoir des COP positifs et des puissances positives ou nulles")
+
+    @classmethod
+    def regulariser(cls, T_ext, T_eau, cop, puissance, pas_ext=None, pas_eau=None):
+        """Carte régulière à partir d'une grille rectiligne d'axes croissants quelconques."""
+        T_ext, T_eau = (np.asarray(a, dtype=float) for a in (T_ext, T_eau))
+        x, y = _axe_regulier(T_ext, pas_ext), _axe_regulier(T_eau, pas_eau)
+        tables = []
+        for table in (cop, puissance):
+            # Bilinéaire sur une grille rectiligne = linéaire selon T_eau puis selon T_ext
+            table = _interp_lignes(y, T_eau, np.asarray(table, dtype=float).reshape(len(T_ext), len(T_eau)))
+            tables.append(_interp_lignes(x, T_ext, table.T).T)
+        return cls(x, y, *tables)
+
+    @classmethod
+    def lire(cls, source, pas_ext=None, pas_eau=None):
+        """Lit la carte du constructeur (un point par ligne, toutes les combinaisons présentes)."""
+        c = _lire_colonnes(source, COLONNES_CARTE, "de la carte PAC")
+        T_ext, T_eau = np.unique(c["T_ext"]), np.unique(c["T_eau"])
+        i, j = np.searchsorted(T_ext, c["T_ext"]), np.searchsorted(T_eau, c["T_eau"])
+        cop = np.full((len(T_ext), len(T_eau)), np.nan)
+        puissance = cop.copy()
+        cop[i, j], puissance[i, j] = c["cop"], c["puissance"]
+        if np.isnan(cop).any():
+            raise ValueError(f"Carte PAC incomplète : {int(np.isnan(cop).sum())} couple(s) (T_ext, T_eau) manquant(s)")
+        return cls.regulariser(T_ext, T_eau, cop, puissance, pas_ext, pas_eau)
+
+    @staticmethod
+    def _indices(axe, valeurs):
+        """Indice de la maille et poids du point suivant, sur un axe régulier."""
+        if len(axe) == 1:
+            zeros = np.zeros(np.shape(valeurs))
+            return zeros.astype(np.intp), zeros
+        f = np.clip((np.asarray(valeurs, dtype=float) - axe[0]) / (axe[1] - axe[0]), 0, len(axe) - 1)
+        i = np.minimum(f.astype(np.intp), len(axe) - 2)
+        return i, f - i
+
+    def evaluer(self, T_ext, T_eau):
+        """(cop, puissance en kW) par interpolation bilinéaire, vectorisée sur T_ext et T_eau."""
+        T_ext, T_eau = np.broadcast_arrays(np.asarray(T_ext, dtype=float), np.asarray(T_eau, dtype=float))
+        i, u = self._indices(self.T_ext, T_ext)
+        j, v = self._indices(self.T_eau, T_eau)
+        i1 = np.minimum(i + 1, len(self.T_ext) - 1)
+        j1 = np.minimum(j + 1, len(self.T_eau) - 1)
+
+        def bilineaire(z):
+            return ((1 - u) * ((1 - v) * z[i, j] + v * z[i, j1])
+                    + u * ((1 - v) * z[i1, j] + v * z[i1, j1]))
+
+        return bilineaire(self.cop), bilineaire(self.puissance)
+
+
+def lire_temperatures(source):
+    """T° extérieures horaires (°C) d'un CSV à une colonne T_ext."""
+    T_ext = _lire_colonnes(source, COLONNES_METEO, "des T° extérieures")["T_ext"]
+    if len(T_ext) == 0:
+        raise ValueError("Aucune T° extérieure dans le CSV")
+    return T_ext
+
+
+@dataclass
+class PerformancesPAC:
+    """
+    Carte de la PAC et T° extérieures par pas de `pas` s, répétées périodiquement
+    (24 valeurs horaires : journée type ; 8760 : année).
+    """
+    carte: CartePAC
+    T_ext: np.ndarray
+    pas: float = 3600.0
+
+    def __post_init__(self):
+        self.T_ext = np.atleast_1d(np.asarray(self.T_ext, dtype=float))
+        if len(self.T_ext) == 0:
+            raise ValueError("Série de T° extérieures vide")
+        self._paliers = {}
+
+    def paliers(self, T_eau):
+        """(puissance en W, cop) de chaque pas pour une T° d'eau, évalués une fois par T_eau."""
+        if T_eau not in self._paliers:
+            cop, puissance = self.carte.evaluer(self.T_ext, T_eau)
+            self._paliers[T_eau] = (puissance * 1000, cop)
+        return self._paliers[T_eau]
+
+    @property
+    def periode(self):
+        return len(self.T_ext) * self.pas
@@ -0,0 +1,305 @@
+"""
+Montée en température d'un ballon sans soutirage ni pertes (main5.py, app_serpentin_pac.py).
+
+La puissance injectée ne dépend que de T, donc dT/dt = P(T) / C et le temps de chauffe
+est t = ∫ C / P(T) dT. La puissance est découpée en régimes aux températures de
+bascule, calculées exactement, et chaque régime a sa loi t(T) :
+- puissance constante (PAC limitante, plancher de modulation, serpentin à ΔTlm fixe) :
+  t = C ΔT / P ;
+- modulation linéaire P = k C (T_c - T) : approche exponentielle, t = ln(...) / k ;
+- serpentin limitant avec T_sortie = T_depart - ΔT_primaire :
+  t = C / (U.S.ΔTp) ∫ ln((T_d - T) / (T_s - T)) dT, en forme close ;
+- au-delà, quand la sortie primaire est plafonnée à la T° ballon, pas de primitive
+  simple : Runge-Kutta emboîté 5(4) (Dormand-Prince) à pas adaptatif sur dt/dT.
+"""
+import bisect
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .echange import DT2_MIN, echange_serpentin
+from .parametres import CP_WATER, RHO_WATER
+
+RTOL = 1e-8          # tolérance relative de l'intégrateur numérique
+MAX_PAS_RK = 10000
+
+
+def delta_T_lm(dT1, dT2):
+    """ΔT logarithmique moyen, limite dT1 pour dT1 -> dT2."""
+    if abs(dT1 - dT2) < 1e-6 * max(abs(dT1), 1.0):
+        return dT1
+    return (dT1 - dT2) / math.log(dT1 / dT2)
+
+
+# --- Lois t(T) par régime (durée depuis T_a, scalaires ou tableaux) ---
+
+def _xlnx(x):
+    return x * np.log(x) if isinstance(x, np.ndarray) else x * math.log(x)
+
+
+def _duree(loi, coefs, T_a, T):
+    if loi == "constante":
+        (c_sur_p,) = coefs
+        return c_sur_p * (T - T_a)
+    if loi == "modulation":
+        T_c, inv_k = coefs
+        ln = np.log if isinstance(T, np.ndarray) else math.log
+        return inv_k * ln((T_c - T_a) / (T_c - T))
+    if loi == "serpentin":
+        # Primitive de ln(T_d - T) - ln(T_s - T)
+        T_d, T_s, a = coefs
+        F = lambda x: _xlnx(T_s - x) - _xlnx(T_d - x)
+        return a * (F(T) - F(T_a))
+    if loi == "numerique":
+        return _hermite(coefs, T)
+    raise ValueError(f"Loi inconnue : {loi!r}")
+
+
+def _hermite(noeuds, T):
+    """Interpolation d'Hermite cubique de t(T) sur les pas acceptés (dt/dT connu)."""
+    Tn, tn, gn = noeuds
+    if isinstance(T, np.ndarray):
+        Tn, tn, gn = np.asarray(Tn), np.asarray(tn), np.asarray(gn)
+        i = np.clip(np.searchsorted(Tn, T, side="right") - 1, 0, len(Tn) - 2)
+    else:
+        i = min(max(bisect.bisect_right(Tn, T) - 1, 0), len(Tn) - 2)
+    h = Tn[i + 1] - Tn[i]
+    s = (T - Tn[i]) / h
+    return ((1 + 2 * s) * (1 - s) ** 2 * tn[i] + s * (1 - s) ** 2 * h * gn[i]
+            + s * s * (3 - 2 * s) * tn[i + 1] + s * s * (s - 1) * h * gn[i + 1])
+
+
+# Dormand-Prince 5(4) : nœuds et poids (les coefficients internes a_ij sont inutiles,
+# dt/dT ne dépendant que de T)
+_C_DP = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0)
+_B5_DP = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0)
+_E_DP = tuple(b5 - b4 for b5, b4 in zip(
+    _B5_DP, (5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40)))
+
+
+def _rk_emboite(g, T_a, T_b, t_budget):
+    """
+    Intègre dt/dT = g(T) de T_a à T_b (Runge-Kutta emboîté Dormand-Prince 5(4),
+    contrôle d'erreur relatif RTOL). S'arrête dès que t dépasse t_budget ou si le pas
+    s'effondre (g non intégrable). Retourne (T atteint, noeuds (T, t, g)).
+    """
+    T, t = T_a, 0.0
+    k1 = g(T)
+    Tn, tn, gn = [T], [t], [k1]
+    h = T_b - T_a
+    for _ in range(MAX_PAS_RK):
+        if T >= T_b or t > t_budget:
+            break
+        h = min(h, T_b - T)
+        if h <= 1e-12 * max(abs(T), 1.0):
+            break
+        k = [k1] + [g(T + c * h) for c in _C_DP[1:]]
+        dt5 = h * sum(b * ki for b, ki in zip(_B5_DP, k))
+        k.append(k[-1])  # FSAL : g(T + h) est le premier étage du pas suivant
+        err = abs(h * sum(e * ki for e, ki in zip(_E_DP, k)))
+        tol = RTOL * max(abs(t + dt5), 1.0)
+        if math.isfinite(err) and err <= tol:
+            T = T_b if T_b - T - h <= 1e-12 * max(abs(T_b), 1.0) else T + h
+            t, k1 = t + dt5, k[-1]
+            Tn.append(T)
+            tn.append(t)
+            gn.append(k1)
+        if not math.isfinite(err):
+            h *= 0.2
+        else:
+            h *= min(5.0, max(0.2, 0.9 * (tol / err) ** 0.2)) if err > 0 else 5.0
+    return T, (Tn, tn, gn)
+
+
+@dataclass
+class Regime:
+    nom: str          # libellé affiché ("PAC", "serpentin", ...)
+    loi: str          # "constante", "modulation", "serpentin" ou "numerique"
+    coefs: tuple
+    T_debut: float
+    T_fin: float
+    t_debut: float    # s
+    t_fin: float      # s
+
+
+@dataclass
+class Chauffe:
+    """Montée en température : durée (s), énergie (kWh) et régimes successifs."""
+    T_init: float
+    T_consigne: float
+    T_final: float
+    duree: float
+    energie: float
+    atteinte: bool
+    regimes: list
+    puissance: object   # P(T) en W, vectorisée
+
+    @property
+    def bascules(self):
+        """(T °C, t s, régime entrant) à chaque changement de régime."""
+        return [(r.T_debut, r.t_debut, r.nom) for r in self.regimes[1:]]
+
+    def instants(self, T):
+        """Instant (s) où le ballon atteint T (tableau, T dans [T_init, T_final])."""
+        T = np.asarray(T, dtype=float)
+        t = np.full(T.shape, np.nan)
+        for r in self.regimes:
+            dans = (T >= r.T_debut) & (T <= r.T_fin)
+            if dans.any():
+                t[dans] = r.t_debut + _duree(r.loi, r.coefs, r.T_debut, T[dans])
+        return t
+
+    def courbe(self, n_points=200):
+        """Échantillonnage régulier en T : (t s, T °C, P W), bascules incluses."""
+        T = np.linspace(self.T_init, self.T_final, n_points)
+        T = np.unique(np.concatenate([T, [r.T_debut for r in self.regimes]]))
+        return self.instants(T), T, self.puissance(T)
+
+    def temperatures(self, t, n_points=2000):
+        """T° ballon aux instants t (s), par interpolation d'une courbe fine."""
+        tc, Tc, _ = self.courbe(n_points)
+        return np.interp(t, tc, Tc)
+
+
+def _inverse(loi, coefs, T_a, T_b, d):
+    """Température atteinte après une durée d dans le régime (T_a <= T <= T_b)."""
+    if loi == "constante":
+        return min(T_a + d / coefs[0], T_b)
+    if loi == "modulation":
+        T_c, inv_k = coefs
+        return min(T_c - (T_c - T_a) * math.exp(-d / inv_k), T_b)
+    # Bissection sur la loi monotone du régime
+    lo, hi = T_a, T_b
+    while hi - lo > 1e-12 * max(abs(hi), 1.0):
+        m = (lo + hi) / 2
+        if _duree(loi, coefs, T_a, m) <= d:
+            lo = m
+        else:
+            hi = m
+    return lo
+
+
+def _assembler(morceaux, T_init, T_consigne, C, t_max, puissance):
+    """Enchaîne les régimes (nom, loi, coefs, T_a, T_b) et tronque à t_max."""
+    regimes = []
+    t = 0.0
+    T_final = T_init
+    atteinte = True
+    for nom, loi, coefs, T_a, T_b in morceaux:
+        if T_b <= T_a:
+            continue
+        d = _duree(loi, coefs, T_a, T_b)
+        if t + d > t_max:
+            T_b = _inverse(loi, coefs, T_a, T_b, t_max - t)
+            d = _duree(loi, coefs, T_a, T_b)
+            atteinte = False
+        regimes.append(Regime(nom, loi, coefs, T_a, T_b, t, t + d))
+        t += d
+        T_final = T_b
+        if not atteinte:
+            break
+    if T_final < T_consigne:
+        atteinte = False
+    return Chauffe(T_init, T_consigne, T_final, t, C * (T_final - T_init) / 3.6e6, atteinte, regimes, puissance)
+
+
+def chauffe_serpentin(T_init, T_consigne, volume, U, S, T_depart, dT_primaire, P_pac_max, t_max=6 * 3600):
+    """
+    Modèle de main5.py : sortie primaire T_depart - ΔT_primaire (au moins T ballon),
+    puissance min(U.S.ΔTlm, P_pac_max).
+
+    volume en L, U en W/m².K, S en m², P_pac_max en W, t_max en s
+    """
+    C = volume / 1000 * RHO_WATER * CP_WATER
+    US = U * S
+    T_s = T_depart - dT_primaire
+    T_lim = T_s - DT2_MIN            # au-delà, l'écart de sortie est plafonné à DT2_MIN
+
+    def p_serp(T):
+        if T < T_lim:
+            return US * dT_primaire / math.log((T_depart - T) / (T_s - T))
+        if T >= T_depart:
+            return 0.0
+        return US * delta_T_lm(T_depart - T, DT2_MIN)
+
+    def puissance(T):
+        return echange_serpentin(T_depart, dT_primaire, T, U, S, P_pac_max).P
+
+    if T_consigne <= T_init or P_pac_max <= 0 or US <= 0:
+        return _assembler([], T_init, T_consigne, C, t_max, puissance)
+
+    # Température de bascule PAC -> serpentin : U.S.ΔTlm(T) = P_pac_max
+    L = US * dT_primaire / P_pac_max
+    if dT_primaire > DT2_MIN and L > 0:
+        T_bascule = T_s - dT_primaire / math.expm1(L)
+    else:
+        T_bascule = -math.inf
+    if T_bascule >= T_lim:
+        lo, hi = T_lim, T_depart
+        for _ in range(200):
+            m = (lo + hi) / 2
+            if p_serp(m) >= P_pac_max:
+                lo = m
+            else:
+                hi = m
+            if hi - lo <= 1e-12 * max(abs(m), 1.0):
+                break
+        T_bascule = lo
+
+    T_cible = min(T_consigne, T_depart)
+    morceaux = []
+    T_a = T_init
+    if T_bascule > T_a:
+        T_b = min(T_bascule, T_cible)
+        morceaux.append(("PAC", "constante", (C / P_pac_max,), T_a, T_b))
+        T_a = T_b
+    if T_a < min(T_lim, T_cible):
+        T_b = min(T_lim, T_cible)
+        morceaux.append(("serpentin", "serpentin", (T_depart, T_s, C / (US * dT_primaire)), T_a, T_b))
+        T_a = T_b
+    if T_a < T_cible:
+        t_ecoule = sum(_duree(loi, c, a, b) for _, loi, c, a, b in morceaux)
+        def g(T):
+            p = p_serp(T)
+            return C / p if p > 0 else math.inf
+
+        T_b, noeuds = _rk_emboite(g, T_a, T_cible, t_max - t_ecoule)
+        morceaux.append(("serpentin (sortie plafonnée)", "numerique", noeuds, T_a, T_b))
+    return _assembler(morceaux, T_init, T_consigne, C, t_max, puissance)
+
+
+def chauffe_modulee(T_init, T_consigne, volume, UA, delta_depart, delta_hyd, P_pac_max,
+                    modulation_min=0.3, t_max=8 * 3600):
+    """
+    Modèle de app_serpentin_pac.py : départ PAC à T + delta_depart (ΔTlm constant),
+    puissance PAC modulée P_max.max(modulation_min, (T_c - T) / (T_c - T_init)),
+    limitée par le serpentin UA.ΔTlm.
+
+    volume en L, UA en W/K, P_pac_max en W, t_max en s
+    """
+    C = volume / 1000 * RHO_WATER * CP_WATER
+    P_serp = UA * delta_T_lm(max(delta_depart, 1e-6), max(delta_depart - delta_hyd, 1e-6))
+
+    def puissance(T):
+        f = np.maximum(modulation_min, (T_consigne - np.asarray(T, dtype=float)) / (T_consigne - T_init))
+        return np.minimum(P_pac_max * f, P_serp)
+
+    if T_consigne <= T_init or P_pac_max <= 0 or P_serp <= 0:
+        return _assembler([], T_init, T_consigne, C, t_max, lambda T: np.zeros(np.shape(T)))
+
+    ecart = T_consigne - T_init
+    T_plancher = T_consigne - modulation_min * ecart
+    r = P_serp / P_pac_max
+    morceaux = []
+    if r <= modulation_min:
+        morceaux.append(("serpentin", "constante", (C / P_serp,), T_init, T_consigne))
+    else:
+        T_mod = T_init
+        if r < 1:
+            T_mod = T_consigne - r * ecart
+            morceaux.append(("serpentin", "constante", (C / P_serp,), T_init, T_mod))
+        morceaux.append(("modulation", "modulation", (T_consigne, C * ecart / P_pac_max), T_mod, T_plancher))
+        morceaux.append(("plancher de modulation", "constante", (C / (modulation_min * P_pac_max),),
+                         T_plancher, T_consigne))
+    return _assembler(morceaux, T_init, T_consigne, C, t_max, puissance)
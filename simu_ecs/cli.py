@@ -0,0 +1,269 @@
+"""
+Lanceur en ligne de commande, sans Streamlit ni matplotlib ni pandas :
+
+    python -m simu_ecs simuler scenarios.toml -o resultats/
+    python -m simu_ecs simuler scenarios.csv -o resultats/ --format npz --bilan-seul
+    python -m simu_ecs parc dossier_sites/ -o parc/ --jours 7
+    python -m simu_ecs sensibilite site.toml --plage ua_ballon=0.5:3 --plage K_echange=300:900
+
+Chaque scénario (voir scenarios.py) est simulé par le moteur par événements, ou
+par le ballon stratifié si n_couches >= 2. Deux tables en colonnes sont écrites
+dans le dossier de sortie :
+- bilans : une ligne par scénario (nom, paramètres, termes du bilan) ;
+- series : toutes les séries bout à bout, repérées par la colonne scenario.
+La commande parc simule un dossier de sites (voir parc.py) et écrit la courbe de
+charge électrique du parc (courbe) et une ligne par site (sites : pointe propre,
+contribution à la pointe du parc, bilan).
+La commande sensibilite classe les facteurs d'un scénario par leur influence sur le
+bilan (Morris ou Sobol, voir sensibilite.py) et écrit les indices (indices).
+Format Parquet si pyarrow est installé, NPZ sinon (ou imposé par --format).
+NumPy, les moteurs, tomllib et pyarrow ne sont importés qu'au besoin, dans la
+commande qui s'en sert : --help et les erreurs d'arguments répondent sans les charger.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from dataclasses import fields
+
+SERIES = ("t", "T", "P_pac", "P_chaud", "P_tirage")
+FORMATS = ("auto", "npz", "parquet")
+
+
+def executer(scenario, series=True):
+    """Resultat d'un scénario ; séries omises (t = None) si series est faux ou dt = 0."""
+    import numpy as np
+
+    from .evenements import simuler
+
+    p = scenario.parametres
+    duree = scenario.duree_h * 3600
+    if scenario.n_couches >= 2:
+        from .stratifie import simuler_stratifie
+
+        dt = scenario.dt if scenario.dt > 0 else 60.0
+        return simuler_stratifie(p, scenario.profil, dt, duree, n_couches=scenario.n_couches,
+                                 hauteur_sonde=scenario.hauteur_sonde / 100, couches=False)
+    t_sortie = np.arange(0.0, duree, scenario.dt) if series and scenario.dt > 0 else None
+    return simuler(p, scenario.profil, duree=duree, t_sortie=t_sortie)
+
+
+def tables(scenarios, resultats, series=True):
+    """(bilans, series) : dictionnaires de colonnes NumPy."""
+    import numpy as np
+
+    from .parametres import Parametres
+    from .resultats import Bilan
+
+    bilans = {"nom": np.array([s.nom for s in scenarios])}
+    for f in fields(Parametres):
+        bilans[f.name] = np.array([getattr(s.parametres, f.name) for s in scenarios])
+    for f in fields(Bilan):
+        bilans[f.name] = np.array([getattr(r.bilan, f.name) for r in resultats])
+    bilans["part_chaudiere"] = np.array([r.bilan.part_chaudiere for r in resultats])
+    bilans["residu"] = np.array([r.bilan.residu for r in resultats])
+    bilans["e_elec_pac"] = np.array([r.bilan.e_elec_pac(s.parametres.cop_moyen)
+                                     for s, r in zip(scenarios, resultats)])
+
+    colonnes = None
+    avec = [(k, r) for k, r in enumerate(resultats) if r.t is not None]
+    if series and avec:
+        colonnes = {"scenario": np.concatenate([np.full(len(r.t), k, dtype=np.int32) for k, r in avec])}
+        for c in SERIES:
+            colonnes[c] = np.concatenate([np.asarray(getattr(r, c), dtype=float) for _, r in avec])
+    return bilans, colonnes
+
+
+def format_sortie(demande):
+    if demande != "auto":
+        return demande
+    return "parquet" if importlib.util.find_spec("pyarrow") is not None else "npz"
+
+
+def ecrire(chemin_base, colonnes, fmt):
+    """Écrit une table en colonnes ; retourne le chemin du fichier."""
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        chemin = chemin_base + ".parquet"
+        pq.write_table(pa.table(colonnes), chemin)
+    else:
+        import numpy as np
+
+        chemin = chemin_base + ".npz"
+        np.savez(chemin, **colonnes)
+    return chemin
+
+
+def commande_simuler(args):
+    from .scenarios import lire_scenarios
+
+    t0 = time.perf_counter()
+    scenarios = lire_scenarios(args.scenarios)
+    resultats = []
+    for s in scenarios:
+        r = executer(s, series=not args.bilan_seul)
+        b = r.bilan
+        print(f"{s.nom} : PAC {b.e_th_pac:.2f} kWh, chaudière {b.e_th_chaud:.2f} kWh "
+              f"({b.part_chaudiere:.1f} %), {b.demarrages} démarrages, T min {b.T_min:.1f} °C")
+        resultats.append(r)
+
+    fmt = format_sortie(args.format)
+    os.makedirs(args.sortie, exist_ok=True)
+    bilans, series = tables(scenarios, resultats, series=not args.bilan_seul)
+    ecrits = [ecrire(os.path.join(args.sortie, "bilans"), bilans, fmt)]
+    if series is not None:
+        ecrits.append(ecrire(os.path.join(args.sortie, "series"), series, fmt))
+    print(f"{len(scenarios)} scénario(s) en {time.perf_counter() - t0:.2f} s -> {', '.join(ecrits)}")
+    return 0
+
+
+def commande_parc(args):
+    import numpy as np
+
+    from .lot import BilanLot
+    from .parametres import format_duration
+    from .parc import lire_parc, simuler_parc_flux
+
+    t0 = time.perf_counter()
+    sites = lire_parc(args.dossier)
+    t, P_elec = [], []
+    for b in simuler_parc_flux(sites, duree=args.jours * 86400, dt=args.dt, pas_courbe=args.pas_courbe,
+                               taille_bloc=args.taille_bloc):
+        t.append(b.t)
+        P_elec.append(b.P_elec)
+        synthese = b.synthese
+        print(f"jour {b.t[-1] // 86400 + 1:.0f} : pointe du jour {b.P_elec.max() / 1000:.1f} kW", flush=True)
+
+    fmt = format_sortie(args.format)
+    os.makedirs(args.sortie, exist_ok=True)
+    courbe = {"t": np.concatenate(t), "P_elec_kW": np.concatenate(P_elec) / 1000}
+    table = {
+        "nom": np.array(synthese.noms),
+        "modele": np.array([s.parametres.modele for s in sites]),
+        "pointe_kW": synthese.pointes / 1000,
+        "contribution_pointe_kW": synthese.contributions / 1000,
+        "coincidence": synthese.coincidence,
+    }
+    for f in fields(BilanLot):
+        if f.name != "duree":
+            table[f.name] = getattr(synthese.bilans, f.name)
+    ecrits = [ecrire(os.path.join(args.sortie, "courbe"), courbe, fmt),
+              ecrire(os.path.join(args.sortie, "sites"), table, fmt)]
+    print(f"{len(sites)} site(s) : pointe du parc {synthese.pointe / 1000:.1f} kW à "
+          f"{format_duration(synthese.t_pointe % 86400)} (jour {synthese.t_pointe // 86400 + 1:.0f}), "
+          f"foisonnement {synthese.foisonnement:.2f}, {synthese.e_elec:.0f} kWh élec")
+    print(f"{time.perf_counter() - t0:.2f} s -> {', '.join(ecrits)}")
+    return 0
+
+
+def plage(texte):
+    """« nom=bas:haut » -> (nom, (bas, haut))."""
+    try:
+        nom, bornes = texte.split("=")
+        bas, haut = bornes.split(":")
+        return nom.strip(), (float(bas), float(haut))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"plage attendue sous la forme nom=bas:haut, pas {texte!r}") from None
+
+
+def commande_sensibilite(args):
+    import numpy as np
+
+    from .scenarios import lire_scenarios
+    from .sensibilite import SORTIES, morris, sobol
+
+    t0 = time.perf_counter()
+    scenarios = lire_scenarios(args.scenario)
+    s = scenarios[0]
+    if s.puisages is not None or s.n_couches >= 2:
+        raise ValueError(f"Scénario {s.nom} : l'analyse ne porte que sur un ballon mélangé à profil horaire")
+    sorties = args.sorties or list(SORTIES)
+    options = dict(sorties=sorties, graine=args.graine, dt=args.dt, duree=s.duree_h * 3600,
+                   jours_prechauffe=args.prechauffe)
+    noms = [nom for nom, _ in args.plage]
+    doublons = sorted({nom for nom in noms if noms.count(nom) > 1})
+    if doublons:
+        raise ValueError(f"Facteur donné par plusieurs --plage : {', '.join(doublons)}")
+    plages = dict(args.plage)
+    if args.methode == "morris":
+        analyse = morris(s.parametres, s.hour_volumes, plages, r=args.n or 50, **options)
+    else:
+        analyse = sobol(s.parametres, s.hour_volumes, plages, n=args.n or 1024, **options)
+
+    indice = analyse.principal
+    autre = "S1" if analyse.methode == "sobol" else None
+    table = {}
+    for sortie in sorties:
+        colonnes = analyse.table(sortie)
+        print(f"{sortie} ({s.nom}, {analyse.methode}, classé par {indice}) :")
+        for k in range(len(colonnes["facteur"])):
+            ligne = (f"  {colonnes['rang'][k]:2d}. {colonnes['facteur'][k]:<18} {indice} {colonnes[indice][k]:.3g} "
+                     f"[{colonnes[indice + '_bas'][k]:.3g}, {colonnes[indice + '_haut'][k]:.3g}]")
+            if autre:
+                ligne += f"  {autre} {colonnes[autre][k]:.3g} [{colonnes[autre + '_bas'][k]:.3g}, {colonnes[autre + '_haut'][k]:.3g}]"
+            else:
+                ligne += f"  sigma {colonnes['sigma'][k]:.3g}"
+            print(ligne)
+        table.setdefault("sortie", []).extend([sortie] * len(colonnes["facteur"]))
+        for nom, v in colonnes.items():
+            table.setdefault(nom, []).extend(v.tolist())
+
+    fmt = format_sortie(args.format)
+    os.makedirs(args.sortie, exist_ok=True)
+    chemin = ecrire(os.path.join(args.sortie, "indices"), {k: np.array(v) for k, v in table.items()}, fmt)
+    print(f"{analyse.n_simulations} simulations en {time.perf_counter() - t0:.2f} s -> {chemin}")
+    return 0
+
+
+def analyseur():
+    parser = argparse.ArgumentParser(prog="python -m simu_ecs", description="Simulateurs ECS sans interface.")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    sim = commandes.add_parser("simuler", help="simule une liste de scénarios (TOML ou CSV)")
+    sim.add_argument("scenarios", help="fichier .toml ou .csv des scénarios")
+    sim.add_argument("-o", "--sortie", default="resultats", help="dossier de sortie (défaut : resultats)")
+    sim.add_argument("--format", choices=FORMATS, default="auto",
+                     help="parquet si pyarrow est installé, npz sinon (défaut : auto)")
+    sim.add_argument("--bilan-seul", action="store_true", help="n'écrit que les bilans")
+    sim.set_defaults(executer=commande_simuler)
+
+    parc = commandes.add_parser("parc", help="courbe de charge électrique d'un parc de sites")
+    parc.add_argument("dossier", help="dossier des sites (<site>.toml et profil <site>.csv)")
+    parc.add_argument("-o", "--sortie", default="parc", help="dossier de sortie (défaut : parc)")
+    parc.add_argument("--jours", type=int, default=1, help="durée simulée (défaut : 1)")
+    parc.add_argument("--dt", type=float, default=60.0, help="pas du moteur par lot en s (défaut : 60)")
+    parc.add_argument("--pas-courbe", type=float, default=3600.0,
+                      help="intervalle de la courbe de charge en s (défaut : 3600)")
+    parc.add_argument("--taille-bloc", type=int, default=4096, help="sites simulés ensemble au plus (défaut : 4096)")
+    parc.add_argument("--format", choices=FORMATS, default="auto",
+                      help="parquet si pyarrow est installé, npz sinon (défaut : auto)")
+    parc.set_defaults(executer=commande_parc)
+
+    sens = commandes.add_parser("sensibilite", help="influence des paramètres sur le bilan (Morris ou Sobol)")
+    sens.add_argument("scenario", help="fichier .toml ou .csv du scénario de base (premier scénario)")
+    sens.add_argument("--plage", type=plage, action="append", required=True, metavar="NOM=BAS:HAUT",
+                      help="facteur et sa plage (champ de Parametres ou volume_jour), à répéter")
+    sens.add_argument("--methode", choices=("morris", "sobol"), default="sobol", help="défaut : sobol")
+    sens.add_argument("-n", type=int, default=None,
+                      help="trajectoires (morris, défaut 50) ou lignes du plan de Saltelli (sobol, défaut 1024)")
+    sens.add_argument("--sorties", nargs="+", default=None,
+                      help="termes du bilan analysés (défaut : ceux de sensibilite.SORTIES)")
+    sens.add_argument("--dt", type=float, default=60.0, help="pas du moteur par lot en s (défaut : 60)")
+    sens.add_argument("--prechauffe", type=float, default=1.0, help="jours simulés avant le bilan (défaut : 1)")
+    sens.add_argument("--graine", type=int, default=0, help="graine du plan d'expérience (défaut : 0)")
+    sens.add_argument("-o", "--sortie", default="sensibilite", help="dossier de sortie (défaut : sensibilite)")
+    sens.add_argument("--format", choices=FORMATS, default="auto",
+                      help="parquet si pyarrow est installé, npz sinon (défaut : auto)")
+    sens.set_defaults(executer=commande_sensibilite)
+    return parser
+
+
+def main(argv=None):
+    args = analyseur().parse_args(argv)
+    try:
+        return args.executer(args)
+    except (OSError, ValueError) as e:
+        print(f"erreur : {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,110 @@
+"""
+Analyse des cycles de marche/arrêt de la PAC et de la chaudière.
+
+Tous les fronts sont extraits en une passe NumPy sur les séries échantillonnées à pas
+constant dt (l'échantillon i couvre ]t_i - dt, t_i], convention des simulateurs) ;
+les énergies par cycle viennent de sommes cumulées, si bien que le coût reste
+linéaire sur des séries annuelles de plusieurs millions de points.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+
+def fronts(marche):
+    """Indices (debuts, fins) des plages où marche est vrai ; fin exclue."""
+    m = np.asarray(marche, dtype=bool)
+    bord = np.diff(m.astype(np.int8), prepend=0, append=0)
+    return np.flatnonzero(bord == 1), np.flatnonzero(bord == -1)
+
+
+@dataclass
+class JournalCycles:
+    """Un cycle par ligne, colonnes en vecteurs."""
+    debut: np.ndarray         # s
+    duree: np.ndarray         # s
+    energie: np.ndarray       # kWh fournis par l'appareil pendant le cycle
+    T_debut: np.ndarray       # °C ballon au démarrage
+    T_fin: np.ndarray         # °C ballon à l'arrêt
+    arret_avant: np.ndarray   # s d'arrêt depuis le cycle précédent (nan pour le premier)
+    secours: np.ndarray       # la chaudière a fonctionné pendant le cycle
+    energie_secours: np.ndarray  # kWh chaudière pendant le cycle
+
+    def __len__(self):
+        return len(self.debut)
+
+    def vers_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame({f.name: getattr(self, f.name) for f in fields(self)})
+
+
+def journal_cycles(P, T, dt, P_secours=None, t0=0.0):
+    """
+    Journal des cycles de l'appareil de puissance P (W).
+
+    P_secours : puissance de la chaudière (W) pour repérer les cycles avec appoint
+    """
+    P = np.asarray(P, dtype=float)
+    T = np.asarray(T, dtype=float)
+    debuts, fins = fronts(P > 0)
+    e_cumul = np.concatenate(([0.0], np.cumsum(P) * dt / 3600000))
+    energie = e_cumul[fins] - e_cumul[debuts]
+    if P_secours is not None:
+        Ps = np.asarray(P_secours, dtype=float)
+        s_cumul = np.concatenate(([0.0], np.cumsum(Ps) * dt / 3600000))
+        n_cumul = np.concatenate(([0], np.cumsum(Ps > 0)))
+        energie_secours = s_cumul[fins] - s_cumul[debuts]
+        secours = (n_cumul[fins] - n_cumul[debuts]) > 0
+    else:
+        energie_secours = np.zeros(len(debuts))
+        secours = np.zeros(len(debuts), dtype=bool)
+    arret_avant = np.full(len(debuts), np.nan)
+    arret_avant[1:] = (debuts[1:] - fins[:-1]) * dt
+    return JournalCycles(
+        debut=t0 + np.maximum(debuts - 1, 0) * dt,
+        duree=(fins - debuts) * dt,
+        energie=energie,
+        T_debut=T[np.maximum(debuts - 1, 0)],
+        T_fin=T[fins - 1],
+        arret_avant=arret_avant,
+        secours=secours,
+        energie_secours=energie_secours,
+    )
+
+
+def libelles_classes(bornes_min):
+    """Libellés des classes d'un histogramme de durées (min)."""
+    return [f"{a:g}-{b:g}" if np.isfinite(b) else f"> {a:g}" for a, b in zip(bornes_min[:-1], bornes_min[1:])]
+
+
+@dataclass
+class AnalyseCycles:
+    pac: JournalCycles
+    chaudiere: JournalCycles
+    hist_marche: tuple        # (effectifs, bornes en min) des durées de marche PAC
+    hist_arret: tuple         # (effectifs, bornes en min) des durées d'arrêt PAC
+    violations_anti_cycle: int
+    courts_cycles: int        # marches PAC plus courtes que duree_courte_min
+
+
+def analyser_cycles(P_pac, P_chaud, T, dt, t_anti_cycle_min=0.0, duree_courte_min=10.0, bornes_min=None):
+    """
+    Journal des cycles PAC et chaudière, histogrammes des durées de marche et d'arrêt,
+    nombre d'arrêts plus courts que l'anti-court-cycle.
+    """
+    pac = journal_cycles(P_pac, T, dt, P_secours=P_chaud)
+    chaudiere = journal_cycles(P_chaud, T, dt)
+    if bornes_min is None:
+        bornes_min = np.array([0, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 240, np.inf])
+    arrets = pac.arret_avant[1:]
+    hist_marche = np.histogram(pac.duree / 60, bins=bornes_min)
+    hist_arret = np.histogram(arrets / 60, bins=bornes_min)
+    return AnalyseCycles(
+        pac=pac,
+        chaudiere=chaudiere,
+        hist_marche=hist_marche,
+        hist_arret=hist_arret,
+        # Un pas de tolérance : l'arrêt est mesuré à la résolution de l'échantillonnage
+        violations_anti_cycle=int(np.count_nonzero(arrets + dt < t_anti_cycle_min * 60)),
+        courts_cycles=int(np.count_nonzero(pac.duree < duree_courte_min * 60)),
+    )
@@ -0,0 +1,162 @@
+"""
+Dimensionnement automatique : plus petite valeur d'une variable de conception
+(surface du serpentin, volume du ballon, puissance PAC...) respectant des contraintes
+sur la part chaudière, la température minimale et le nombre de démarrages par heure.
+
+La faisabilité est supposée s'améliorer quand la variable augmente. Un balayage
+géométrique grossier encadre la première valeur faisable, puis une bissection resserre
+l'encadrement à la tolérance demandée. Chaque évaluation est une simulation par
+événements, mémorisée par valeur : un dimensionnement complet coûte une vingtaine
+de simulations.
+"""
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .cache import cle_stable
+from .cycles import fronts
+from .evenements import simuler
+
+# Bornes (celles des applications) et tolérance par défaut des variables usuelles
+VARIABLES = {
+    "S_serpentin": (0.1, 15.0, 0.05),
+    "V_ball": (100.0, 5000.0, 10.0),
+    "P_pac_nom": (1.0, 50.0, 0.1),
+}
+
+
+@dataclass(frozen=True)
+class Contraintes:
+    """Contraintes de dimensionnement ; None désactive une contrainte."""
+    part_chaudiere_max: float = 10.0   # %
+    T_min: float = 50.0                # °C
+    demarrages_h_max: float = 3.0      # démarrages PAC sur toute heure glissante
+
+
+@dataclass
+class Evaluation:
+    valeur: float
+    bilan: object
+    demarrages_h: int                  # maximum sur une heure glissante
+    ecarts: dict                       # contrainte -> dépassement (> 0 si violée)
+
+    @property
+    def faisable(self):
+        return all(e <= 0 for e in self.ecarts.values())
+
+
+@dataclass
+class Dimensionnement:
+    variable: str
+    valeur: float                      # plus petite valeur faisable trouvée (nan sinon)
+    faisable: bool
+    evaluation: Evaluation             # évaluation retenue (ou celle de la borne haute)
+    evaluations: list = field(default_factory=list)  # triées par valeur
+
+    @property
+    def n_simulations(self):
+        return len(self.evaluations)
+
+
+def demarrages_par_heure(t, P_pac):
+    """Nombre maximal de démarrages PAC sur une fenêtre glissante d'une heure."""
+    debuts, _ = fronts(np.asarray(P_pac) > 0)
+    if len(debuts) == 0:
+        return 0
+    t_dem = np.asarray(t)[debuts]
+    fin = np.searchsorted(t_dem, t_dem + 3600, side="left")
+    return int(np.max(fin - np.arange(len(t_dem))))
+
+
+def evaluer(p, profil, contraintes, duree=86400, dt=10, jours_prechauffe=1, performances=None):
+    """
+    Simule p et mesure l'écart à chaque contrainte (sans valeur de variable).
+    Les jours de préchauffe, simulés sans être évalués, effacent l'effet de T_init.
+
+    profil       : volumes horaires à 60°C (L/h) ou ProfilTirage (puisages), comme pour simuler
+    performances : carte_pac.PerformancesPAC éventuelle, transmise au moteur
+    """
+    etat = None
+    if jours_prechauffe > 0:
+        etat = simuler(p, profil, duree=jours_prechauffe * 86400, performances=performances).etat_final
+    t0 = 0.0 if etat is None else etat.t
+    t = t0 + np.arange(0, duree, dt, dtype=float)
+    res = simuler(p, profil, duree=duree, t_sortie=t, etat=etat, performances=performances)
+    b = res.bilan
+    n_h = demarrages_par_heure(t, res.P_pac)
+    ecarts = {}
+    if contraintes.part_chaudiere_max is not None:
+        ecarts["part_chaudiere"] = b.part_chaudiere - contraintes.part_chaudiere_max
+    if contraintes.T_min is not None:
+        # Tolérance du moteur sur les seuils
+        ecarts["T_min"] = contraintes.T_min - b.T_min - 1e-6
+    if contraintes.demarrages_h_max is not None:
+        ecarts["demarrages_h"] = n_h - contraintes.demarrages_h_max
+    return Evaluation(math.nan, b, n_h, ecarts)
+
+
+def dimensionner(p, profil, variable, contraintes=Contraintes(), borne_min=None, borne_max=None,
+                 tolerance=None, n_balayage=8, duree=86400, dt=10, jours_prechauffe=1, cache=None,
+                 performances=None):
+    """
+    Plus petite valeur de `variable` (champ de Parametres) respectant les contraintes.
+
+    profil       : volumes horaires à 60°C (L/h) ou ProfilTirage (puisages)
+    n_balayage   : points du balayage géométrique initial entre les bornes
+    dt           : pas d'échantillonnage pour compter les démarrages (s)
+    cache        : CacheResultats optionnel partagé entre dimensionnements
+    performances : carte_pac.PerformancesPAC éventuelle (puissance et COP de la PAC variables)
+    """
+    defaut = VARIABLES.get(variable, (None, None, None))
+    borne_min = defaut[0] if borne_min is None else borne_min
+    borne_max = defaut[1] if borne_max is None else borne_max
+    tolerance = defaut[2] if tolerance is None else tolerance
+    if borne_min is None or borne_max is None or tolerance is None:
+        raise ValueError(f"Bornes et tolérance requises pour la variable {variable!r}")
+    if not 0 < borne_min < borne_max:
+        raise ValueError("Il faut 0 < borne_min < borne_max")
+    p.remplacer(**{variable: borne_min})  # vérifie que la variable existe
+
+    memo = {}
+
+    def evaluation(x):
+        x = float(x)
+        if x not in memo:
+            q = p.remplacer(**{variable: x})
+            if cache is not None:
+                ev = cache.obtenir_ou_calculer(
+                    cle_stable("dimensionnement", q, profil, contraintes, duree, dt, jours_prechauffe, performances),
+                    lambda: evaluer(q, profil, contraintes, duree, dt, jours_prechauffe, performances),
+                )
+            else:
+                ev = evaluer(q, profil, contraintes, duree, dt, jours_prechauffe, performances)
+            ev.valeur = x
+            memo[x] = ev
+        return memo[x]
+
+    def resultat(valeur, ev):
+        evaluations = [memo[x] for x in sorted(memo)]
+        return Dimensionnement(variable, valeur, ev.faisable, ev, evaluations)
+
+    # Balayage géométrique : premier point faisable et dernier point infaisable avant lui
+    points = np.geomspace(borne_min, borne_max, max(n_balayage, 2))
+    lo = hi = None
+    for x in points:
+        if evaluation(x).faisable:
+            hi = float(x)
+            break
+        lo = float(x)
+    if hi is None:
+        return resultat(math.nan, evaluation(borne_max))
+    if lo is None:
+        return resultat(hi, evaluation(hi))
+
+    # Bissection sur la frontière de faisabilité
+    while hi - lo > tolerance:
+        m = (lo + hi) / 2
+        if evaluation(m).faisable:
+            hi = m
+        else:
+            lo = m
+    return resultat(hi, evaluation(hi))
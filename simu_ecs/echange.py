@@ -0,0 +1,130 @@
+"""
+Échange PAC -> ballon par serpentin, vectorisé (main4.py, main5.py, app_serpentin_pac.py).
+
+Tous les arguments sont diffusables (scalaires ou tableaux NumPy). Le calcul se fait
+par blocs dans des tampons réutilisés (arguments out=), sans branche Python par
+élément :
+- sortie primaire T_retour = max(T_depart - ΔT_primaire, T_ballon) ;
+- ΔT1 = T_depart - T_ballon, ΔT2 = max(T_retour - T_ballon, dT2_min) ;
+- ΔTlm = ΔT2 u / log1p(u) avec u = (ΔT1 - ΔT2) / ΔT2, précis quand ΔT1 -> ΔT2 ; la
+  limite u -> 0 est obtenue sans branche en ajoutant un ε infime au numérateur
+  et au dénominateur ;
+- aucun échange si ΔT1 <= 0, aucun NaN produit.
+
+dtype=np.float32 calcule en simple précision de bout en bout (entrées converties une
+fois, tampons et sorties en float32) : deux fois moins d'octets par élément et des
+logarithmes SIMD deux fois plus larges, soit environ le double d'évaluations par
+seconde. Les écarts au calcul double restent de l'ordre de 1e-5 K sur T_retour et
+1e-4 K sur ΔTlm (arrondi des T° d'entrée, sensible quand ΔT1 -> 0), soit moins d'un
+watt sur la puissance.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .parametres import CP_WATER, RHO_WATER
+
+DT2_MIN = 0.01          # écart minimal de sortie primaire (main5.py)
+EPS_LM = {np.dtype(np.float64): 1e-300, np.dtype(np.float32): 1e-38}  # négligeable devant tout u non nul utile
+TAILLE_BLOC = 16384     # éléments par bloc, tampons tenus en cache
+
+
+@dataclass
+class Echange:
+    """Résultats élément par élément, à la forme diffusée des entrées."""
+    P: np.ndarray            # puissance échangée, limitée par la PAC (W)
+    debit: np.ndarray        # débit primaire (m³/h)
+    T_retour: np.ndarray     # température de sortie serpentin / retour PAC (°C)
+    dT_lm: np.ndarray        # ΔT logarithmique moyen (K)
+    P_serpentin: np.ndarray  # puissance théorique du serpentin U.S.ΔTlm (W)
+
+
+def _aplatir(a, forme, dtype):
+    """Vue 1D (ou scalaire) de a diffusé à forme, sans copie quand c'est possible."""
+    a = np.asarray(a, dtype=dtype)
+    if a.size == 1:
+        return a.reshape(())
+    return np.broadcast_to(a, forme).reshape(-1)
+
+
+def echange_serpentin(T_depart, dT_primaire, T_ballon, U, S, P_pac_max=np.inf, dT2_min=DT2_MIN,
+                      taille_bloc=TAILLE_BLOC, out=None, dtype=np.float64):
+    """
+    Puissance, débit, température de retour et ΔTlm de l'échange serpentin.
+
+    U en W/m².K, S en m², P_pac_max en W (inf pour ne pas limiter)
+    dT2_min : plancher de l'écart de sortie (main5.py : 0.01 K)
+    out     : Echange dont les tableaux (contigus, à la forme diffusée, de type dtype)
+              reçoivent les résultats, pour réutiliser la mémoire d'un appel à l'autre
+    dtype   : précision du calcul et des sorties (np.float64 ou np.float32)
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in EPS_LM:
+        raise ValueError(f"Précision non prise en charge : {dtype} (float64 ou float32)")
+    entrees = (T_depart, dT_primaire, T_ballon, U, S, P_pac_max)
+    forme = np.broadcast_shapes(*(np.shape(a) for a in entrees))
+    Td, dTp, Tb, U_, S_, Pmax = (_aplatir(a, forme, dtype) for a in entrees)
+    n = int(np.prod(forme))
+    if out is None:
+        sorties = [np.empty(n, dtype) for _ in range(5)]
+    else:
+        sorties = [getattr(out, f.name).reshape(-1) for f in fields(Echange)]
+        if any(s.size != n or s.dtype != dtype or not np.shares_memory(s, getattr(out, f.name))
+               for s, f in zip(sorties, fields(Echange))):
+            raise ValueError(f"Tampons de sortie incompatibles avec la forme {forme} en {dtype}")
+    P, debit, T_retour, dT_lm, P_serp = sorties
+
+    # Facteurs constants hors de la boucle quand les entrées sont scalaires
+    US = U_ * S_ if U_.ndim == 0 and S_.ndim == 0 else None
+    k_debit = 3600 / (CP_WATER * RHO_WATER)
+    k_sur_dtp = (k_debit / dTp if dTp > 0 else 0.0) if dTp.ndim == 0 else None
+
+    eps = dtype.type(EPS_LM[dtype])
+    b = min(taille_bloc, max(n, 1))
+    d1, d2, u, w = (np.empty(b, dtype) for _ in range(4))
+    positif = np.empty(b, dtype=bool)
+    with np.errstate(divide="ignore"):
+        for debut in range(0, n, b):
+            sl = slice(debut, min(debut + b, n))
+            m = sl.stop - debut
+            d1_, d2_, u_, w_ = d1[:m], d2[:m], u[:m], w[:m]
+            td, dtp, tb = (a if a.ndim == 0 else a[sl] for a in (Td, dTp, Tb))
+            tr, lm, ps = T_retour[sl], dT_lm[sl], P_serp[sl]
+
+            # Températures et écarts ; ΔT1 <= 0 ramené à 0 (u = -1, ΔTlm nul)
+            np.subtract(td, dtp, out=tr)
+            np.maximum(tr, tb, out=tr)
+            np.subtract(td, tb, out=d1_)
+            np.maximum(d1_, 0.0, out=d1_)
+            np.subtract(tr, tb, out=d2_)
+            np.maximum(d2_, dT2_min, out=d2_)
+
+            # ΔTlm = ΔT2 (u + ε) / (log1p(u) + ε) : exact à la précision machine,
+            # vaut ΔT2 quand u = 0 (ΔT1 = ΔT2) et 0 quand u = -1 (log1p = -inf)
+            np.subtract(d1_, d2_, out=u_)
+            np.divide(u_, d2_, out=u_)
+            np.log1p(u_, out=w_)
+            np.add(w_, eps, out=w_)
+            np.add(u_, eps, out=u_)
+            np.divide(u_, w_, out=lm)
+            np.multiply(lm, d2_, out=lm)
+
+            # Puissances et débit
+            if US is not None:
+                np.multiply(lm, US, out=ps)
+            else:
+                np.multiply(U_ if U_.ndim == 0 else U_[sl], S_ if S_.ndim == 0 else S_[sl], out=ps)
+                np.multiply(ps, lm, out=ps)
+            np.minimum(ps, Pmax if Pmax.ndim == 0 else Pmax[sl], out=P[sl])
+            if k_sur_dtp is not None:
+                np.multiply(P[sl], k_sur_dtp, out=debit[sl])
+            else:
+                # Débit nul quand ΔT_primaire <= 0 (division protégée)
+                np.greater(dtp, 0.0, out=positif[:m])
+                w_.fill(0.0)
+                np.divide(k_debit, dtp, out=w_, where=positif[:m])
+                np.multiply(P[sl], w_, out=debit[sl])
+
+    if out is not None:
+        return out
+    return Echange(*(s.reshape(forme) if forme else s[0] for s in sorties))
@@ -0,0 +1,486 @@
+"""
+Intégrateur exact par événements du modèle PAC + chaudière + ballon mélangé.
+
+Entre deux événements (changement de palier de tirage, seuil de relance ou d'arrêt,
+fin de temporisation, coude de la puissance limitée par l'échangeur, butée à la
+température d'eau froide), la puissance nette est affine en T :
+
+    C dT/dt = P0 - K T   =>   T(t) = T0 + (a - b T0) (1 - exp(-b t)) / b
+
+Le moteur saute donc d'événement en événement avec la solution exponentielle,
+localise exactement les franchissements de seuil, intègre les énergies en forme
+close puis rééchantillonne les séries sur la grille de sortie demandée.
+Le résultat est celui de la boucle à pas fixe quand dt -> 0, sans dépendre de dt.
+
+Avec une carte de performances (carte_pac.PerformancesPAC), la puissance nominale
+et le COP de la PAC changent à chaque heure : ces changements sont des événements
+de plus et l'électricité de la PAC est intégrée au COP de chaque heure.
+
+Avec un programme de marche (pilotage.Programme), l'hystérésis est remplacée par
+les commandes du programme : la PAC démarre à la commande (après l'anti-court-cycle
+et la temporisation de démarrage) et s'arrête à la commande ou à T_arret ; la
+chaudière suit sa commande et se coupe à T_arret jusqu'au pas suivant du programme.
+
+Les profils de puisages comptent des milliers de paliers par jour : tant que la
+régulation ne change pas, les paliers de tirage consécutifs sont enchaînés d'un
+bloc (récurrence exponentielle vectorisée, voir _rafale), de sorte que le coût
+suit le nombre d'événements de régulation plutôt que le nombre de puisages.
+"""
+import math
+
+import numpy as np
+
+from .parametres import OFF, STARTING, HEATING
+from .profils import ProfilTirage
+from .resultats import Bilan, EtatSimulation, Resultat
+
+EPS_T = 1e-6           # tolérance sur les temporisations (s)
+MAX_TRANSITIONS = 10   # transitions successives autorisées au même instant
+MAX_PAS_NULS = 100     # segments de durée nulle consécutifs autorisés
+RAFALE_MIN = 4         # paliers de tirage à partir desquels ils sont enchaînés d'un bloc
+RAFALE_MAX = 2048      # paliers au plus par bloc
+RAFALE_BT = 5.0        # borne de b.(t - t0) dans un bloc (facteurs exp bien conditionnés)
+
+
+def _phi(b, tau):
+    """Intégrale de exp(-b s) pour s de 0 à tau, stable quand b -> 0."""
+    x = b * tau
+    if abs(x) < 1e-8:
+        return tau * (1 - x / 2)
+    return -math.expm1(-x) / b
+
+
+def _psi(b, tau):
+    """Intégrale de _phi(b, s) pour s de 0 à tau."""
+    x = b * tau
+    if abs(x) < 1e-4:
+        return tau * tau * (0.5 - x / 6 + x * x / 24)
+    return (tau - _phi(b, tau)) / b
+
+
+def _duree_jusqua(T0, niveau, a, b):
+    """Durée pour aller de T0 à `niveau` avec dT/dt = a - b T (inf si jamais atteint)."""
+    r = a - b * T0
+    if r == 0:
+        return math.inf
+    q = (niveau - T0) / r
+    if q <= 0:
+        return math.inf
+    bq = b * q
+    if bq >= 1:
+        return math.inf
+    if abs(bq) < 1e-8:
+        return q * (1 + bq / 2)
+    return -math.log1p(-bq) / b
+
+
+# --- Puissances affines par morceaux ---
+# Une rampe (pmax, g, T0) vaut min(pmax, max(0, g (T0 - T))) ; g = None -> pmax constant.
+
+def _rampes(p, pac_state, chaud_on, P_pac_nom):
+    P_chaud_nom = p.P_chaud_nom * 1000
+    us = p.us_global
+    pac, chaud = None, None
+    if pac_state == STARTING and p.modele == "pac_fixe":
+        # Temps de montée compté comme temps de marche sans chauffer (cf. main.py)
+        pac = (1e-6, None, 0.0)
+    elif pac_state == HEATING:
+        pac = (P_pac_nom, None, 0.0) if p.modele == "pac_fixe" else (P_pac_nom, us, p.T_prim)
+    if chaud_on:
+        if p.modele != "serpentin":
+            chaud = (P_chaud_nom, None, 0.0)
+        elif pac_state == STARTING:
+            chaud = (P_chaud_nom, us, p.T_prim)
+        elif pac_state != HEATING:
+            # Chaudière pilotée PAC à l'arrêt : tout le serpentin
+            chaud = (P_chaud_nom, us, p.T_prim)
+        elif us > 0:
+            # Reste de la capacité du serpentin après la PAC
+            chaud = (P_chaud_nom, us, p.T_prim - P_pac_nom / us)
+    return pac, chaud
+
+
+def _coefs(rampe, T):
+    """Coefficients (c0, k) de la rampe, affine c0 - k T au voisinage de T."""
+    if rampe is None:
+        return 0.0, 0.0
+    pmax, g, T0 = rampe
+    if g is None:
+        return pmax, 0.0
+    if g <= 0:
+        return 0.0, 0.0
+    x = g * (T0 - T)
+    if x >= pmax:
+        return pmax, 0.0
+    if x <= 0:
+        return 0.0, 0.0
+    return g * T0, g
+
+
+def _cassures(rampe):
+    if rampe is None or rampe[1] is None or rampe[1] <= 0:
+        return ()
+    pmax, g, T0 = rampe
+    return (T0 - pmax / g, T0)
+
+
+def _transitions(p, s, anti, delay, T_seuil, T_arret, marche=None):
+    """
+    Applique les changements d'état instantanés ; retourne (démarrages, changements d'état).
+    marche : commande de la PAC d'un programme, None pour l'hystérésis sur T_seuil.
+    """
+    demarrages = 0
+    entree_heating = False
+    arret = marche is not None and not marche
+    demande = s.T <= T_seuil if marche is None else marche and s.T < T_arret
+    for n in range(MAX_TRANSITIONS):
+        if s.pac_state == OFF and demande and s.time_since_stop >= anti - EPS_T:
+            s.pac_state = STARTING
+            s.wait_timer, s.chauffe_timer = 0.0, 0.0
+            if p.modele == "pac_fixe":
+                demarrages += 1
+        elif s.pac_state == STARTING and arret:
+            # Démarrage abandonné par le programme : compte comme un arrêt
+            s.pac_state = OFF
+            s.time_since_stop, s.chauffe_timer = 0.0, 0.0
+        elif s.pac_state == STARTING and s.wait_timer >= delay - EPS_T:
+            s.pac_state = HEATING
+            entree_heating = True
+        elif s.pac_state == HEATING and (s.T >= T_arret or arret):
+            s.pac_state = OFF
+            s.time_since_stop, s.chauffe_timer = 0.0, 0.0
+            entree_heating = False
+        else:
+            # Hors pac_fixe, un démarrage est compté quand la PAC fournit réellement de la puissance
+            if entree_heating and p.modele != "pac_fixe":
+                demarrages += 1
+            return demarrages, n
+    raise ValueError(
+        "Cycle instantané de la régulation : vérifier T° primaire, consigne, "
+        "delta de relance et temporisations."
+    )
+
+
+def simuler(p, profil, duree=86400.0, t_sortie=None, etat=None, performances=None, commande=None):
+    """
+    Simule `duree` secondes à partir de `etat` (état initial de `p` par défaut).
+
+    profil       : ProfilTirage, ou volumes horaires à 60°C (L/h) répétés périodiquement
+    t_sortie     : instants (s) où échantillonner les séries ; None pour le bilan seul
+    performances : carte_pac.PerformancesPAC (puissance et COP selon T_ext et T_prim) ;
+                   None pour p.P_pac_nom et p.cop_moyen constants
+    commande     : pilotage.Programme (marche PAC et chaudière par pas) ; None pour l'hystérésis
+    """
+    if not isinstance(profil, ProfilTirage):
+        profil = ProfilTirage.horaire(profil, p.T_eau_froide)
+    s = EtatSimulation.initial(p) if etat is None else etat.copie()
+    t_fin = s.t + duree
+
+    C = p.capacite
+    ua = p.ua_ballon
+    T_amb = p.T_amb
+    P_bouclage = p.P_bouclage_kW * 1000
+    anti = p.t_anti_cycle_min * 60
+    delay = p.t_delay_min * 60
+    secours = p.t_secours_min * 60
+    T_seuil, T_arret, T_ef = p.T_seuil, p.T_arret, p.T_eau_froide
+    if performances is not None:
+        # Carte évaluée en un bloc sur toute la série ; chaque pas lit ensuite son heure
+        P_h, cop_h = (a.tolist() for a in performances.paliers(p.T_prim))
+        pas_h, n_h = performances.pas, len(P_h)
+    P_pac_nom, cop, t_perf = p.P_pac_nom * 1000, p.cop_moyen, math.inf
+    marche, chaud_cmd, t_cmd = None, False, math.inf
+    chaud_coupe = False
+
+    e_pac = e_chaud = e_tirage = e_cuve = e_ecrete = e_elec = 0.0
+    T_debut = s.T
+    temps_pac = temps_chaud = 0.0
+    demarrages = 0
+    T_min = T_max = s.T
+    segments = [] if t_sortie is not None else None
+    pas_nuls = 0
+    enchaines = 0   # pas consécutifs terminés par un simple changement de palier de tirage
+    iterations = transitions = rafales = paliers_rafales = 0
+
+    while True:
+        iterations += 1
+        if commande is not None:
+            t_prec = t_cmd
+            marche, chaud_cmd, t_cmd = commande.palier(s.t)
+            if t_cmd != t_prec:
+                chaud_coupe = False
+        d_dem, d_trans = _transitions(p, s, anti, delay, T_seuil, T_arret, marche)
+        demarrages += d_dem
+        transitions += d_trans
+        if s.t >= t_fin:
+            break
+
+        if performances is not None:
+            k = int(s.t // pas_h)
+            P_pac_nom, cop, t_perf = P_h[k % n_h], cop_h[k % n_h], (k + 1) * pas_h
+        if commande is None:
+            chaud_on = s.pac_state != OFF and s.chauffe_timer >= secours - EPS_T
+        else:
+            # Chaudière pilotée avec thermostat à T_arret, réarmé au pas suivant du programme
+            chaud_coupe = chaud_coupe or (chaud_cmd and s.T >= T_arret)
+            chaud_on = chaud_cmd and not chaud_coupe
+        pac, chaud = _rampes(p, s.pac_state, chaud_on, P_pac_nom)
+
+        # Prochain événement des temporisations (et changement d'heure de la carte ou de pas du programme)
+        t_regul = min(t_fin, t_perf, t_cmd)
+        if s.pac_state == OFF and s.time_since_stop < anti - EPS_T:
+            t_regul = min(t_regul, s.t + anti - s.time_since_stop)
+        if s.pac_state == STARTING:
+            t_regul = min(t_regul, s.t + delay - s.wait_timer)
+        if s.pac_state != OFF and not chaud_on and commande is None:
+            t_regul = min(t_regul, s.t + secours - s.chauffe_timer)
+
+        # Puisages rapprochés : paliers de tirage enchaînés d'un bloc tant que la régulation ne bouge pas
+        if enchaines >= 2 and s.T > T_ef:
+            enchaines = 0
+            bas = max(T_ef, T_seuil) if s.pac_state == OFF and s.T > T_seuil else T_ef
+            haut = T_arret if s.pac_state == HEATING or (commande is not None and chaud_on) else math.inf
+            rafale = _rafale(profil, s.t, s.T, t_regul, pac, chaud, C, ua, T_amb, P_bouclage, bas, haut)
+            if rafale is not None:
+                bornes, T_k, a_k, b, (c0p, kp, c0c, kc), p_k, Tm = rafale
+                tau = np.diff(bornes)
+                IT = float(np.dot(T_k[:-1], tau) + np.dot(a_k - b * T_k[:-1], _psi_vec(b, tau)))
+                duree_r = float(bornes[-1]) - s.t
+                d_pac = c0p * duree_r - kp * IT
+                e_pac += d_pac
+                e_elec += d_pac / cop
+                e_chaud += c0c * duree_r - kc * IT
+                e_tirage += float(np.dot(p_k, tau))
+                e_cuve += ua * (IT - T_amb * duree_r)
+                if c0p - kp * Tm > 0:
+                    temps_pac += duree_r
+                if c0c - kc * Tm > 0:
+                    temps_chaud += duree_r
+                if segments is not None:
+                    n_k = len(tau)
+                    segments.extend(zip(bornes[:-1].tolist(), T_k[:-1].tolist(), a_k.tolist(), [b] * n_k,
+                                        [c0p] * n_k, [kp] * n_k, [c0c] * n_k, [kc] * n_k, p_k.tolist()))
+                if s.pac_state == OFF:
+                    s.time_since_stop += duree_r
+                elif s.pac_state == STARTING:
+                    s.wait_timer += duree_r
+                    s.chauffe_timer += duree_r
+                else:
+                    s.chauffe_timer += duree_r
+                s.T = float(T_k[-1])
+                s.t = float(bornes[-1])
+                T_min, T_max = min(T_min, float(T_k.min())), max(T_max, float(T_k.max()))
+                pas_nuls = 0
+                rafales += 1
+                paliers_rafales += len(tau)
+                continue
+
+        p_tir, t_palier = profil.palier(s.t)
+        t_evt = min(t_regul, t_palier)
+
+        # Bande de température où la puissance nette est affine
+        def nette(T):
+            c0p, kp = _coefs(pac, T)
+            c0c, kc = _coefs(chaud, T)
+            return c0p - kp * T + c0c - kc * T - ua * (T - T_amb) - P_bouclage - p_tir
+
+        T0 = s.T
+        f0 = nette(T0)
+        niveau = None
+        ecrete = 0.0
+        if T0 <= T_ef and f0 < 0:
+            # Butée à l'eau froide : T reste à T_ef, l'excédent de tirage est écrêté
+            Tm = T_ef
+            a = b = 0.0
+            ecrete = -f0
+        else:
+            montee = f0 > 0
+            points = sorted(set(_cassures(pac) + _cassures(chaud)))
+            lo = max((x for x in points if x < T0 or (montee and x == T0)), default=-math.inf)
+            hi = min((x for x in points if x > T0 or (not montee and x == T0)), default=math.inf)
+            if math.isfinite(lo) and math.isfinite(hi):
+                Tm = (lo + hi) / 2
+            elif math.isfinite(lo):
+                Tm = lo + 1
+            elif math.isfinite(hi):
+                Tm = hi - 1
+            else:
+                Tm = T0
+            c0p, kp = _coefs(pac, Tm)
+            c0c, kc = _coefs(chaud, Tm)
+            a = (c0p + c0c + ua * T_amb - P_bouclage - p_tir) / C
+            b = (kp + kc + ua) / C
+            if montee:
+                niveaux = [hi]
+                if (s.pac_state == HEATING or (commande is not None and chaud_on)) and T0 < T_arret:
+                    niveaux.append(T_arret)
+            elif f0 < 0:
+                niveaux = [lo]
+                if T0 > T_ef:
+                    niveaux.append(T_ef)
+                if s.pac_state == OFF and T0 > T_seuil and commande is None:
+                    niveaux.append(T_seuil)
+            else:
+                niveaux = []
+            for L in niveaux:
+                if not math.isfinite(L):
+                    continue
+                d = _duree_jusqua(T0, L, a, b)
+                if s.t + d <= t_evt:
+                    t_evt = s.t + d
+                    niveau = L
+
+        # Avance exacte jusqu'à l'événement
+        tau = max(t_evt - s.t, 0.0)
+        if tau == 0.0:
+            pas_nuls += 1
+            if pas_nuls > MAX_PAS_NULS:
+                raise RuntimeError(f"Moteur bloqué à t = {s.t:.3f} s")
+        else:
+            pas_nuls = 0
+        enchaines = enchaines + 1 if niveau is None and t_evt == t_palier and tau > 0 else 0
+        r = a - b * T0
+        T1 = niveau if niveau is not None else T0 + r * _phi(b, tau)
+        IT = T0 * tau + r * _psi(b, tau)
+
+        c0p, kp = _coefs(pac, Tm)
+        c0c, kc = _coefs(chaud, Tm)
+        d_pac = c0p * tau - kp * IT
+        e_pac += d_pac
+        e_elec += d_pac / cop
+        e_chaud += c0c * tau - kc * IT
+        e_tirage += p_tir * tau
+        e_cuve += ua * (IT - T_amb * tau)
+        e_ecrete += ecrete * tau
+        if c0p - kp * Tm > 0:
+            temps_pac += tau
+        if c0c - kc * Tm > 0:
+            temps_chaud += tau
+
+        if segments is not None:
+            segments.append((s.t, T0, a, b, c0p, kp, c0c, kc, p_tir))
+
+        if s.pac_state == OFF:
+            s.time_since_stop += tau
+        elif s.pac_state == STARTING:
+            s.wait_timer += tau
+            s.chauffe_timer += tau
+        else:
+            s.chauffe_timer += tau
+        s.T = T1
+        s.t = t_evt
+        T_min, T_max = min(T_min, T1), max(T_max, T1)
+
+    bilan = Bilan(
+        e_th_pac=e_pac / 3600000,
+        e_th_chaud=e_chaud / 3600000,
+        e_tirage=e_tirage / 3600000,
+        e_pertes_cuve=e_cuve / 3600000,
+        e_bouclage=P_bouclage * duree / 3600000,
+        e_stockee=C * (s.T - T_debut) / 3600000,
+        e_ecretee=e_ecrete / 3600000,
+        e_elec=e_elec / 3600000,
+        demarrages=demarrages,
+        temps_marche_pac=temps_pac,
+        temps_marche_chaud=temps_chaud,
+        T_min=T_min,
+        T_max=T_max,
+        T_final=s.T,
+        duree=duree,
+    )
+    compteurs = {"iterations": iterations, "transitions": transitions,
+                 "rafales": rafales, "paliers_rafales": paliers_rafales}
+    if t_sortie is None:
+        return Resultat(None, None, None, None, None, bilan, s, compteurs=compteurs)
+    t_sortie = np.asarray(t_sortie, dtype=float)
+    T, P_pac, P_chaud, P_tirage = _echantillonner(segments, t_sortie, s)
+    return Resultat(t_sortie, T, P_pac, P_chaud, P_tirage, bilan, s, compteurs=compteurs)
+
+
+def _rafale(profil, t0, T0, t_lim, pac, chaud, C, ua, T_amb, P_bouclage, bas, haut):
+    """
+    Avance groupée sur des paliers de tirage consécutifs, régulation figée.
+
+    Tant que T reste dans la bande où les rampes sont affines et dans ]bas, haut[
+    (seuils de régulation), chaque palier k suit dT/dt = a_k - b T avec b commun :
+
+        T_k = exp(-b (t_k - t0)) [T0 + somme_{j<k} a_j exp(b (t_j - t0)) expm1(b tau_j) / b]
+
+    T étant monotone sur un palier, les paliers sont acceptés jusqu'au premier dont
+    la fin sort de la bande ; le moteur reprend ce dernier événement par événement.
+    Retourne None quand moins de RAFALE_MIN paliers précèdent t_lim.
+    """
+    points = _cassures(pac) + _cassures(chaud)
+    if T0 in points:
+        return None
+    lo = max([x for x in points if x < T0] + [bas])
+    hi = min([x for x in points if x > T0] + [haut])
+    if not lo < T0 < hi:
+        return None
+    Tm = (lo + hi) / 2 if math.isfinite(lo) and math.isfinite(hi) else T0
+    c0p, kp = _coefs(pac, Tm)
+    c0c, kc = _coefs(chaud, Tm)
+    b = (kp + kc + ua) / C
+    if b > 0:
+        t_lim = min(t_lim, t0 + RAFALE_BT / b)
+    bornes, p_k = profil.paliers(t0, t_lim, RAFALE_MAX)
+    if len(p_k) < RAFALE_MIN:
+        return None
+
+    a_k = (c0p + c0c + ua * T_amb - P_bouclage - p_k) / C
+    tau = np.diff(bornes)
+    if b > 0:
+        x = b * (bornes - t0)
+        apports = a_k * np.exp(x[:-1]) * np.expm1(b * tau) / b
+        T_k = np.exp(-x) * (T0 + np.concatenate([[0.0], np.cumsum(apports)]))
+    else:
+        T_k = T0 + np.concatenate([[0.0], np.cumsum(a_k * tau)])
+
+    dedans = (T_k[1:] > lo) & (T_k[1:] < hi)
+    m = len(tau) if dedans.all() else int(np.argmin(dedans))
+    if m == 0:
+        return None
+    return bornes[:m + 1], T_k[:m + 1], a_k[:m], b, (c0p, kp, c0c, kc), p_k[:m], Tm
+
+
+def _psi_vec(b, tau):
+    x = b * tau
+    petit = np.abs(x) < 1e-4
+    b_sur = np.where(petit, 1.0, b)
+    return np.where(petit, tau * tau * (0.5 - x / 6 + x * x / 24), (tau - _phi_vec(b, tau)) / b_sur)
+
+
+def _phi_vec(b, tau):
+    x = b * tau
+    petit = np.abs(x) < 1e-8
+    b_sur = np.where(petit, 1.0, b)
+    return np.where(petit, tau * (1 - x / 2), -np.expm1(-x) / b_sur)
+
+
+def _echantillonner(segments, t, etat_final):
+    """
+    Évalue les séries aux instants t. La température est exacte ; les puissances
+    sont celles du segment qui se termine en t (convention de la boucle à pas fixe).
+    """
+    if not segments:
+        T = np.full(t.shape, etat_final.T)
+        zeros = np.zeros(t.shape)
+        return T, zeros, zeros.copy(), zeros.copy()
+    t0, T0, a, b, c0p, kp, c0c, kc, p_tir = (np.array(c) for c in zip(*segments))
+    r = a - b * T0
+
+    i = np.clip(np.searchsorted(t0, t, side="right") - 1, 0, len(t0) - 1)
+    T = T0[i] + r[i] * _phi_vec(b[i], t - t0[i])
+
+    j = np.clip(np.searchsorted(t0, t, side="left") - 1, 0, len(t0) - 1)
+    Tj = T0[j] + r[j] * _phi_vec(b[j], t - t0[j])
+    P_pac = np.maximum(c0p[j] - kp[j] * Tj, 0.0)
+    P_chaud = np.maximum(c0c[j] - kc[j] * Tj, 0.0)
+    return T, P_pac, P_chaud, p_tir[j]
+
+
+def simuler_journee(p, profil, dt=10, duree=86400, performances=None):
+    """Simulation des applications : fonction pure des paramètres et du profil (horaire ou ProfilTirage)."""
+    t_steps = int(duree / dt)
+    time_array = np.arange(0, t_steps * dt, dt)
+    return simuler(p, profil, duree=duree, t_sortie=time_array, performances=performances)
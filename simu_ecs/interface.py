@@ -0,0 +1,66 @@
+"""
+Éléments Streamlit communs aux simulateurs (main.py, main2.py, main3_serp.py).
+
+Seul module du paquet qui importe Streamlit : il n'est chargé que par les applications,
+ni par le paquet (__init__) ni par le lanceur en ligne de commande.
+"""
+import os
+
+import streamlit as st
+
+from .cache import CacheResultats
+from .carte_pac import CartePAC, PerformancesPAC, lire_temperatures
+from .reprise import SimulationIncrementale
+
+
+@st.cache_resource
+def cache_simulation():
+    # Partagé entre les sessions ; niveau disque si SIMU_ECS_CACHE désigne un dossier
+    return CacheResultats(max_entrees=32, age_max=3600, dossier=os.environ.get("SIMU_ECS_CACHE"))
+
+
+def simulation_incrementale(params, dt, duree, performances=None, etat=None):
+    # Points de reprise horaires propres à la session, repris tant que seuls les volumes changent
+    inc = st.session_state.get("simulation_incrementale")
+    if inc is None or not inc.compatible(params, dt, duree, performances, etat):
+        inc = SimulationIncrementale(params, dt, duree, performances=performances, etat=etat)
+        st.session_state["simulation_incrementale"] = inc
+    return inc
+
+
+def afficher_regime(regime):
+    # La journée affichée est la première du cycle établi ; bilan moyen du cycle si plusieurs jours
+    if regime.n_cycle == 1 and regime.converge:
+        st.caption(f"🔁 Régime établi en {regime.n_periodes} jours simulés : "
+                   f"{regime.etat.T:.1f} °C en début de journée, retrouvés en fin de journée")
+        return
+    b = regime.bilan
+    cycle = f"un cycle de {regime.n_cycle} jours" if regime.converge else f"un cycle approché de {regime.n_cycle} jours"
+    st.warning(f"🔁 Pas de régime journalier : la régulation suit {cycle} ({regime.n_periodes} jours simulés). "
+               f"Journée affichée : la première du cycle ({regime.etat.T:.1f} °C au départ). Moyenne par jour du cycle : "
+               f"PAC {b.e_th_pac:.2f} kWh, chaudière {b.e_th_chaud:.2f} kWh, {b.demarrages:.1f} démarrages.")
+
+
+def performances_pac(T_prim, puissance_remplacee="puissance nominale"):
+    # Carte constructeur et T° extérieures horaires (optionnelles) : puissance et COP de la PAC variables
+    st.header("🗺️ Carte de performances PAC")
+    fichier_carte = st.file_uploader(
+        "Carte COP / puissance (CSV, optionnel)", type="csv",
+        help="Colonnes T_ext, T_eau (°C), cop, puissance (kW th) ; un point de la grille constructeur par ligne. "
+             f"Remplace la {puissance_remplacee} et le COP moyen.",
+    )
+    if fichier_carte is None:
+        return None
+    fichier_meteo = st.file_uploader("T° extérieures horaires (CSV)", type="csv",
+                                     help="Colonne T_ext (°C), une ligne par heure")
+    T_ext_fixe = st.number_input("T° extérieure sans fichier (°C)", -25.0, 45.0, 7.0, disabled=fichier_meteo is not None)
+    try:
+        carte = CartePAC.lire(fichier_carte)
+        T_ext = lire_temperatures(fichier_meteo) if fichier_meteo is not None else [T_ext_fixe]
+    except ValueError as e:
+        st.error(f"⚠️ {e}")
+        return None
+    performances = PerformancesPAC(carte, T_ext)
+    P, cop = performances.paliers(T_prim)
+    st.caption(f"🗺️ À {T_prim:.0f}°C : {P.min() / 1000:.1f} à {P.max() / 1000:.1f} kW, COP {cop.min():.2f} à {cop.max():.2f}")
+    return performances
@@ -0,0 +1,277 @@
+"""
+Moteur par lot : des milliers de configurations simulées en une passe NumPy.
+
+Chaque scénario est une voie : la température, l'état de la PAC, les temporisations
+et les puissances sont des vecteurs (n_scenarios,) et les transitions
+OFF/STARTING/HEATING deviennent des mises à jour masquées. Le schéma est celui
+de la boucle à pas fixe (reference.simuler_pas_fixe), voie par voie.
+"""
+import itertools
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .parametres import CP_WATER, MARGE_COUPURE, RHO_WATER, Parametres
+from .resultats import Bilan
+
+# Codes d'état des voies
+C_OFF, C_STARTING, C_HEATING = 0, 1, 2
+
+# Paramètres numériques pouvant varier d'une voie à l'autre
+CHAMPS = tuple(f.name for f in fields(Parametres) if f.name != "modele")
+
+# État des voies et accumulateurs du bilan : ce que MoteurLot.etat() sauve et reprendre() restitue
+ETAT = ("i", "T", "state", "i_stop", "i_dem", "marche_prec", "s_pac", "s_chaud", "s_T", "s_ecrete",
+        "pas_par_heure", "demarrages", "n_pac", "n_chaud", "T_min", "T_max")
+
+
+def grille(**axes):
+    """
+    Produit cartésien des axes de dimensionnement, aplati en vecteurs.
+    Ex. grille(V_ball=[500, 1000], P_pac_nom=[10, 15, 20]) -> 6 scénarios.
+    """
+    noms = list(axes)
+    combinaisons = list(itertools.product(*(np.atleast_1d(axes[n]) for n in noms)))
+    return {n: np.array([c[k] for c in combinaisons], dtype=float) for k, n in enumerate(noms)}
+
+
+@dataclass
+class BilanLot:
+    """Bilans énergétiques par scénario (vecteurs (n_scenarios,), mêmes unités que Bilan)."""
+    e_th_pac: np.ndarray
+    e_th_chaud: np.ndarray
+    e_tirage: np.ndarray
+    e_pertes_cuve: np.ndarray
+    e_bouclage: np.ndarray
+    e_stockee: np.ndarray
+    e_ecretee: np.ndarray
+    demarrages: np.ndarray
+    temps_marche_pac: np.ndarray
+    temps_marche_chaud: np.ndarray
+    T_min: np.ndarray
+    T_max: np.ndarray
+    T_final: np.ndarray
+    duree: float
+
+    def __len__(self):
+        return len(self.e_th_pac)
+
+    @property
+    def part_chaudiere(self):
+        e = self.e_th_pac + self.e_th_chaud
+        return np.divide(self.e_th_chaud * 100, e, out=np.zeros_like(e), where=e > 0)
+
+    @property
+    def residu(self):
+        """Écart de fermeture du bilan par scénario (voir Bilan.residu)."""
+        return self.e_stockee - (self.e_th_pac + self.e_th_chaud - self.e_tirage - self.e_pertes_cuve - self.e_bouclage)
+
+    def scenario(self, k):
+        valeurs = {f.name: getattr(self, f.name) for f in fields(self)}
+        return Bilan(**{n: (v if n == "duree" else v[k].item()) for n, v in valeurs.items()})
+
+    @classmethod
+    def concatener(cls, morceaux):
+        morceaux = list(morceaux)
+        return cls(**{
+            f.name: (morceaux[0].duree if f.name == "duree"
+                     else np.concatenate([getattr(m, f.name) for m in morceaux]))
+            for f in fields(cls)
+        })
+
+
+class MoteurLot:
+    """
+    Avance un lot de voies pas à pas.
+
+    base        : Parametres communs (fixe le modèle)
+    variations  : dict nom -> vecteur (n,) des paramètres qui varient
+    hour_volumes: volumes horaires (H,) communs ou (n, H) par voie (L/h à 60°C)
+    """
+
+    def __init__(self, base, variations, hour_volumes, dt=10):
+        inconnus = set(variations) - set(CHAMPS)
+        if inconnus:
+            raise ValueError(f"Paramètres inconnus : {', '.join(sorted(inconnus))}")
+        n = max((len(np.atleast_1d(v)) for v in variations.values()), default=1)
+        hv = np.asarray(hour_volumes, dtype=float)
+        if hv.ndim == 2:
+            n = max(n, hv.shape[0])
+        self.n = n
+        self.modele = base.modele
+        self.dt = dt
+        self.p = {
+            nom: np.broadcast_to(np.asarray(variations.get(nom, getattr(base, nom)), dtype=float), (n,))
+            for nom in CHAMPS
+        }
+        p = self.p
+        # Grandeurs dérivées par voie
+        self.C = p["V_ball"] / 1000 * RHO_WATER * CP_WATER
+        self.us = p["S_serpentin"] * p["K_echange"]
+        self.T_seuil = p["T_cons"] - p["dT_restart"]
+        self.T_arret = np.minimum(p["T_cons"], p["T_prim"] - MARGE_COUPURE[self.modele])
+        self.P_pac_nom = p["P_pac_nom"] * 1000
+        self.P_chaud_nom = p["P_chaud_nom"] * 1000
+        self.P_bouclage = p["P_bouclage_kW"] * 1000
+        self.anti = p["t_anti_cycle_min"] * 60
+        self.delay = p["t_delay_min"] * 60
+        self.secours = p["t_secours_min"] * 60
+        # Puissance de tirage (H, n) pour un accès contigu par heure
+        dT_ef = 60 - p["T_eau_froide"]
+        if hv.ndim == 2:
+            self.P_tir = np.ascontiguousarray((np.broadcast_to(hv, (n, hv.shape[1])) / 3600 * CP_WATER * dT_ef[:, None]).T)
+        else:
+            self.P_tir = hv[:, None] / 3600 * CP_WATER * dT_ef[None, :]
+
+        # Les temporisations sont tenues par le numéro du pas où elles ont démarré :
+        # time_since_stop = (i - i_stop) dt, wait_timer = chauffe_timer = (i - i_dem) dt
+        self.n_anti = self.anti / dt
+        self.n_delay = self.delay / dt
+        self.n_secours = self.secours / dt
+
+        # État
+        self.i = 1
+        self.T = p["T_init"].copy()
+        self.state = np.full(n, C_OFF, dtype=np.int8)
+        self.i_stop = np.full(n, -9999.0 / dt)
+        self.i_dem = np.zeros(n)
+        self.marche_prec = np.zeros(n, dtype=bool)
+        # Accumulateurs (sommes par pas)
+        self.s_pac = np.zeros(n)
+        self.s_chaud = np.zeros(n)
+        self.s_T = np.zeros(n)       # T° en début de chaque pas intégré
+        self.s_ecrete = np.zeros(n)
+        self.pas_par_heure = np.zeros(self.P_tir.shape[0], dtype=np.int64)
+        self.demarrages = np.zeros(n, dtype=np.int64)
+        self.n_pac = np.zeros(n, dtype=np.int64)
+        self.n_chaud = np.zeros(n, dtype=np.int64)
+        self.T_min = self.T.copy()
+        self.T_max = self.T.copy()
+
+    @property
+    def wait_timer(self):
+        return np.where(self.state == C_STARTING, (self.i - 1 - self.i_dem) * self.dt, 0.0)
+
+    @property
+    def chauffe_timer(self):
+        return np.where(self.state != C_OFF, (self.i - 1 - self.i_dem) * self.dt, 0.0)
+
+    @property
+    def time_since_stop(self):
+        return np.where(self.state == C_OFF, (self.i - 1 - self.i_stop) * self.dt, 0.0)
+
+    def pas(self):
+        """Un pas de temps sur toutes les voies ; retourne (p_pac, p_chaud, p_tirage) en W."""
+        p, dt, i = self.p, self.dt, self.i
+        Ti = self.T
+        curr_h = int((i * dt / 3600) % self.P_tir.shape[0])
+        p_tir = self.P_tir[curr_h]
+        self.pas_par_heure[curr_h] += 1
+        state = self.state
+
+        off = state == C_OFF
+        sta = state == C_STARTING
+        hea = state == C_HEATING
+
+        # OFF -> STARTING
+        dem = off & (Ti <= self.T_seuil) & ((i - self.i_stop) >= self.n_anti)
+        np.copyto(state, C_STARTING, where=dem)
+        np.copyto(self.i_dem, i, where=dem)
+
+        # STARTING -> HEATING, HEATING -> OFF
+        k = i - self.i_dem
+        secours = k > self.n_secours
+        np.copyto(state, C_HEATING, where=sta & (k >= self.n_delay))
+        stop = hea & (Ti >= self.T_arret)
+        np.copyto(state, C_OFF, where=stop)
+        np.copyto(self.i_stop, i, where=stop)
+        run = hea ^ stop
+
+        # Puissances
+        if self.modele == "pac_fixe":
+            p_pac = np.where(run, self.P_pac_nom, sta * 1e-6)
+            p_chaud = np.where((sta | run) & secours, self.P_chaud_nom, 0.0)
+        else:
+            p_e_max = self.us * (p["T_prim"] - Ti)
+            p_pac = np.where(run, np.minimum(self.P_pac_nom, p_e_max), 0.0)
+            if self.modele == "serpentin":
+                # En chauffe, la chaudière n'a que le reste de la capacité du serpentin
+                dispo = np.maximum(0, np.where(run, p_e_max - p_pac, p_e_max))
+                p_chaud = np.where((sta | run) & secours, np.minimum(self.P_chaud_nom, dispo), 0.0)
+            else:
+                p_chaud = np.where((sta | run) & secours, self.P_chaud_nom, 0.0)
+
+        # Bilan énergétique du pas de temps
+        p_pertes = (p["ua_ballon"] * (Ti - p["T_amb"])) + self.P_bouclage
+        self.s_T += Ti
+        T_brut = Ti + (p_pac + p_chaud - p_pertes - p_tir) * dt / self.C
+        T = np.maximum(p["T_eau_froide"], T_brut)
+        self.T = T
+        self.s_ecrete += T - T_brut
+
+        self.s_pac += p_pac
+        self.s_chaud += p_chaud
+        marche = p_pac > 0
+        self.demarrages += marche > self.marche_prec
+        self.n_pac += marche
+        self.n_chaud += p_chaud > 0
+        np.minimum(self.T_min, T, out=self.T_min)
+        np.maximum(self.T_max, T, out=self.T_max)
+        self.marche_prec = marche
+        self.i += 1
+        return p_pac, p_chaud, p_tir
+
+    def avancer(self, n_pas):
+        for _ in range(n_pas):
+            self.pas()
+
+    def etat(self):
+        """Copie de l'état des voies et des accumulateurs (quelques vecteurs (n,), sans le profil)."""
+        return {nom: np.copy(v) if isinstance(v, np.ndarray) else v
+                for nom, v in ((nom, getattr(self, nom)) for nom in ETAT)}
+
+    def reprendre(self, etat):
+        """Reprend un état sauvé par etat() sur un moteur construit pour les mêmes voies."""
+        for nom, v in etat.items():
+            setattr(self, nom, np.copy(v) if isinstance(v, np.ndarray) else v)
+
+    def bilan(self):
+        dt, p = self.dt, self.p
+        return BilanLot(
+            e_th_pac=self.s_pac * dt / 3600000,
+            e_th_chaud=self.s_chaud * dt / 3600000,
+            e_tirage=self.pas_par_heure @ self.P_tir * dt / 3600000,
+            # i - 1 pas intégrés : la T° initiale occupe le premier point
+            e_pertes_cuve=p["ua_ballon"] * (self.s_T - (self.i - 1) * p["T_amb"]) * dt / 3600000,
+            e_bouclage=p["P_bouclage_kW"] * (self.i - 1) * dt / 3600,
+            e_stockee=self.C * (self.T - p["T_init"]) / 3600000,
+            e_ecretee=self.C * self.s_ecrete / 3600000,
+            demarrages=self.demarrages.copy(),
+            temps_marche_pac=self.n_pac * dt,
+            temps_marche_chaud=self.n_chaud * dt,
+            T_min=self.T_min.copy(),
+            T_max=self.T_max.copy(),
+            T_final=self.T.copy(),
+            duree=self.i * dt,
+        )
+
+
+def simuler_lot(base, variations, hour_volumes, dt=10, duree=86400, taille_bloc=16384):
+    """
+    Simule tous les scénarios de `variations` (cf. grille) et retourne un BilanLot.
+    Les voies sont traitées par blocs de `taille_bloc` pour borner la mémoire.
+    """
+    hv = np.asarray(hour_volumes, dtype=float)
+    n = max((len(np.atleast_1d(v)) for v in variations.values()), default=1)
+    if hv.ndim == 2:
+        n = max(n, hv.shape[0])
+    t_steps = int(duree / dt)
+    morceaux = []
+    for debut in range(0, n, taille_bloc):
+        tranche = slice(debut, min(debut + taille_bloc, n))
+        var_bloc = {k: np.broadcast_to(np.asarray(v, dtype=float), (n,))[tranche] for k, v in variations.items()}
+        hv_bloc = hv[tranche] if hv.ndim == 2 else hv
+        moteur = MoteurLot(base, var_bloc, hv_bloc, dt)
+        moteur.avancer(t_steps - 1)
+        morceaux.append(moteur.bilan())
+    return BilanLot.concatener(morceaux)
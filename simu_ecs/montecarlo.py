@@ -0,0 +1,143 @@
+"""
+Monte Carlo sur des profils de soutirage aléatoires.
+
+Chaque jour tiré part du profil de soutirage (volumes horaires édités « Répartition
+(%) » ou cycle de puisages) :
+- le volume journalier est multiplié par un facteur log-normal de moyenne 1 ;
+- chaque heure reçoit un bruit multiplicatif propre, puis ses paliers sont décalés
+  d'un retard gaussien (jitter), circulairement sur la journée. Un palier suit l'heure
+  où il commence : pour le profil horaire, un palier est le créneau de l'heure.
+Les jours sont indépendants et partent tous de l'état atteint après un jour de
+préchauffe au profil nominal.
+
+Les jours sont répartis entre les cœurs par un pool de processus. Chaque jour a sa
+propre graine, enfant d'une SeedSequence : les résultats ne dépendent ni du nombre de
+processus ni du découpage. Les bilans sont écrits directement dans un tableau en
+mémoire partagée (une ligne par jour), sans renvoyer de tableaux par pickle.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .evenements import simuler
+from .lot import BilanLot
+from .profils import ProfilTirage
+
+# Colonnes du tableau partagé (BilanLot sans la durée, commune)
+COLONNES = tuple(f.name for f in fields(BilanLot) if f.name != "duree")
+
+
+@dataclass(frozen=True)
+class Alea:
+    """Amplitude des perturbations du profil journalier."""
+    cv_volume: float = 0.2     # coefficient de variation du volume journalier
+    cv_horaire: float = 0.3    # coefficient de variation de chaque heure
+    jitter_min: float = 30.0   # écart-type du décalage des créneaux (min)
+
+
+def _lognormal(rng, cv, taille=None):
+    """Facteurs log-normaux de moyenne 1 et de coefficient de variation cv."""
+    if cv <= 0:
+        return np.ones(taille) if taille is not None else 1.0
+    s = math.sqrt(math.log1p(cv * cv))
+    return rng.lognormal(-s * s / 2, s, taille)
+
+
+def profil_aleatoire(rng, profil, T_eau_froide, alea=Alea()):
+    """ProfilTirage périodique d'une journée tirée autour du profil (volumes horaires ou ProfilTirage périodique)."""
+    if not isinstance(profil, ProfilTirage):
+        profil = ProfilTirage.horaire(profil, T_eau_froide)
+    if profil.periode is None:
+        raise ValueError("Le Monte Carlo demande un profil périodique")
+    n_h = math.ceil(profil.periode / 3600)
+    facteurs = _lognormal(rng, alea.cv_volume) * _lognormal(rng, alea.cv_horaire, n_h)
+    retards = rng.normal(0.0, alea.jitter_min * 60, n_h)
+    h = (profil.instants // 3600).astype(int)
+    durees = np.diff(np.append(profil.instants, profil.periode))
+    # Paliers superposés, repliés sur la période
+    return ProfilTirage.creneaux(profil.instants + retards[h], durees, profil.puissances * facteurs[h], profil.periode)
+
+
+def _travailleur(nom_shm, n_jours, p, profil, alea, etat, graines, debut, performances=None):
+    """Simule les jours [debut, debut + len(graines)) et écrit leurs bilans dans le tableau partagé."""
+    shm = shared_memory.SharedMemory(name=nom_shm)
+    try:
+        table = np.ndarray((n_jours, len(COLONNES)), dtype=np.float64, buffer=shm.buf)
+        for k, graine in enumerate(graines):
+            rng = np.random.default_rng(graine)
+            jour = profil_aleatoire(rng, profil, p.T_eau_froide, alea)
+            b = simuler(p, jour, duree=86400.0, etat=etat, performances=performances).bilan
+            table[debut + k] = [getattr(b, c) for c in COLONNES]
+        del table
+    finally:
+        shm.close()
+    return len(graines)
+
+
+@dataclass
+class MonteCarlo:
+    """Bilans des jours tirés et statistiques de queue."""
+    bilans: BilanLot
+    graine: int
+    alea: Alea
+
+    def __len__(self):
+        return len(self.bilans)
+
+    def valeurs(self, champ):
+        """Vecteur des jours pour un champ de BilanLot ou 'part_chaudiere'."""
+        return getattr(self.bilans, champ)
+
+    def percentiles(self, champs=None, q=(5, 50, 95)):
+        """{champ: {q: valeur}} pour chaque terme du bilan."""
+        champs = COLONNES + ("part_chaudiere",) if champs is None else champs
+        return {c: dict(zip(q, np.percentile(self.valeurs(c), q).tolist())) for c in champs}
+
+    def probabilite_sous(self, champ, seuil):
+        """Fraction des jours où le champ est strictement sous le seuil."""
+        return float(np.mean(self.valeurs(champ) < seuil))
+
+
+def simuler_monte_carlo(p, profil, n_jours=1000, graine=0, alea=Alea(), processus=None, taille_lot=None,
+                        performances=None):
+    """
+    Simule n_jours journées aléatoires indépendantes.
+
+    profil       : volumes horaires à 60°C (L/h) ou ProfilTirage périodique (puisages)
+    processus    : nombre de processus (par défaut tous les cœurs ; 1 pour rester dans
+                   le processus courant)
+    taille_lot   : jours par tâche envoyée au pool
+    performances : carte_pac.PerformancesPAC éventuelle, lue depuis t = 0 pour chaque jour
+                   (journée type de T° extérieures)
+    """
+    processus = processus or os.cpu_count() or 1
+    graines = np.random.SeedSequence(graine).spawn(n_jours)
+    if not isinstance(profil, ProfilTirage):
+        profil = ProfilTirage.horaire(profil, p.T_eau_froide)
+    etat = simuler(p, profil, duree=86400.0, performances=performances).etat_final
+    etat.t = 0.0
+    if taille_lot is None:
+        taille_lot = max(1, math.ceil(n_jours / (4 * processus)))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(n_jours, 1) * len(COLONNES) * 8)
+    try:
+        args = [(shm.name, n_jours, p, profil, alea, etat, graines[d:d + taille_lot], d, performances)
+                for d in range(0, n_jours, taille_lot)]
+        if processus == 1:
+            for a in args:
+                _travailleur(*a)
+        else:
+            with ProcessPoolExecutor(max_workers=processus) as pool:
+                for fait in [pool.submit(_travailleur, *a) for a in args]:
+                    fait.result()
+        table = np.ndarray((n_jours, len(COLONNES)), dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    bilans = BilanLot(**{c: table[:, k] for k, c in enumerate(COLONNES)}, duree=86400.0)
+    return MonteCarlo(bilans, graine, alea)
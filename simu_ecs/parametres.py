@@ -0,0 +1,94 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+# --- Constantes physiques ---
+RHO_WATER = 1000
+CP_WATER = 4180
+
+# --- États de la PAC ---
+OFF = "OFF"
+STARTING = "STARTING"
+HEATING = "HEATING"
+
+# --- Modèles de puissance ---
+# "pac_fixe"  : main.py      -> PAC à puissance thermique constante, coupure à T_prim
+# "echangeur" : main2.py     -> PAC limitée par U.S.(T_prim - T), coupure à T_prim - 0.1
+# "serpentin" : main3_serp.py -> PAC et chaudière limitées par le serpentin, coupure à T_prim - 0.5
+MODELES = ("pac_fixe", "echangeur", "serpentin")
+MARGE_COUPURE = {"pac_fixe": 0.0, "echangeur": 0.1, "serpentin": 0.5}
+
+
+def format_duration(seconds):
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    return f"{hours}h {minutes:02d}min"
+
+
+@dataclass(frozen=True)
+class Parametres:
+    """
+    Paramètres d'une installation PAC + chaudière + ballon.
+    Les noms et unités sont ceux des barres latérales des simulateurs.
+    """
+    modele: str = "serpentin"
+    # PAC
+    P_pac_nom: float = 15.0        # kW thermique
+    T_prim: float = 65.0           # °C
+    cop_moyen: float = 3.0
+    t_delay_min: float = 3.0
+    t_anti_cycle_min: float = 10.0
+    # Échangeur
+    S_serpentin: float = 2.5       # m²
+    K_echange: float = 600.0       # W/m².K
+    # Chaudière
+    P_chaud_nom: float = 25.0      # kW
+    t_secours_min: float = 20.0
+    # Ballon & pertes
+    V_ball: float = 1000.0         # L
+    ua_ballon: float = 1.5         # W/K
+    P_bouclage_kW: float = 0.4
+    T_amb: float = 15.0
+    # Consignes
+    T_cons: float = 60.0
+    dT_restart: float = 5.0
+    T_init: float = 50.0
+    T_eau_froide: float = 10.0
+
+    def __post_init__(self):
+        if self.modele not in MODELES:
+            raise ValueError(f"Modèle inconnu : {self.modele!r} (attendu : {', '.join(MODELES)})")
+
+    def remplacer(self, **changements):
+        return replace(self, **changements)
+
+    @property
+    def capacite(self):
+        """Capacité thermique du ballon (J/K)."""
+        return self.V_ball / 1000 * RHO_WATER * CP_WATER
+
+    @property
+    def us_global(self):
+        """Conductance du serpentin (W/K)."""
+        return self.S_serpentin * self.K_echange
+
+    @property
+    def T_seuil(self):
+        """Température de relance de la PAC."""
+        return self.T_cons - self.dT_restart
+
+    @property
+    def T_arret(self):
+        """Température d'arrêt de la PAC (consigne ou limite primaire)."""
+        return min(self.T_cons, self.T_prim - MARGE_COUPURE[self.modele])
+
+
+def puissance_tirage(hour_volumes, T_eau_froide):
+    """Puissance de soutirage (W) d'un volume horaire à 60°C (L/h)."""
+    return np.asarray(hour_volumes, dtype=float) / 3600 * CP_WATER * (60 - T_eau_froide)
+
+
+def puissance_puisage(debits, T_livree, T_eau_froide):
+    """Puissance de soutirage (W) d'un puisage de débit (L/min) livré à T_livree (°C)."""
+    return (np.asarray(debits, dtype=float) / 60 * RHO_WATER / 1000 * CP_WATER
+            * (np.asarray(T_livree, dtype=float) - T_eau_froide))
@@ -0,0 +1,177 @@
+"""
+Parc de sites : appel de puissance électrique des PAC cumulé sur des centaines de sites.
+
+Un parc est un dossier, un fichier par site :
+- <site>.toml : paramètres du site (clés des scénarios, voir scenarios.py) ;
+- <site>.csv  : profil horaire mesuré (L/h à 60°C, voir scenarios.lire_profil),
+  prioritaire sur volume_jour/repartition ; 24 valeurs ou une année de 8760 h.
+
+Les sites sont simulés ensemble par le moteur par lot (lot.MoteurLot) : une voie par
+site, groupées par modèle et par longueur de profil, par blocs de taille_bloc voies.
+Le temps avance par tranches (un jour par défaut) ; chaque tranche produit la courbe
+de charge du parc (somme des P_pac / cop_moyen, moyennée par intervalle de
+pas_courbe) et met à jour la synthèse : pointe de chaque site, pointe coïncidente du
+parc, contribution de chaque site à cette pointe et facteur de foisonnement.
+
+Mémoire : dans une tranche, les blocs sont simulés l'un après l'autre, chacun par un
+moteur construit pour la tranche puis libéré ; entre deux tranches, seul l'état de
+ses voies est gardé (MoteurLot.etat, une quinzaine de vecteurs). Au-delà des sites
+eux-mêmes (leurs profils horaires), la mémoire est donc celle d'un bloc (profil de
+puissance de tirage H x taille_bloc, H = 24 ou 8760 h) plus la courbe de la tranche
+(sites x intervalles) et environ 150 octets par site. Reconstruire le moteur à chaque
+tranche coûte la conversion du profil du bloc, sensible seulement pour les profils
+annuels.
+"""
+import os
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .lot import CHAMPS, BilanLot, MoteurLot
+from .scenarios import lire_toml
+
+
+def lire_parc(dossier):
+    """Liste des sites (Scenario) d'un dossier de parc, par ordre alphabétique des fichiers."""
+    sites = []
+    for fichier in sorted(os.listdir(dossier)):
+        nom, extension = os.path.splitext(fichier)
+        if extension.lower() != ".toml":
+            continue
+        defauts = {"nom": nom}
+        if os.path.isfile(os.path.join(dossier, nom + ".csv")):
+            defauts["profil"] = nom + ".csv"
+        sites.extend(lire_toml(os.path.join(dossier, fichier), defauts))
+    if not sites:
+        raise ValueError(f"Aucun site (.toml) dans {dossier}")
+    return sites
+
+
+@dataclass
+class SyntheseParc:
+    """
+    Pointes du parc et de chaque site (W électriques, moyennes sur pas_courbe).
+
+    contributions : puissance de chaque site à l'instant de la pointe du parc
+    bilans        : BilanLot des sites (rempli à la fin de la simulation seulement)
+    """
+    noms: list
+    pointes: np.ndarray
+    contributions: np.ndarray
+    pointe: float = 0.0
+    t_pointe: float = float("nan")
+    e_elec: float = 0.0          # kWh électriques du parc
+    bilans: BilanLot = None
+
+    @property
+    def foisonnement(self):
+        """Somme des pointes individuelles / pointe coïncidente (>= 1)."""
+        return float(self.pointes.sum() / self.pointe) if self.pointe > 0 else float("nan")
+
+    @property
+    def coincidence(self):
+        """Par site : contribution à la pointe du parc / pointe propre."""
+        return np.divide(self.contributions, self.pointes, out=np.zeros_like(self.pointes), where=self.pointes > 0)
+
+
+@dataclass
+class TrancheParc:
+    """Une tranche de la courbe de charge : début des intervalles (s) et puissance du parc (W)."""
+    t: np.ndarray
+    P_elec: np.ndarray
+    synthese: SyntheseParc
+
+
+def _groupes(sites, taille_bloc):
+    """[(modèle, indices des sites)] : sites de même modèle et même longueur de profil, par blocs."""
+    cles = {}
+    for k, s in enumerate(sites):
+        if s.puisages is not None or s.n_couches >= 2:
+            raise ValueError(f"Site {s.nom} : le parc ne simule que des ballons mélangés à profil horaire")
+        cles.setdefault((s.parametres.modele, len(s.hour_volumes)), []).append(k)
+    return [(modele, np.array(indices[d:d + taille_bloc]))
+            for (modele, _), indices in cles.items()
+            for d in range(0, len(indices), taille_bloc)]
+
+
+def _moteur(sites, indices, dt):
+    """MoteurLot d'un groupe : les paramètres du premier site, ceux qui diffèrent en variations."""
+    base = sites[indices[0]].parametres
+    valeurs = {n: np.array([getattr(sites[k].parametres, n) for k in indices], dtype=float)
+               for n in CHAMPS}
+    variations = {n: v for n, v in valeurs.items() if (v != v[0]).any()}
+    hv = np.array([sites[k].hour_volumes for k in indices])
+    return MoteurLot(base, variations, hv, dt)
+
+
+def simuler_parc_flux(sites, duree=86400.0, dt=60.0, pas_courbe=3600.0, tranche=86400.0, taille_bloc=4096):
+    """
+    Générateur de TrancheParc, de `tranche` secondes chacune.
+
+    dt         : pas du moteur par lot (s), diviseur de pas_courbe
+    pas_courbe : intervalle de la courbe de charge (s), diviseur de tranche
+    """
+    m = pas_courbe / dt
+    par_tranche = tranche / pas_courbe
+    if m != int(m) or par_tranche != int(par_tranche):
+        raise ValueError("dt doit diviser pas_courbe, et pas_courbe la durée d'une tranche")
+    m, par_tranche = int(m), int(par_tranche)
+    t_steps = int(duree / dt)
+    n_intervalles = -(-t_steps // m)
+
+    groupes = [indices for _, indices in _groupes(sites, taille_bloc)]
+    etats = [None] * len(groupes)          # état des voies de chaque bloc entre deux tranches
+    bilans = [None] * len(groupes)
+    n = len(sites)
+    synthese = SyntheseParc([s.nom for s in sites], np.zeros(n), np.zeros(n))
+
+    for k0 in range(0, n_intervalles, par_tranche):
+        k1 = min(k0 + par_tranche, n_intervalles)
+        P_site = np.zeros((n, k1 - k0))
+        for g, indices in enumerate(groupes):
+            moteur = _moteur(sites, indices, dt)
+            if etats[g] is not None:
+                moteur.reprendre(etats[g])
+            cop = moteur.p["cop_moyen"]
+            for k in range(k0, k1):
+                # Le pas i couvre l'instant i dt ; l'échantillon initial (i = 0) est sans puissance :
+                # le premier intervalle n'a que m - 1 pas, le dernier peut être incomplet
+                pas = range(max(k * m, 1), min((k + 1) * m, t_steps))
+                somme = np.zeros(len(indices))
+                for _ in pas:
+                    somme += moteur.pas()[0]
+                P_site[indices, k - k0] = somme / max(len(pas), 1) / cop
+                synthese.e_elec += float((somme / cop).sum()) * dt / 3600000
+            etats[g] = moteur.etat()
+            if k1 == n_intervalles:
+                bilans[g] = moteur.bilan()
+            del moteur
+
+        np.maximum(synthese.pointes, P_site.max(axis=1), out=synthese.pointes)
+        P_elec = P_site.sum(axis=0)
+        j = int(np.argmax(P_elec))
+        if P_elec[j] > synthese.pointe:
+            synthese.pointe = float(P_elec[j])
+            synthese.t_pointe = (k0 + j) * pas_courbe
+            synthese.contributions = P_site[:, j].copy()
+        if k1 == n_intervalles:
+            synthese.bilans = _bilans(groupes, bilans)
+        yield TrancheParc(np.arange(k0, k1) * pas_courbe, P_elec, synthese)
+
+
+def _bilans(groupes, bilans):
+    """BilanLot des sites, dans l'ordre des sites."""
+    bilans = BilanLot.concatener(bilans)
+    ordre = np.argsort(np.concatenate(groupes))
+    return BilanLot(**{f.name: bilans.duree if f.name == "duree" else getattr(bilans, f.name)[ordre]
+                       for f in fields(BilanLot)})
+
+
+def simuler_parc(sites, **options):
+    """(t, P_elec, SyntheseParc) : courbe de charge complète du parc et synthèse finale."""
+    t, P_elec, synthese = [], [], None
+    for b in simuler_parc_flux(sites, **options):
+        t.append(b.t)
+        P_elec.append(b.P_elec)
+        synthese = b.synthese
+    return np.concatenate(t), np.concatenate(P_elec), synthese
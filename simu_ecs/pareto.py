@@ -0,0 +1,257 @@
+"""
+Exploration du front de Pareto des dimensionnements : énergie chaudière, démarrages
+PAC et investissement.
+
+Les variables de conception (volume du ballon, surface du serpentin, puissances PAC
+et chaudière, temporisation du secours) sont échantillonnées de façon adaptative :
+un hypercube latin initial, puis des lots de candidats tirés autour du front non
+dominé courant (perturbation gaussienne d'un point du front, de préférence isolé,
+ou point entre deux voisins du front), avec un rayon qui se resserre au fil du
+budget et une petite part de tirages uniformes pour ne pas s'enfermer. Les valeurs
+sont arrondies à la résolution de chaque variable : les mêmes points reviennent d'une
+session à l'autre et sont lus dans le cache.
+
+Chaque évaluation est une journée simulée par événements après un jour de préchauffe
+(dimensionnement.evaluer), rangée dans un CacheResultats ; avec un niveau disque, les
+explorations suivantes la réutilisent. Une T° minimale du ballon peut être imposée :
+un point qui ne la tient pas est dominé par tout point qui la tient.
+"""
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .cache import cle_stable
+from .dimensionnement import Contraintes, evaluer
+
+# Bornes (celles des applications) et résolution des variables explorables
+VARIABLES = {
+    "V_ball": (100.0, 5000.0, 10.0),
+    "S_serpentin": (0.1, 15.0, 0.05),
+    "P_pac_nom": (1.0, 50.0, 0.5),
+    "P_chaud_nom": (0.0, 100.0, 1.0),
+    "t_secours_min": (0.0, 120.0, 1.0),
+}
+# Prix unitaires d'équipement : € par litre, m², kW thermique PAC, kW chaudière
+PRIX = {"V_ball": 2.5, "S_serpentin": 120.0, "P_pac_nom": 900.0, "P_chaud_nom": 50.0}
+OBJECTIFS = ("e_th_chaud", "demarrages", "investissement")
+
+
+@dataclass
+class Point:
+    """Un dimensionnement évalué."""
+    valeurs: dict              # variable -> valeur
+    e_th_chaud: float          # kWh sur la journée évaluée
+    demarrages: int
+    investissement: float      # €
+    T_min: float               # °C
+    demarrages_h: int          # maximum sur une heure glissante
+    ecart_T_min: float = 0.0   # K sous la T° minimale imposée (0 si tenue)
+
+    @property
+    def faisable(self):
+        return self.ecart_T_min <= 0
+
+    @property
+    def objectifs(self):
+        return tuple(float(getattr(self, o)) for o in OBJECTIFS)
+
+
+@dataclass
+class Exploration:
+    """Points évalués, dans l'ordre d'évaluation, et indices du front non dominé."""
+    variables: tuple
+    points: list = field(default_factory=list)
+    front: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.intp))
+    n_simulations: int = 0     # évaluations calculées (les autres viennent du cache)
+    n_budget: int = 0
+
+    @property
+    def points_front(self):
+        return [self.points[i] for i in self.front]
+
+    def vers_dataframe(self, front_seul=True):
+        """Tableau des points (du front par défaut), trié par investissement."""
+        import pandas as pd
+
+        points = self.points_front if front_seul else self.points
+        df = pd.DataFrame([{**pt.valeurs, **{o: getattr(pt, o) for o in OBJECTIFS},
+                            "T_min": pt.T_min, "demarrages_h": pt.demarrages_h, "faisable": pt.faisable}
+                           for pt in points], columns=[*self.variables, *OBJECTIFS, "T_min", "demarrages_h", "faisable"])
+        return df.sort_values("investissement", ignore_index=True)
+
+
+def investissement(valeurs, p, prix=PRIX):
+    """Coût d'équipement (€) des variables de conception, les autres à leur valeur dans p."""
+    return sum(c * valeurs.get(v, getattr(p, v)) for v, c in prix.items())
+
+
+def non_domines(objectifs, ecarts=None):
+    """
+    Indices des points non dominés (tous les objectifs à minimiser).
+    Avec des écarts de contrainte : un point faisable domine tout point infaisable, et
+    entre points infaisables le plus petit écart domine.
+    """
+    o = np.asarray(objectifs, dtype=float).reshape(len(objectifs), -1)
+    if len(o) == 0:
+        return np.zeros(0, dtype=np.intp)
+    if ecarts is not None:
+        e = np.maximum(np.asarray(ecarts, dtype=float), 0.0)
+        if (e <= 0).any():
+            candidats = np.flatnonzero(e <= 0)
+        else:
+            candidats = np.flatnonzero(e <= e.min())
+        return candidats[non_domines(o[candidats])]
+    # j domine i : pas pire partout et meilleur quelque part ; par blocs pour borner la mémoire
+    domine = np.zeros(len(o), dtype=bool)
+    for d in range(0, len(o), 256):
+        bloc = o[d:d + 256, None, :]
+        pas_pire = (o[None, :, :] <= bloc).all(axis=2)
+        meilleur = (o[None, :, :] < bloc).any(axis=2)
+        domine[d:d + 256] = (pas_pire & meilleur).any(axis=1)
+    return np.flatnonzero(~domine)
+
+
+def distance_encombrement(objectifs):
+    """Distance d'encombrement (NSGA-II) des points d'un front : infinie aux extrémités."""
+    o = np.asarray(objectifs, dtype=float).reshape(len(objectifs), -1)
+    n = len(o)
+    distance = np.zeros(n)
+    if n <= 2:
+        return np.full(n, math.inf)
+    for k in range(o.shape[1]):
+        ordre = np.argsort(o[:, k], kind="stable")
+        etendue = o[ordre[-1], k] - o[ordre[0], k]
+        distance[ordre[[0, -1]]] = math.inf
+        if etendue > 0:
+            distance[ordre[1:-1]] += (o[ordre[2:], k] - o[ordre[:-2], k]) / etendue
+    return distance
+
+
+class _Espace:
+    """Passage entre l'hypercube unité et les valeurs arrondies à la résolution des variables."""
+
+    def __init__(self, variables, bornes):
+        self.variables = tuple(variables)
+        self.bas = np.array([bornes[v][0] for v in self.variables], dtype=float)
+        self.haut = np.array([bornes[v][1] for v in self.variables], dtype=float)
+        self.resolution = np.array([bornes[v][2] for v in self.variables], dtype=float)
+
+    def valeurs(self, u):
+        x = self.bas + np.clip(u, 0.0, 1.0) * (self.haut - self.bas)
+        x = self.bas + np.round((x - self.bas) / self.resolution) * self.resolution
+        return np.minimum(x, self.haut)
+
+    def unite(self, x):
+        etendue = np.where(self.haut > self.bas, self.haut - self.bas, 1.0)
+        return (np.asarray(x, dtype=float) - self.bas) / etendue
+
+
+def _hypercube_latin(rng, n, d):
+    """n points de [0, 1]^d, une strate par point sur chaque axe."""
+    return (np.argsort(rng.random((d, n)), axis=1).T + rng.random((n, d))) / n
+
+
+def explorer_flux(p, profil, variables=tuple(VARIABLES), bornes=None, n_evaluations=200, n_initial=None,
+                  taille_lot=16, T_min=50.0, prix=PRIX, graine=0, cache=None, duree=86400, dt=10,
+                  jours_prechauffe=1, part_exploration=0.1, performances=None):
+    """
+    Générateur d'Exploration, une après le plan initial puis une par lot de candidats.
+
+    profil         : volumes horaires à 60°C (L/h) ou ProfilTirage (puisages)
+    variables      : variables de conception explorées (les autres restent à leur valeur dans p)
+    bornes         : {variable: (min, max, résolution)}, complète VARIABLES
+    n_evaluations  : budget de points distincts
+    n_initial      : taille de l'hypercube latin initial (défaut : un quart du budget, au moins 8)
+    T_min          : T° minimale du ballon exigée sur la journée (°C), None pour aucune
+    cache          : CacheResultats des évaluations (niveau disque pour les réutiliser d'une session à l'autre)
+    performances   : carte_pac.PerformancesPAC éventuelle, transmise à chaque évaluation
+    """
+    bornes = {**VARIABLES, **(bornes or {})}
+    inconnues = [v for v in variables if v not in bornes]
+    if inconnues:
+        raise ValueError(f"Bornes requises pour : {', '.join(inconnues)}")
+    if not variables:
+        raise ValueError("Aucune variable de conception à explorer")
+    p.remplacer(**{v: bornes[v][0] for v in variables})  # vérifie que les variables existent
+    espace = _Espace(variables, bornes)
+    # Points distincts de la grille de résolution, au plus
+    n_grille = math.prod(int(round((h - b) / r)) + 1 for b, h, r in zip(espace.bas, espace.haut, espace.resolution))
+    n_evaluations = min(n_evaluations, n_grille)
+    n_initial = max(8, n_evaluations // 4) if n_initial is None else n_initial
+    n_initial = min(n_initial, n_evaluations)
+    contraintes = Contraintes(None, None, None)
+    rng = np.random.default_rng(graine)
+    exploration = Exploration(tuple(variables), n_budget=n_evaluations)
+    vus = set()
+
+    def evaluation(x):
+        valeurs = {v: float(a) for v, a in zip(variables, x)}
+        q = p.remplacer(**valeurs)
+
+        def calcul():
+            exploration.n_simulations += 1
+            return evaluer(q, profil, contraintes, duree, dt, jours_prechauffe, performances)
+
+        if cache is not None:
+            ev = cache.obtenir_ou_calculer(cle_stable("pareto", q, profil, duree, dt, jours_prechauffe, performances),
+                                           calcul)
+        else:
+            ev = calcul()
+        b = ev.bilan
+        return Point(valeurs, b.e_th_chaud, b.demarrages, investissement(valeurs, p, prix), b.T_min,
+                     ev.demarrages_h, 0.0 if T_min is None else max(T_min - b.T_min - 1e-6, 0.0))
+
+    def evaluer_lot(u, n_max):
+        for x in espace.valeurs(u):
+            if len(exploration.points) >= n_max:
+                break
+            cle = tuple(x.tolist())
+            if cle not in vus:
+                vus.add(cle)
+                exploration.points.append(evaluation(x))
+        pts = exploration.points
+        exploration.front = non_domines([pt.objectifs for pt in pts], [pt.ecart_T_min for pt in pts])
+
+    evaluer_lot(_hypercube_latin(rng, n_initial, len(variables)), n_initial)
+    yield exploration
+
+    d = len(variables)
+    essais_vides = 0
+    while len(exploration.points) < n_evaluations and essais_vides < 20:
+        avancement = len(exploration.points) / n_evaluations
+        rayon = 0.2 * (1 - avancement) + 0.02
+        front = exploration.front
+        u_front = espace.unite([list(exploration.points[i].valeurs.values()) for i in front])
+        # Parents de préférence isolés sur le front (tournoi binaire sur l'encombrement)
+        encombrement = distance_encombrement([exploration.points[i].objectifs for i in front])
+        a, b = rng.integers(len(front), size=(2, taille_lot))
+        parents = np.where(encombrement[a] >= encombrement[b], a, b)
+        candidats = u_front[parents] + rng.normal(0.0, rayon, (taille_lot, d))
+        if len(front) >= 2:
+            # Entre deux points voisins du front (objectifs normalisés) : comble les trous
+            entre = rng.random(taille_lot) < 0.3
+            o = np.array([exploration.points[i].objectifs for i in front])
+            o = (o - o.min(axis=0)) / np.where(np.ptp(o, axis=0) > 0, np.ptp(o, axis=0), 1.0)
+            dist = np.linalg.norm(o[:, None] - o[None, :], axis=2)
+            np.fill_diagonal(dist, math.inf)
+            voisins = np.argmin(dist, axis=1)[parents]
+            w = rng.random((taille_lot, 1))
+            candidats = np.where(entre[:, None], u_front[parents] * (1 - w) + u_front[voisins] * w, candidats)
+        uniformes = rng.random(taille_lot) < part_exploration
+        candidats[uniformes] = rng.random((int(uniformes.sum()), d))
+        n_avant = len(exploration.points)
+        evaluer_lot(candidats, n_evaluations)
+        # Grille saturée autour du front : élargir par des tirages uniformes
+        essais_vides = essais_vides + 1 if len(exploration.points) == n_avant else 0
+        if essais_vides:
+            part_exploration = min(1.0, part_exploration * 2)
+        yield exploration
+
+
+def explorer(p, profil, **options):
+    """Exploration complète (voir explorer_flux)."""
+    exploration = None
+    for exploration in explorer_flux(p, profil, **options):
+        pass
+    return exploration
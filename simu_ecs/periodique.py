@@ -0,0 +1,146 @@
+"""
+Régime périodique établi : journée type indépendante de T_init.
+
+On cherche l'état en début de période (T du ballon, état de la PAC, temporisations)
+que la période ramène à lui-même : point fixe de l'application F « état au début ->
+état à la fin », chaque évaluation étant une simulation par événements d'une période.
+Les temporisations n'agissent que par comparaison à leur seuil (anti-court-cycle,
+démarrage, secours) : elles sont comparées plafonnées à ce seuil.
+
+Itération de point fixe : quand la régulation recale la T° au cours de la période,
+F est de pente quasi nulle et deux ou trois périodes suffisent. Quand elle n'agit
+pas, F est de pente exp(-UA période / C), proche de 1 : la convergence, lente et
+monotone, est alors accélérée par un pas de sécante sur le résidu T_fin - T_début,
+abandonné dès qu'un tel pas n'a pas réduit le résidu.
+
+F n'est pas continue : une relance de la PAC a lieu ou non avant la fin de période.
+Il peut alors ne pas y avoir de régime journalier : la régulation suit un cycle de
+plusieurs périodes (ex. un gros ballon rechargé tous les trois jours). Le cycle est
+repéré par le retour de l'itération à un état déjà vu, au plus `cycle_max` périodes
+plus tôt, et le bilan est rapporté à une période moyenne. Un retour plus lointain n'est
+pas un cycle : c'est la dérive lente d'un régime quasi périodique qui finit par repasser
+à tol_T d'un état ancien. Sans retour exact, le meilleur retour approché de
+`cycle_max` périodes au plus est retenu (converge faux).
+"""
+from dataclasses import dataclass, field, fields
+
+from .evenements import simuler
+from .profils import ProfilTirage
+from .resultats import Bilan, EtatSimulation
+
+# Termes du bilan ramenés à une période moyenne sur un cycle de plusieurs périodes
+_CUMULS = tuple(f.name for f in fields(Bilan) if f.name not in ("T_min", "T_max", "T_final"))
+
+
+@dataclass
+class RegimePeriodique:
+    """
+    État en début de régime (t = 0) et simulation du cycle depuis cet état.
+
+    n_cycle     : périodes du cycle (1 : régime journalier, F(état) = état)
+    converge    : cycle retrouvé à tol_T près (sinon meilleur retour approché)
+    n_periodes  : périodes simulées par la recherche
+    residus     : |T fin - T début| (K) de chaque évaluation de la recherche d'un point fixe
+    """
+    etat: EtatSimulation
+    resultat: object
+    n_cycle: int
+    converge: bool
+    n_periodes: int
+    residus: list = field(default_factory=list)
+
+    @property
+    def bilan(self):
+        """Bilan moyen d'une période du cycle."""
+        b = self.resultat.bilan
+        if self.n_cycle == 1:
+            return b
+        return Bilan(**{f.name: getattr(b, f.name) / self.n_cycle if f.name in _CUMULS else getattr(b, f.name)
+                        for f in fields(Bilan)})
+
+
+def _plafonne(etat, p):
+    """État discret et temporisations plafonnées à leur seuil : ce qui détermine la suite."""
+    return (etat.pac_state,
+            min(etat.time_since_stop, p.t_anti_cycle_min * 60),
+            min(etat.wait_timer, p.t_delay_min * 60),
+            min(etat.chauffe_timer, p.t_secours_min * 60))
+
+
+def _meme_etat(x, y, p, tol_T, tol_t):
+    a, b = _plafonne(x, p), _plafonne(y, p)
+    return a[0] == b[0] and abs(y.T - x.T) <= tol_T and all(abs(u - v) <= tol_t for u, v in zip(a[1:], b[1:]))
+
+
+def regime_periodique(p, profil, periode=86400.0, etat=None, t_sortie=None, performances=None, tol_T=1e-3,
+                      tol_t=1.0, max_periodes=20, cycle_max=7, max_cycle=21):
+    """
+    Régime établi du ballon pour un profil de période `periode` (s).
+
+    etat         : point de départ de la recherche (état initial de p par défaut)
+    t_sortie     : instants (s, depuis le début du régime) des séries ; None pour le bilan seul
+    tol_T, tol_t : écarts admis entre début et fin de période sur T (K) et sur les temporisations (s)
+    max_periodes : périodes simulées au plus pour le point fixe journalier
+    cycle_max    : périodes au plus d'un cycle
+    max_cycle    : périodes simulées au plus pour repérer un cycle de plusieurs périodes
+    """
+    if not isinstance(profil, ProfilTirage):
+        profil = ProfilTirage.horaire(profil, p.T_eau_froide)
+
+    def periode_depuis(x):
+        y = simuler(p, profil, duree=periode, etat=x, performances=performances).etat_final.copie()
+        y.t = 0.0
+        return y
+
+    def resultat(x, n_cycle, converge, n_periodes):
+        res = simuler(p, profil, duree=n_cycle * periode, t_sortie=t_sortie, etat=x, performances=performances)
+        return RegimePeriodique(x, res, n_cycle, converge, n_periodes, residus)
+
+    x = EtatSimulation.initial(p) if etat is None else etat.copie()
+    x.t = 0.0
+    residus = []
+    orbite = [x]           # états successifs depuis le dernier pas de sécante
+    precedent = None       # (T, g) de l'évaluation précédente
+    secante = False
+    accelerer = True       # faux après une sécante sans progrès : F n'est pas lisse sur ce trajet
+    for _ in range(max_periodes):
+        y = periode_depuis(x)
+        g = y.T - x.T
+        residus.append(abs(g))
+        if _meme_etat(x, y, p, tol_T, tol_t):
+            return resultat(x, 1, True, len(residus))
+        # Retour à un état de l'orbite : cycle de plusieurs périodes
+        for j in range(max(len(orbite) - cycle_max, 0), len(orbite) - 1):
+            if _meme_etat(orbite[j], y, p, tol_T, tol_t):
+                return resultat(orbite[j], len(orbite) - j, True, len(residus))
+
+        # Sécante sur T si la convergence est lente et monotone (régulation inactive)
+        suivant = y
+        if secante and abs(g) >= abs(precedent[1]):
+            accelerer = False
+        if accelerer and precedent is not None:
+            T0, g0 = precedent
+            lente = g * g0 > 0 and abs(g) > abs(g0) / 2 and _plafonne(x, p)[0] == _plafonne(y, p)[0]
+            pente = (g - g0) / (x.T - T0) if x.T != T0 else 0.0
+            # pente = F'(T) - 1 < 0 pour une application contractante
+            if lente and pente < 0:
+                suivant = y.copie()
+                suivant.T = min(max(x.T - g / pente, p.T_eau_froide), max(p.T_arret, x.T, y.T))
+        secante = suivant is not y
+        precedent = (x.T, g)
+        orbite = [suivant] if secante else orbite + [y]
+        x = suivant
+
+    # Cycle long : itération simple depuis le dernier état atteint
+    etats = [x]
+    for n in range(1, max_cycle + 1):
+        etats.append(periode_depuis(etats[-1]))
+        for m in range(1, min(n, cycle_max) + 1):
+            if _meme_etat(etats[n - m], etats[n], p, tol_T, tol_t):
+                return resultat(etats[n - m], m, True, len(residus) + n)
+    # Pas de retour exact (cycle long ou quasi périodique) : fenêtre de la seconde moitié
+    # dont le retour approché fausse le moins le bilan moyen (écart de T par période)
+    debut = max_cycle // 2
+    m, k = min(((m, k) for k in range(debut, max_cycle) for m in range(1, min(cycle_max, max_cycle - k) + 1)),
+               key=lambda c: abs(etats[c[1] + c[0]].T - etats[c[1]].T) / c[0])
+    return resultat(etats[k], m, False, len(residus) + max_cycle)
@@ -0,0 +1,466 @@
+"""
+Pilotage optimisé de la PAC et de la chaudière selon le tarif horaire et le surplus PV.
+
+Au lieu de l'hystérésis (relance à T_cons - dT_restart), la marche de la PAC et de la
+chaudière est choisie pas par pas (5 min par défaut) pour minimiser le coût de la
+journée : électricité de la PAC au tarif de l'heure, diminuée du surplus PV, et
+chaleur de la chaudière à prix fixe.
+
+Programmation dynamique sur une grille de T° du ballon : l'état est (T, mode), le
+mode portant l'anti-court-cycle (pas écoulés depuis l'arrêt) et la temporisation de
+démarrage (pas de démarrage écoulés). La récurrence arrière est vectorisée sur toute
+la grille de T. Un pas suit le moteur par événements : puissances affines en T découpées
+à leurs cassures, solution exponentielle, coupure au thermostat, et fin de la
+temporisation de démarrage en cours de pas (pas de relais). Sous T_min, une pénalité
+forte par degré (fin de pas et fin de temporisation) tient lieu de contrainte. Avec
+une carte de performances, chaque pas prend la puissance et le COP de la PAC de son
+heure, comme le moteur.
+
+Le programme est rejoué par le moteur par événements (simuler(..., commande=Programme)),
+son coût compté exactement heure par heure, et comparé à l'hystérésis sur la même
+journée : s'il ne fait pas mieux qu'elle sans tenir T_min moins bien, l'hystérésis est
+conservée.
+
+Format CSV des tarifs (séparateur « ; », « , » ou tabulation) : une ligne par heure,
+colonne tarif (€/kWh), colonne pv facultative (surplus photovoltaïque, kW).
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .carte_pac import _lire_colonnes
+from .evenements import _phi_vec, _psi_vec, simuler
+from .profils import ProfilTirage
+
+COLONNES_TARIFS = {"tarif": "tarif", "prix": "tarif", "pv": "pv", "surplus_pv": "pv", "p_pv": "pv"}
+PENALITE_T_MIN = 100.0   # €/K par pas sous T_min
+MARGE_GRILLE = 5.0       # K de grille sous min(T_min, T_init)
+
+# Mode pendant un pas (relais : dernier pas de démarrage, terminé en chauffe)
+_ARRET, _DEMARRAGE, _CHAUFFE, _RELAIS = 0, 1, 2, 3
+
+
+def lire_tarifs(source):
+    """(tarif horaire en €/kWh, surplus PV horaire en kW ou None) d'un CSV."""
+    c = _lire_colonnes(source, COLONNES_TARIFS, "des tarifs", facultatives=("pv",))
+    if len(c["tarif"]) == 0:
+        raise ValueError("Aucun tarif dans le CSV")
+    return c["tarif"], c.get("pv")
+
+
+@dataclass
+class Programme:
+    """Commandes de marche (PAC, chaudière) par pas de `pas` s, répétées périodiquement."""
+    pac: np.ndarray
+    chaud: np.ndarray
+    pas: float = 300.0
+
+    def __post_init__(self):
+        self.pac, self.chaud = (np.asarray(a, dtype=bool) for a in (self.pac, self.chaud))
+        self._pac, self._chaud = self.pac.tolist(), self.chaud.tolist()
+
+    def palier(self, t):
+        """(marche PAC, marche chaudière, début du pas suivant)."""
+        k = int(t // self.pas)
+        i = k % len(self._pac)
+        return self._pac[i], self._chaud[i], (k + 1) * self.pas
+
+
+@dataclass
+class Pilotage:
+    """
+    Pilotage retenu : le programme optimal rejoué par le moteur, ou l'hystérésis
+    (programme None) quand le rejeu ne fait pas mieux qu'elle.
+    """
+    programme: Programme       # None : hystérésis conservée
+    cout_prevu: float          # € prévus par la programmation dynamique
+    resultat: object           # Resultat du pilotage retenu
+    cout: float                # € du pilotage retenu
+    resultat_hysteresis: object
+    cout_hysteresis: float     # € de l'hystérésis sur la même journée
+    violations: float          # s sous T_min au pilotage retenu, après la remontée initiale
+    T_prevu: np.ndarray = None # T° prévue en fin de chaque pas
+    cout_programme: float = float("nan")   # € du rejeu du programme optimal, retenu ou non
+
+    @property
+    def respecte_T_min(self):
+        """T_min tenue une fois atteinte (la remontée depuis T_init n'est pas comptée)."""
+        return self.violations == 0
+
+
+class _Modele:
+    """
+    Dynamique d'un pas, vectorisée sur les T, pour chaque combinaison (mode, chaudière).
+    Comme dans le moteur, les puissances sont affines en T (c0 - k T) et la T° suit la
+    solution exponentielle ; un pas de relais se termine en chauffe après la temporisation.
+    """
+
+    def __init__(self, p, pas, T_min, chaud_possible, delai=0.0):
+        self.p = p
+        self.pas = pas
+        self.C = p.capacite
+        self.ua = p.ua_ballon
+        self.us = p.us_global
+        self.T_min = T_min
+        self.delai = delai        # s de démarrage restant au début du pas de relais
+        self.P_chaud_nom = p.P_chaud_nom * 1000
+        self.b = self.ua / self.C
+        modes = (_ARRET, _DEMARRAGE, _CHAUFFE) + ((_RELAIS,) if delai > 0 else ())
+        self.combinaisons = [(mode, chaud) for mode in modes for chaud in chaud_possible]
+        self.P_pac_nom = self.cop = None
+        self.regler(p.P_pac_nom * 1000, p.cop_moyen)
+        # Colonnes (combinaisons, 1) : PAC en chauffe sur tout le pas, chaudière commandée, pas de relais
+        self.chauffe = np.array([mode == _CHAUFFE for mode, _ in self.combinaisons])[:, None]
+        self.chaud = np.array([chaud for _, chaud in self.combinaisons])[:, None]
+        self.relais = np.array([mode == _RELAIS for mode, _ in self.combinaisons])[:, None]
+
+    def regler(self, P_pac_nom, cop):
+        """Puissance nominale (W) et COP de la PAC pour les pas suivants (carte de performances)."""
+        if (P_pac_nom, cop) == (self.P_pac_nom, self.cop):
+            return
+        p = self.p
+        self.P_pac_nom, self.cop = P_pac_nom, cop
+        # T° où une puissance change de bande (saturation ou annulation sur le serpentin)
+        cassures = set()
+        if p.modele != "pac_fixe" and self.us > 0:
+            cassures |= {p.T_prim - self.P_pac_nom / self.us, p.T_prim}
+            if p.modele == "serpentin":
+                for T0 in (p.T_prim, p.T_prim - self.P_pac_nom / self.us):
+                    cassures |= {T0 - self.P_chaud_nom / self.us, T0}
+        self.cassures = np.array(sorted(cassures))
+
+    def coefs(self, chauffe, chaud, T):
+        """
+        Puissances affines c0 - k T de la PAC et de la chaudière aux T : (c0p, kp, c0c, kc).
+        chauffe, chaud : marche de la PAC en chauffe et commande de la chaudière, diffusées sur T.
+        """
+        p = self.p
+        zero = np.zeros(T.shape)
+        if p.modele == "pac_fixe":
+            c0p, kp = np.full(T.shape, self.P_pac_nom), zero
+        else:
+            c0p, kp = _affine(self.P_pac_nom, self.us, p.T_prim, T)
+        if p.modele != "serpentin":
+            c0c, kc = np.full(T.shape, self.P_chaud_nom), zero
+        else:
+            # PAC à l'arrêt : tout le serpentin ; en chauffe : le reste de sa capacité après la PAC
+            c0c, kc = _affine(self.P_chaud_nom, self.us, p.T_prim, T)
+            if self.us > 0:
+                c0r, kr = _affine(self.P_chaud_nom, self.us, p.T_prim - self.P_pac_nom / self.us, T)
+            else:
+                c0r, kr = zero, zero
+            c0c, kc = np.where(chauffe, c0r, c0c), np.where(chauffe, kr, kc)
+        # Au-dessus de T_arret, le thermostat coupe les sources
+        marche_pac = (T < p.T_arret) & chauffe
+        marche_chaud = (T < p.T_arret) & chaud
+        return (np.where(marche_pac, c0p, 0.0), np.where(marche_pac, kp, 0.0),
+                np.where(marche_chaud, c0c, 0.0), np.where(marche_chaud, kc, 0.0))
+
+    def phase(self, T, duree, chauffe, chaud, P_tir, P_pv):
+        """
+        Évolution sur `duree` s depuis les T : (T finale, électricité PAC nette du PV (J),
+        chaleur chaudière (J), coupure par le thermostat). Comme dans le moteur, la phase est
+        découpée aux cassures des puissances ; les sources se coupent à T_arret, puis la T°
+        évolue librement (pertes et tirage) jusqu'à la fin de la phase.
+        """
+        p = self.p
+        forme = np.broadcast(T, duree, chauffe, chaud).shape
+        T = np.array(np.broadcast_to(T, forme), dtype=float)
+        reste = np.array(np.broadcast_to(duree, forme), dtype=float)
+        marche = np.ones(forme, dtype=bool)
+        sens = np.zeros(forme)
+        e_elec, e_chaud = np.zeros(forme), np.zeros(forme)
+        a_libre = (self.ua * p.T_amb - p.P_bouclage_kW * 1000 - P_tir) / self.C
+        for _ in range(len(self.cassures) + 2):
+            if not ((reste > 0) & marche).any():
+                break
+            # Coefficients de la bande où va la T° (une cassure atteinte est franchie dans le sens du mouvement)
+            Te = T + 1e-7 * sens
+            c0p, kp, c0c, kc = self.coefs(chauffe & marche, chaud & marche, Te)
+            a = a_libre + (c0p + c0c) / self.C
+            b = self.b + (kp + kc) / self.C
+            r = a - b * T
+            sens = np.sign(r)
+            tau = reste.copy()
+            prochaine = np.full(forme, np.nan)
+            if len(self.cassures) and marche.any():
+                # Première cassure dans le sens du mouvement
+                c = self.cassures
+                dessus = np.searchsorted(c, T, side="right")
+                dessous = np.searchsorted(c, T, side="left") - 1
+                i = np.where(sens > 0, dessus, dessous)
+                existe = marche & (sens != 0) & (i >= 0) & (i < len(c))
+                L = c[np.clip(i, 0, len(c) - 1)]
+                d = np.where(existe, _duree_jusqua_vec(T, L, a, b), math.inf)
+                plus_tot = d < tau
+                tau = np.where(plus_tot, d, tau)
+                prochaine = np.where(plus_tot, L, prochaine)
+            actives = marche & (T < p.T_arret) & ((c0p - kp * Te > 0) | (c0c - kc * Te > 0))
+            d = np.where(actives, _duree_jusqua_vec(T, p.T_arret, a, b), math.inf)
+            arret = d <= tau
+            tau = np.where(arret, d, tau)
+            IT = T * tau + r * _psi_vec(b, tau)
+            e_pac = c0p * tau - kp * IT
+            # Le PV n'efface l'électricité de la PAC que pendant sa marche
+            e_elec += np.maximum(e_pac / self.cop - P_pv * tau, 0.0)
+            e_chaud += c0c * tau - kc * IT
+            T = np.where(arret, p.T_arret, np.where(np.isnan(prochaine), T + r * _phi_vec(b, tau), prochaine))
+            reste -= tau
+            marche &= ~arret
+        # Fin de la phase après la coupure : évolution libre, sans cassure
+        if (reste > 0).any():
+            T = T + (a_libre - self.b * T) * _phi_vec(self.b, reste)
+        return np.maximum(T, p.T_eau_froide), e_elec, e_chaud, ~marche
+
+    def pas_de_temps(self, T, P_tir, tarif, P_pv, prix_chaudiere):
+        """
+        (T en fin de pas, coût en €, arrêt de la PAC par le thermostat, T° la plus basse du pas),
+        chacun (combinaisons, len(T)). Chaque phase est monotone : la T° la plus basse est à ses bornes.
+        """
+        p = self.p
+        T = np.broadcast_to(T, (len(self.combinaisons),) + T.shape)
+        chauffe, chaud, relais = self.chauffe, self.chaud, self.relais
+        # Tout le pas, ou la temporisation qui reste au début d'un pas de relais
+        duree = np.where(relais, self.delai, self.pas)
+        T1, e_elec, e_chaud, coupe = self.phase(T, duree, chauffe, chaud, P_tir, P_pv)
+        arret = (coupe | (T >= p.T_arret)) & chauffe
+        T_creux = T1
+        if self.delai > 0:
+            # Relais : chauffe jusqu'à la fin du pas ; la chaudière reste coupée si elle a atteint T_arret
+            r = relais[:, 0]
+            T_mi = T1[r]
+            T2, e_elec2, e_chaud2, coupe2 = self.phase(T_mi, self.pas - self.delai, True, chaud[r] & ~coupe[r],
+                                                       P_tir, P_pv)
+            T1, e_elec, e_chaud, arret, T_creux = (a.copy() for a in (T1, e_elec, e_chaud, arret, T_creux))
+            T1[r] = T2
+            e_elec[r] += e_elec2
+            e_chaud[r] += e_chaud2
+            arret[r] = coupe2 | (T_mi >= p.T_arret)
+            T_creux[r] = np.minimum(T_mi, T2)
+        cout = (e_elec * tarif + e_chaud * prix_chaudiere) / 3600000
+        return T1, cout, arret, T_creux
+
+    def penalite(self, T_bas):
+        """Contrainte de T° minimale, en pénalité par degré manquant."""
+        return PENALITE_T_MIN * np.maximum(self.T_min - T_bas, 0.0)
+
+
+def _duree_jusqua_vec(T0, niveau, a, b):
+    """evenements._duree_jusqua vectorisée : durée pour aller de T0 à `niveau` (inf si jamais atteint)."""
+    r = a - b * T0
+    q = np.divide(niveau - T0, r, out=np.full(np.shape(r), -1.0), where=r != 0)
+    bq = b * q
+    atteint = (q > 0) & (bq < 1)
+    bq = np.where(atteint, bq, 0.0)
+    d = np.where(np.abs(bq) < 1e-8, q * (1 + bq / 2), -np.log1p(-bq) / np.where(b != 0, b, 1.0))
+    return np.where(atteint, d, math.inf)
+
+
+def _affine(pmax, g, T0, T):
+    """Coefficients (c0, k) de min(pmax, max(0, g (T0 - T))), affine c0 - k T au voisinage des T."""
+    x = g * (T0 - T)
+    lineaire = (x > 0) & (x < pmax)
+    return np.where(x >= pmax, pmax, np.where(lineaire, g * T0, 0.0)), np.where(lineaire, g, 0.0)
+
+
+def _modes(n_anti, n_delay, relais=False):
+    """
+    Modes d'état et décisions : pour chaque mode, [(commande PAC, mode pendant le pas, mode suivant)].
+    Modes : arrêt depuis k pas (k = 0..n_anti, n_anti = libre), démarrage depuis j pas, chauffe.
+    relais : la temporisation finit en cours du dernier pas de démarrage, qui se termine en chauffe.
+    """
+    def pendant(j):
+        return _RELAIS if relais and j == n_delay - 1 else _DEMARRAGE
+
+    arret = list(range(n_anti + 1))
+    demarrage = {j: n_anti + j for j in range(1, n_delay)}
+    chauffe = n_anti + max(n_delay, 1)
+    apres_arret = arret[min(1, n_anti)]
+    if n_delay == 0:
+        lancer = (_CHAUFFE, chauffe)
+    else:
+        lancer = (pendant(0), demarrage.get(1, chauffe))
+    decisions = []
+    for k in arret:
+        d = [(False, _ARRET, arret[min(k + 1, n_anti)])]
+        if k == n_anti:
+            d.append((True,) + lancer)
+        decisions.append(d)
+    for j in range(1, n_delay):
+        decisions.append([(True, pendant(j), demarrage.get(j + 1, chauffe)), (False, _ARRET, apres_arret)])
+    decisions.append([(True, _CHAUFFE, chauffe), (False, _ARRET, apres_arret)])
+    return decisions
+
+
+def optimiser(p, profil, tarif, pv=None, prix_chaudiere=0.12, cout_demarrage=0.02, pas=300.0, duree=86400.0,
+              T_min=None, pas_T=0.1, t_sortie_dt=10.0, performances=None):
+    """
+    Programme de marche de coût minimal sur `duree`, puis rejeu et comparaison à l'hystérésis.
+
+    profil         : volumes horaires à 60°C (L/h) ou ProfilTirage
+    tarif, pv      : séries horaires (€/kWh, kW), répétées périodiquement ; pv None = pas de PV
+    prix_chaudiere : coût de la chaleur de la chaudière (€/kWh)
+    cout_demarrage : coût d'usure affecté à chaque démarrage de la PAC (€), contre les courts cycles
+    T_min          : T° minimale du ballon (défaut : T_cons - dT_restart)
+    pas_T          : pas de la grille de T° (K)
+    performances   : carte_pac.PerformancesPAC éventuelle : puissance et COP de la PAC de chaque
+                     pas (programmation, rejeux et coûts)
+    """
+    if not isinstance(profil, ProfilTirage):
+        profil = ProfilTirage.horaire(profil, p.T_eau_froide)
+    T_min = p.T_seuil if T_min is None else T_min
+    n_pas = int(round(duree / pas))
+    bornes = np.arange(n_pas + 1) * pas
+    P_tir = np.diff(profil.energie(bornes)) / pas
+    heures = (bornes[:-1] // 3600).astype(np.intp)
+    tarifs = np.asarray(tarif, dtype=float)[heures % len(tarif)]
+    P_pv = np.zeros(n_pas) if pv is None else np.asarray(pv, dtype=float)[heures % len(pv)] * 1000
+    P_pac, cops = _performances_pas(p, performances, bornes[:-1])
+
+    n_anti = math.ceil(p.t_anti_cycle_min * 60 / pas - 1e-9)
+    n_delay = math.ceil(p.t_delay_min * 60 / pas - 1e-9)
+    # Temporisation non multiple du pas : le dernier pas de démarrage finit en chauffe
+    delai = p.t_delay_min * 60 - (n_delay - 1) * pas if n_delay else 0.0
+    relais = n_delay > 0 and delai < pas - 1e-9
+    decisions = _modes(n_anti, n_delay, relais)
+    n_modes = len(decisions)
+    chaud_possible = (False, True) if p.P_chaud_nom > 0 else (False,)
+    modele = _Modele(p, pas, T_min, chaud_possible, delai if relais else 0.0)
+    indice = {c: k for k, c in enumerate(modele.combinaisons)}
+
+    # Grille de T et valeur terminale : déficit par rapport à T_init valorisé au coût moyen de la PAC.
+    # Sous T_min, la pénalité l'emporte : la grille s'arrête quelques degrés sous T_min (ou T_init)
+    T_bas = max(p.T_eau_froide, min(T_min, p.T_init) - MARGE_GRILLE)
+    T_haut = max(p.T_arret, p.T_init)
+    grille = np.linspace(T_bas, T_haut, int(math.ceil((T_haut - T_bas) / pas_T)) + 1)
+    pas_grille = grille[1] - grille[0]
+    valeur_stock = float(np.mean(tarifs / cops)) * modele.C / 3600000
+    V = np.empty((n_pas + 1, n_modes, len(grille)))
+    V[n_pas] = np.maximum(p.T_init - grille, 0.0) * valeur_stock
+
+    def interpoler(Vs, T):
+        """Vs (modes, grille) aux T, interpolation linéaire sur la grille régulière : (modes,) + T.shape."""
+        f = np.clip((T - T_bas) / pas_grille, 0, len(grille) - 1)
+        i = np.minimum(f.astype(np.intp), len(grille) - 2)
+        w = f - i
+        return Vs[:, i] * (1 - w) + Vs[:, i + 1] * w
+
+    def valeurs(n, T):
+        """
+        Pas n depuis les T : (T1, coût, coupure, T° la plus basse) de chaque combinaison et, par
+        mode, la liste [((marche PAC, chaudière, combinaison, mode suivant), coût du pas + valeur de la suite)].
+        """
+        modele.regler(P_pac[n], cops[n])
+        pas_n = T1, cout, coupe, T_creux = modele.pas_de_temps(T, P_tir[n], tarifs[n], P_pv[n], prix_chaudiere)
+        penalite = modele.penalite(T_creux)
+        Vs = interpoler(V[n + 1], T1)
+        choix = []
+        for m, options in enumerate(decisions):
+            q = []
+            for marche, mode, m_suivant in options:
+                demarre = cout_demarrage if marche and m <= n_anti else 0.0
+                for chaud in chaud_possible:
+                    k = indice[mode, chaud]
+                    # Coupure par le thermostat : la PAC repart en anti-court-cycle
+                    suite = np.where(coupe[k], Vs[0, k], Vs[m_suivant, k])
+                    q.append(((marche, chaud, k, m_suivant), cout[k] + penalite[k] + demarre + suite))
+            choix.append(q)
+        return pas_n, choix
+
+    # Récurrence arrière, vectorisée sur la grille
+    for n in range(n_pas - 1, -1, -1):
+        for m, q in enumerate(valeurs(n, grille)[1]):
+            V[n, m] = np.min([v for _, v in q], axis=0)
+
+    # Passe avant depuis l'état réel : anti-court-cycle libre au départ
+    T = np.array([p.T_init])
+    m = n_anti
+    pac = np.zeros(n_pas, dtype=bool)
+    chaud_prog = np.zeros(n_pas, dtype=bool)
+    cout_prevu = 0.0
+    T_prevu = np.empty(n_pas)
+    for n in range(n_pas):
+        (T1, cout, coupe, _), choix = valeurs(n, T)
+        (pac[n], chaud_prog[n], k, m), _ = min(choix[m], key=lambda d: float(d[1][0]))
+        m = 0 if coupe[k, 0] else m
+        T = T1[k]
+        cout_prevu += float(cout[k, 0])
+        T_prevu[n] = T[0]
+
+    programme = Programme(pac, chaud_prog, pas)
+    t_sortie = np.arange(0.0, duree, t_sortie_dt)
+    res = simuler(p, profil, duree=duree, t_sortie=t_sortie, performances=performances, commande=programme)
+    res_h = simuler(p, profil, duree=duree, t_sortie=t_sortie, performances=performances)
+    cout, cout_h = (cout_simulation(p, profil, tarif, pv, prix_chaudiere, duree, c, performances)
+                    for c in (programme, None))
+    violations, violations_h = (_sous_T_min(r, T_min) for r in (res, res_h))
+
+    def objectif(r, c):
+        # Critère de la programmation dynamique : énergie, usure et déficit de stock en fin de journée
+        return c + cout_demarrage * r.bilan.demarrages + max(p.T_init - r.bilan.T_final, 0.0) * valeur_stock
+
+    # Le programme n'est retenu que s'il fait mieux que l'hystérésis sans tenir T_min moins bien qu'elle
+    if objectif(res_h, cout_h) <= objectif(res, cout) and violations_h <= violations:
+        programme_retenu, res_retenu, cout_retenu, violations_retenu = None, res_h, cout_h, violations_h
+    else:
+        programme_retenu, res_retenu, cout_retenu, violations_retenu = programme, res, cout, violations
+    return Pilotage(
+        programme=programme_retenu,
+        cout_prevu=cout_prevu,
+        resultat=res_retenu,
+        cout=cout_retenu,
+        resultat_hysteresis=res_h,
+        cout_hysteresis=cout_h,
+        violations=violations_retenu,
+        T_prevu=T_prevu,
+        cout_programme=cout,
+    )
+
+
+def _performances_pas(p, performances, t):
+    """(puissance nominale en W, COP) de la PAC aux instants t : ceux de p, ou de la carte à l'heure de t."""
+    t = np.asarray(t, dtype=float)
+    if performances is None:
+        return np.full(t.shape, p.P_pac_nom * 1000.0), np.full(t.shape, float(p.cop_moyen))
+    P_h, cop_h = performances.paliers(p.T_prim)
+    k = (t // performances.pas).astype(np.intp) % len(P_h)
+    return P_h[k], cop_h[k]
+
+
+def _sous_T_min(res, T_min):
+    """Durée (s) sous T_min après que la T° l'a atteinte une première fois (toute la série sinon)."""
+    sous = res.T < T_min - 1e-9
+    atteinte = np.flatnonzero(~sous)
+    if len(atteinte) == 0:
+        return float(res.t[-1] - res.t[0] + res.t[1] - res.t[0])
+    dt = float(res.t[1] - res.t[0])
+    return float(np.count_nonzero(sous[atteinte[0]:]) * dt)
+
+
+def cout_simulation(p, profil, tarif, pv=None, prix_chaudiere=0.12, duree=86400.0, commande=None,
+                    performances=None):
+    """
+    Coût (€) d'une simulation par événements depuis l'état initial de p, heure de tarif par
+    heure de tarif : énergies exactes du bilan de chaque heure, électricité de la PAC au COP
+    moyen (au COP de la carte de performances si elle est donnée) diminuée du surplus PV
+    pendant sa marche.
+    """
+    if not isinstance(profil, ProfilTirage):
+        profil = ProfilTirage.horaire(profil, p.T_eau_froide)
+    tarif = np.asarray(tarif, dtype=float)
+    etat = None
+    cout = 0.0
+    for h in range(int(math.ceil(duree / 3600 - 1e-9))):
+        res = simuler(p, profil, duree=min(3600.0, duree - h * 3600), etat=etat, performances=performances,
+                      commande=commande)
+        etat = res.etat_final
+        b = res.bilan
+        e_elec = b.e_th_pac / p.cop_moyen if performances is None else b.e_elec
+        if pv is not None:
+            # Marche en chauffe : la PAC fixe tourne à puissance nominale, sa montée ne consomme pas
+            P_pac = _performances_pas(p, performances, [h * 3600.0])[0][0]
+            marche = b.e_th_pac * 3600000 / P_pac if p.modele == "pac_fixe" else b.temps_marche_pac
+            e_elec = max(e_elec - float(pv[h % len(pv)]) * marche / 3600, 0.0)
+        cout += e_elec * tarif[h % len(tarif)] + b.e_th_chaud * prix_chaudiere
+    return cout
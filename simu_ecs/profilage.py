@@ -0,0 +1,127 @@
+"""
+Instrumentation optionnelle des applications : chronomètres par étape et compteurs.
+
+    prof = Profileur(actif=True)
+    with prof.etape("simulation", cache=cache):
+        res = cache.obtenir_ou_calculer(...)
+    prof.ajouter(res.compteurs)
+    with prof.etape("graphiques"):
+        ...
+
+Désactivé (par défaut), etape() rend un contexte vide partagé et compter() retourne
+aussitôt : le coût se limite à un appel de méthode par étape.
+Le bilan s'exporte en JSON (vers_json) ; avec cprofile=True, tout le script est aussi
+profilé par cProfile, exportable au format pstats (octets_pstats, lisible par
+pstats.Stats ou snakeviz) ou résumé en texte (resume_pstats).
+"""
+import io
+import json
+import marshal
+import time
+from contextlib import contextmanager, nullcontext
+
+_NUL = nullcontext()
+
+
+class Profileur:
+    """Durées cumulées par étape (s) et compteurs nommés."""
+
+    def __init__(self, actif=False, cprofile=False):
+        self.actif = actif
+        self.etapes = {}       # nom -> [appels, durée cumulée (s)]
+        self.compteurs = {}
+        self._debut = time.perf_counter()
+        self._fin = None
+        self._profil = None
+        if actif and cprofile:
+            import cProfile
+            self._profil = cProfile.Profile()
+            self._profil.enable()
+
+    def etape(self, nom, cache=None):
+        """Contexte chronométré ; avec un CacheResultats, compte aussi ses succès et calculs."""
+        if not self.actif:
+            return _NUL
+        return self._chronometrer(nom, cache)
+
+    @contextmanager
+    def _chronometrer(self, nom, cache):
+        if cache is not None:
+            succes, calculs = cache.hits, cache.misses
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            d = time.perf_counter() - t0
+            e = self.etapes.setdefault(nom, [0, 0.0])
+            e[0] += 1
+            e[1] += d
+            if cache is not None:
+                self.compter("cache_succes", cache.hits - succes)
+                self.compter("cache_calculs", cache.misses - calculs)
+
+    def compter(self, nom, n=1):
+        if not self.actif:
+            return
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + n
+
+    def ajouter(self, compteurs):
+        """Ajoute un dictionnaire de compteurs (ex. Resultat.compteurs) ; None est ignoré."""
+        if not self.actif or not compteurs:
+            return
+        for nom, n in compteurs.items():
+            self.compter(nom, n)
+
+    def terminer(self):
+        """Arrête l'horloge globale et cProfile ; à appeler avant d'afficher ou d'exporter."""
+        if self._fin is None:
+            self._fin = time.perf_counter()
+            if self._profil is not None:
+                self._profil.disable()
+
+    @property
+    def total(self):
+        fin = self._fin if self._fin is not None else time.perf_counter()
+        return fin - self._debut
+
+    @property
+    def avec_cprofile(self):
+        return self._profil is not None
+
+    def lignes(self):
+        """[(étape, appels, durée (s), part du total (%))], plus longue d'abord."""
+        total = self.total
+        return sorted(((nom, n, d, d / total * 100 if total > 0 else 0.0) for nom, (n, d) in self.etapes.items()),
+                      key=lambda l: -l[2])
+
+    def vers_dict(self):
+        return {
+            "total_s": self.total,
+            "etapes": {nom: {"appels": n, "duree_s": d} for nom, (n, d) in self.etapes.items()},
+            "compteurs": dict(self.compteurs),
+        }
+
+    def vers_json(self):
+        return json.dumps(self.vers_dict(), indent=2, ensure_ascii=False)
+
+    def vers_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.lignes(), columns=["Étape", "Appels", "Durée (s)", "Part (%)"])
+
+    def octets_pstats(self):
+        """Contenu d'un fichier .pstats (même format que cProfile.Profile.dump_stats)."""
+        if self._profil is None:
+            return b""
+        self.terminer()
+        self._profil.create_stats()
+        return marshal.dumps(self._profil.stats)
+
+    def resume_pstats(self, n=20, tri="cumulative"):
+        """Les n fonctions les plus coûteuses, en texte."""
+        if self._profil is None:
+            return ""
+        import pstats
+        self.terminer()
+        flux = io.StringIO()
+        pstats.Stats(self._profil, stream=flux).sort_stats(tri).print_stats(n)
+        return flux.getvalue()
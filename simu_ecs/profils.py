@@ -0,0 +1,164 @@
+import math
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from .parametres import puissance_tirage
+
+
+class ProfilTirage:
+    """
+    Puissance de soutirage constante par morceaux.
+
+    instants   : début de chaque palier (s), croissants, le premier vaut 0
+    puissances : puissance soutirée sur chaque palier (W)
+    periode    : durée après laquelle le profil se répète (s), None si non périodique
+                 (le dernier palier est alors prolongé indéfiniment)
+    """
+
+    def __init__(self, instants, puissances, periode=None):
+        self.instants = np.asarray(instants, dtype=float)
+        self.puissances = np.asarray(puissances, dtype=float)
+        if self.instants.ndim != 1 or self.instants.shape != self.puissances.shape:
+            raise ValueError("instants et puissances doivent être deux vecteurs de même taille")
+        if len(self.instants) == 0 or self.instants[0] != 0:
+            raise ValueError("Le premier palier doit commencer à t = 0")
+        if np.any(np.diff(self.instants) <= 0):
+            raise ValueError("Les instants doivent être strictement croissants")
+        if periode is not None and periode <= self.instants[-1]:
+            raise ValueError("La période doit dépasser le début du dernier palier")
+        self.periode = periode
+        # Copies en listes Python : recherche par bisect sans surcoût NumPy par appel
+        self._instants = self.instants.tolist()
+        self._puissances = self.puissances.tolist()
+
+    @classmethod
+    def horaire(cls, hour_volumes, T_eau_froide, periodique=True):
+        """Profil horaire (volumes à 60°C en L/h), répété toutes les len(hour_volumes) heures."""
+        p = puissance_tirage(hour_volumes, T_eau_froide)
+        instants = np.arange(len(p)) * 3600.0
+        return cls(instants, p, len(p) * 3600.0 if periodique else None)
+
+    @classmethod
+    def creneaux(cls, debuts, durees, puissances, periode=86400.0):
+        """
+        Somme de créneaux rectangulaires, stockée par ses seuls fronts.
+
+        debuts, durees : début et durée de chaque créneau (s), dans un ordre quelconque
+        puissances     : puissance de chaque créneau (W), superposées s'ils se chevauchent
+                         (durees et puissances peuvent être des scalaires communs)
+        periode        : les créneaux qui dépassent la période sont repliés sur son début ;
+                         None pour un profil non périodique (débuts >= 0)
+        """
+        debuts = np.asarray(debuts, dtype=float).ravel()
+        durees = np.broadcast_to(np.asarray(durees, dtype=float), debuts.shape)
+        p = np.broadcast_to(np.asarray(puissances, dtype=float), debuts.shape)
+        if np.any(durees < 0):
+            raise ValueError("Les durées doivent être positives")
+        if periode is None:
+            if np.any(debuts < 0):
+                raise ValueError("Les débuts doivent être positifs")
+            fins = debuts + durees
+            report = 0.0
+        else:
+            if np.any(durees > periode):
+                raise ValueError("Un créneau ne peut pas durer plus d'une période")
+            debuts = np.mod(debuts, periode)
+            fins = debuts + durees
+            deborde = fins >= periode
+            fins = np.where(deborde, fins - periode, fins)
+            report = p[deborde].sum()
+
+        # Fronts +p au début, -p à la fin, cumulés dans l'ordre des instants
+        instants = np.concatenate([[0.0], debuts, fins])
+        sauts = np.concatenate([[report], p, -p])
+        ordre = np.argsort(instants, kind="stable")
+        instants, niveaux = instants[ordre], np.cumsum(sauts[ordre])
+        # Un seul palier par instant (le dernier cumul), puissances >= 0 aux arrondis près
+        garde = np.append(instants[1:] != instants[:-1], True)
+        return cls(instants[garde], np.maximum(niveaux[garde], 0.0), periode)
+
+    def palier(self, t):
+        """Retourne (puissance, instant du prochain changement) au temps t."""
+        base = 0.0
+        tt = t
+        if self.periode is not None:
+            base = math.floor(t / self.periode) * self.periode
+            tt = t - base
+        k = max(bisect_right(self._instants, tt) - 1, 0)
+        # t = base + instants[k + 1] arrondi peut redonner tt juste sous instants[k + 1]
+        while k + 1 < len(self._instants) and base + self._instants[k + 1] <= t:
+            k += 1
+        if self.periode is not None and k + 1 == len(self._instants) and base + self.periode <= t:
+            base, k = base + self.periode, 0
+        if k + 1 < len(self._instants):
+            suivant = base + self._instants[k + 1]
+        elif self.periode is not None:
+            suivant = base + self.periode
+        else:
+            suivant = math.inf
+        return self._puissances[k], suivant
+
+    def paliers(self, t_debut, t_fin, n_max=None):
+        """
+        Paliers successifs recouvrant [t_debut, t_fin), au plus n_max.
+
+        Retourne (bornes, puissances) : le palier k va de bornes[k] à bornes[k + 1],
+        bornes[0] = t_debut et la dernière borne est plafonnée à t_fin.
+        """
+        n = len(self._instants)
+        if self.periode is None:
+            g0 = max(bisect_right(self._instants, t_debut) - 1, 0)
+            g1 = max(bisect_left(self._instants, t_fin), g0 + 1)
+        else:
+            j0 = math.floor(t_debut / self.periode)
+            j1 = math.floor(t_fin / self.periode)
+            g0 = j0 * n + max(bisect_right(self._instants, t_debut - j0 * self.periode) - 1, 0)
+            g1 = max(j1 * n + bisect_left(self._instants, t_fin - j1 * self.periode), g0 + 1)
+        if n_max is not None:
+            g1 = min(g1, g0 + n_max)
+        g = np.arange(g0, g1 + 1)
+        if self.periode is None:
+            k = np.minimum(g, n - 1)
+            bornes = self.instants[k]
+            if g1 >= n:
+                bornes[-1] = math.inf
+        else:
+            k = g % n
+            bornes = (g // n) * self.periode + self.instants[k]
+        bornes[0] = t_debut
+        bornes[-1] = min(bornes[-1], t_fin)
+        puissances = self.puissances[k[:-1]]
+        # Paliers de durée nulle (arrondis de base + instants[k] aux bornes) écartés
+        longs = bornes[1:] > bornes[:-1]
+        if not longs.all():
+            bornes, puissances = np.append(bornes[:-1][longs], bornes[-1]), puissances[longs]
+        return bornes, puissances
+
+    def premiere_difference(self, autre):
+        """Premier instant (s) où les deux profils diffèrent, math.inf s'ils sont identiques."""
+        if self.periode != autre.periode:
+            return 0.0
+        points = np.union1d(self.instants, autre.instants)
+        ecarts = np.flatnonzero(self.valeurs(points) != autre.valeurs(points))
+        return float(points[ecarts[0]]) if len(ecarts) else math.inf
+
+    def valeurs(self, t):
+        """Puissance soutirée aux instants t (vectorisé)."""
+        tt = np.asarray(t, dtype=float)
+        if self.periode is not None:
+            tt = np.mod(tt, self.periode)
+        k = np.clip(np.searchsorted(self.instants, tt, side="right") - 1, 0, len(self.instants) - 1)
+        return self.puissances[k]
+
+    def energie(self, t):
+        """Énergie soutirée de 0 à t (J, vectorisé)."""
+        tt = np.asarray(t, dtype=float)
+        cumul = np.concatenate([[0.0], np.cumsum(self.puissances[:-1] * np.diff(self.instants))])
+        base = 0.0
+        if self.periode is not None:
+            n_per = np.floor(tt / self.periode)
+            base = n_per * (cumul[-1] + self.puissances[-1] * (self.periode - self.instants[-1]))
+            tt = tt - n_per * self.periode
+        k = np.clip(np.searchsorted(self.instants, tt, side="right") - 1, 0, len(self.instants) - 1)
+        return base + cumul[k] + self.puissances[k] * (tt - self.instants[k])
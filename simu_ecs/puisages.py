@@ -0,0 +1,117 @@
+"""
+Cycles de puisage : liste d'événements (début, durée, débit, température livrée).
+
+Les puisages ne sont jamais échantillonnés sur une grille : ils deviennent un
+ProfilTirage dont les paliers sont délimités par leurs seuls fronts (deux par
+puisage), que le moteur par événements consomme directement.
+
+Format CSV (séparateur « ; », « , » ou tabulation, virgule décimale acceptée avec « ; ») :
+
+    debut;duree;debit;T_livree
+    07:05;300;8;40
+    07:30:15;45;4.5;45
+
+debut en secondes ou HH:MM[:SS], duree en s, debit en L/min, T_livree en °C.
+Les unités entre parenthèses et les accents des en-têtes sont ignorés.
+"""
+import csv
+import io
+import os
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+
+from .parametres import puissance_puisage
+from .profils import ProfilTirage
+
+# En-têtes acceptés (normalisés) -> champ
+COLONNES_CSV = {
+    "debut": "debuts", "heure": "debuts", "instant": "debuts",
+    "duree": "durees",
+    "debit": "debits",
+    "t_livree": "T_livree", "t": "T_livree", "temperature": "T_livree",
+}
+
+
+def _normaliser(entete):
+    """'Débit (L/min)' -> 'debit'."""
+    texte = unicodedata.normalize("NFKD", entete).encode("ascii", "ignore").decode()
+    texte = texte.split("(")[0].split("[")[0].strip().lower()
+    return texte.replace(" ", "_")
+
+
+def _secondes(valeur):
+    """'07:05', '07:05:30' ou '25500' -> secondes."""
+    if ":" in valeur:
+        morceaux = [float(x) for x in valeur.split(":")]
+        return sum(m * f for m, f in zip(morceaux, (3600, 60, 1)))
+    return float(valeur)
+
+
+@dataclass
+class Puisages:
+    """Puisages d'un cycle (vecteurs de même taille, un élément par puisage)."""
+    debuts: np.ndarray     # s depuis le début du cycle
+    durees: np.ndarray     # s
+    debits: np.ndarray     # L/min
+    T_livree: np.ndarray   # °C
+
+    def __post_init__(self):
+        # Colonnes scalaires (débit ou température communs) diffusées à la taille des autres
+        colonnes = (self.debuts, self.durees, self.debits, self.T_livree)
+        try:
+            colonnes = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in colonnes))
+        except ValueError:
+            raise ValueError("Les colonnes des puisages doivent avoir la même taille") from None
+        self.debuts, self.durees, self.debits, self.T_livree = (np.array(a).ravel() for a in colonnes)
+
+    def __len__(self):
+        return len(self.debuts)
+
+    @classmethod
+    def lire(cls, source):
+        """Lit un CSV de puisages (chemin, fichier texte ou binaire, ex. st.file_uploader)."""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, encoding="utf-8-sig", newline="") as f:
+                return cls.lire(f)
+        texte = source.read()
+        if isinstance(texte, bytes):
+            texte = texte.decode("utf-8-sig")
+        try:
+            dialecte = csv.Sniffer().sniff(texte.split("\n", 1)[0], delimiters=";,\t")
+        except csv.Error:
+            raise ValueError("Séparateur du CSV des puisages introuvable (« ; », « , » ou tabulation)") from None
+        lignes = csv.reader(io.StringIO(texte), dialecte)
+        entetes = [_normaliser(e) for e in next(lignes)]
+        champs = [COLONNES_CSV.get(e) for e in entetes]
+        manquants = set(COLONNES_CSV.values()) - set(champs)
+        if manquants:
+            raise ValueError(f"Colonnes manquantes dans le CSV des puisages : {', '.join(sorted(manquants))}")
+        virgule = dialecte.delimiter != ","
+        colonnes = {c: [] for c in COLONNES_CSV.values()}
+        for n, ligne in enumerate(lignes, start=2):
+            if not any(v.strip() for v in ligne):
+                continue
+            try:
+                for champ, v in zip(champs, ligne):
+                    if champ is None:
+                        continue
+                    v = v.strip().replace(",", ".") if virgule else v.strip()
+                    colonnes[champ].append(_secondes(v) if champ == "debuts" else float(v))
+            except ValueError:
+                raise ValueError(f"Ligne {n} illisible dans le CSV des puisages : {ligne}") from None
+        return cls(**colonnes)
+
+    def puissances(self, T_eau_froide):
+        """Puissance soutirée par chaque puisage (W)."""
+        return np.maximum(puissance_puisage(self.debits, self.T_livree, T_eau_froide), 0.0)
+
+    def volume_60(self, T_eau_froide):
+        """Volume équivalent à 60°C du cycle (L), comparable au profil horaire."""
+        v = self.debits / 60 * self.durees
+        return float(np.sum(v * np.maximum(self.T_livree - T_eau_froide, 0.0)) / (60 - T_eau_froide))
+
+    def profil(self, T_eau_froide, periode=86400.0):
+        """ProfilTirage des puisages, répété toutes les `periode` s (None : non périodique)."""
+        return ProfilTirage.creneaux(self.debuts, self.durees, self.puissances(T_eau_froide), periode)
@@ -0,0 +1,123 @@
+"""
+Boucle à pas fixe des simulateurs Streamlit, sans interface.
+
+Transcription fidèle des boucles de main.py, main2.py et main3_serp.py, conservée
+comme référence pour valider les moteurs plus rapides.
+"""
+import numpy as np
+
+from .parametres import CP_WATER, RHO_WATER, OFF, STARTING, HEATING
+from .resultats import Bilan, Resultat
+
+
+def simuler_pas_fixe(p, hour_volumes, dt=10, duree=86400, series=True):
+    """
+    Boucle de référence. Le bilan est cumulé dans la boucle ; avec series=False,
+    aucun tableau par pas n'est alloué (Resultat sans séries).
+    """
+    t_steps = int(duree / dt)
+    if series:
+        time_array = np.arange(0, t_steps * dt, dt)
+        T = np.zeros(t_steps)
+        P_pac_act = np.zeros(t_steps)
+        P_chaud_act = np.zeros(t_steps)
+        P_tirage_act = np.zeros(t_steps)
+        T[0] = p.T_init
+
+    n_h = len(hour_volumes)
+    P_pac_nom = p.P_pac_nom * 1000
+    P_chaud_nom = p.P_chaud_nom * 1000
+    us = p.us_global
+    m_ball = (p.V_ball / 1000 * RHO_WATER)
+    T_arret = p.T_arret
+
+    pac_state = OFF
+    wait_timer, chauffe_timer, time_since_stop = 0.0, 0.0, 9999.0
+
+    # Accumulateurs du bilan (sommes par pas, comme les np.sum sur les séries)
+    Ti = float(p.T_init)
+    s_pac = s_chaud = s_tirage = s_ecrete = 0.0
+    s_T = 0.0
+    n_pac = n_chaud = demarrages = 0
+    T_min = T_max = Ti
+    marche_prec = False
+
+    for i in range(1, t_steps):
+        curr_h = int((i * dt / 3600) % n_h)
+        p_tirage = (hour_volumes[curr_h] / 3600) * CP_WATER * (60 - p.T_eau_froide)
+
+        p_pac, p_chaud = 0.0, 0.0
+
+        if pac_state == OFF:
+            time_since_stop += dt
+            if Ti <= p.T_seuil and time_since_stop >= (p.t_anti_cycle_min * 60):
+                pac_state = STARTING
+                wait_timer, chauffe_timer = 0.0, 0.0
+        elif pac_state == STARTING:
+            wait_timer += dt
+            chauffe_timer += dt
+            if p.modele == "pac_fixe":
+                p_pac = 1e-6
+            if chauffe_timer > (p.t_secours_min * 60):
+                if p.modele == "serpentin":
+                    p_chaud = min(P_chaud_nom, max(0, us * (p.T_prim - Ti)))
+                else:
+                    p_chaud = P_chaud_nom
+            if wait_timer >= (p.t_delay_min * 60):
+                pac_state = HEATING
+        elif pac_state == HEATING:
+            if Ti >= T_arret:
+                pac_state = OFF
+                time_since_stop, chauffe_timer = 0.0, 0.0
+            else:
+                p_e_max = max(0, us * (p.T_prim - Ti))
+                p_pac = P_pac_nom if p.modele == "pac_fixe" else min(P_pac_nom, p_e_max)
+                chauffe_timer += dt
+                if chauffe_timer > (p.t_secours_min * 60):
+                    if p.modele == "serpentin":
+                        p_chaud = min(P_chaud_nom, max(0, p_e_max - p_pac))
+                    else:
+                        p_chaud = P_chaud_nom
+
+        # Bilan énergétique du pas de temps
+        p_pertes = (p.ua_ballon * (Ti - p.T_amb)) + (p.P_bouclage_kW * 1000)
+        s_T += Ti
+        dT_step = (p_pac + p_chaud - p_pertes - p_tirage) * dt / (m_ball * CP_WATER)
+        T_brut = Ti + dT_step
+        Ti = max(p.T_eau_froide, T_brut)
+
+        s_pac += p_pac
+        s_chaud += p_chaud
+        s_tirage += p_tirage
+        s_ecrete += Ti - T_brut
+        marche = p_pac > 0
+        demarrages += marche and not marche_prec
+        marche_prec = marche
+        n_pac += marche
+        n_chaud += p_chaud > 0
+        T_min, T_max = min(T_min, Ti), max(T_max, Ti)
+        if series:
+            T[i] = Ti
+            P_pac_act[i], P_chaud_act[i], P_tirage_act[i] = p_pac, p_chaud, p_tirage
+
+    C = m_ball * CP_WATER
+    bilan = Bilan(
+        e_th_pac=s_pac * dt / 3600000,
+        e_th_chaud=s_chaud * dt / 3600000,
+        e_tirage=s_tirage * dt / 3600000,
+        # t_steps - 1 pas intégrés : la T° initiale occupe le premier point des séries
+        e_pertes_cuve=p.ua_ballon * (s_T - (t_steps - 1) * p.T_amb) * dt / 3600000,
+        e_bouclage=p.P_bouclage_kW * (t_steps - 1) * dt / 3600,
+        e_stockee=C * (Ti - p.T_init) / 3600000,
+        e_ecretee=C * s_ecrete / 3600000,
+        demarrages=int(demarrages),
+        temps_marche_pac=n_pac * dt,
+        temps_marche_chaud=n_chaud * dt,
+        T_min=T_min,
+        T_max=T_max,
+        T_final=Ti,
+        duree=t_steps * dt,
+    )
+    if not series:
+        return Resultat(None, None, None, None, None, bilan)
+    return Resultat(time_array, T, P_pac_act, P_chaud_act, P_tirage_act, bilan)
@@ -0,0 +1,83 @@
+"""
+Décimation des séries avant tracé.
+
+Les courbes sont réduites à quelques points par pixel avant matplotlib :
+- min/max par paquet : chaque paquet garde son premier, son dernier, son minimum et
+  son maximum, pour toutes les séries à la fois (axe x commun pour stackplot). Les pics
+  et les creux (relances à T_cons - dT_restart) sont donc conservés ;
+- fronts de marche/arrêt : les deux échantillons de part et d'autre de chaque passage
+  par zéro sont gardés, si bien que les courtes rafales de chaudière restent visibles ;
+- LTTB (Largest-Triangle-Three-Buckets) pour une seule courbe lisse, en option.
+
+Un zoom redécime à partir des données pleine résolution (x_min, x_max).
+"""
+import numpy as np
+
+
+def fenetre(x, x_min=None, x_max=None):
+    """Tranche des indices de x (croissant) dans [x_min, x_max], bornes voisines incluses."""
+    debut = 0 if x_min is None else max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    fin = len(x) if x_max is None else min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    return slice(debut, fin)
+
+
+def _extremes_par_paquet(y, n_paquets):
+    n = len(y)
+    k = -(-n // n_paquets)
+    m = -(-n // k)
+    bourre = np.pad(y, (0, m * k - n), mode="edge").reshape(m, k)
+    base = np.arange(m) * k
+    i_min = np.minimum(base + np.argmin(bourre, axis=1), n - 1)
+    i_max = np.minimum(base + np.argmax(bourre, axis=1), n - 1)
+    return base, np.minimum(base + k - 1, n - 1), i_min, i_max
+
+
+def indices_minmax(ys, n_pixels=1000, fronts=True):
+    """Indices à garder pour tracer les séries ys (même longueur) sur n_pixels."""
+    ys = [np.asarray(y) for y in ys]
+    n = len(ys[0])
+    if n <= 4 * n_pixels:
+        return np.arange(n)
+    morceaux = []
+    for y in ys:
+        morceaux.extend(_extremes_par_paquet(y, n_pixels))
+        if fronts:
+            bascule = np.flatnonzero((y[1:] != 0) != (y[:-1] != 0))
+            morceaux.extend((bascule, bascule + 1))
+    return np.unique(np.concatenate(morceaux))
+
+
+def indices_lttb(x, y, n_points=1000):
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= n_points or n_points < 3:
+        return np.arange(n)
+    bornes = np.linspace(1, n - 1, n_points - 1).astype(int)
+    retenus = np.empty(n_points, dtype=np.int64)
+    retenus[0], retenus[-1] = 0, n - 1
+    a = 0
+    for k in range(n_points - 2):
+        d, f = bornes[k], bornes[k + 1]
+        # Point moyen du paquet suivant
+        d2, f2 = f, (bornes[k + 2] if k + 2 < len(bornes) else n)
+        xm, ym = x[d2:f2].mean(), y[d2:f2].mean()
+        aires = np.abs((x[a] - xm) * (y[d:f] - y[a]) - (x[a] - x[d:f]) * (ym - y[a]))
+        a = d + int(np.argmax(aires))
+        retenus[k + 1] = a
+    return retenus
+
+
+def indices_affichage(x, ys, n_pixels=1000, x_min=None, x_max=None, methode="minmax"):
+    """Indices pleine résolution à tracer pour la fenêtre [x_min, x_max]."""
+    tranche = fenetre(np.asarray(x), x_min, x_max)
+    if methode == "lttb":
+        if len(ys) != 1:
+            raise ValueError("LTTB ne décime qu'une série à la fois")
+        idx = indices_lttb(np.asarray(x)[tranche], np.asarray(ys[0])[tranche], n_pixels)
+    elif methode == "minmax":
+        idx = indices_minmax([np.asarray(y)[tranche] for y in ys], n_pixels)
+    else:
+        raise ValueError(f"Méthode de décimation inconnue : {methode!r}")
+    return idx + tranche.start
@@ -0,0 +1,98 @@
+"""
+Re-simulation incrémentale après une retouche du profil de soutirage.
+
+La journée est simulée par tranches d'une heure avec le moteur par événements ; à
+chaque heure, un point de reprise garde l'état complet du régulateur (T, pac_state,
+temporisations) et le bilan cumulé. Quand le profil change, la simulation repart
+du dernier point antérieur à la première différence : modifier la case de 18h ne
+recalcule que les heures 18 à 23. Les points de reprise ne valent que pour les
+paramètres physiques, le pas et la durée de la simulation ; pour d'autres
+paramètres, créer une nouvelle SimulationIncrementale (voir compatible).
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .cache import cle_stable
+from .evenements import simuler
+from .profils import ProfilTirage
+from .resultats import Bilan, EtatSimulation, Resultat
+
+SERIES = ("T", "P_pac", "P_chaud", "P_tirage")
+
+
+@dataclass
+class PointReprise:
+    """État au début d'une tranche et bilan cumulé depuis t = 0."""
+    etat: EtatSimulation
+    cumul: Bilan
+
+
+class SimulationIncrementale:
+    """
+    Journée (ou durée quelconque) simulée par tranches avec points de reprise.
+
+    dt           : pas d'échantillonnage des séries (s), comme simuler_journee
+    pas_reprise  : durée d'une tranche (s)
+    performances : carte_pac.PerformancesPAC éventuelle, transmise au moteur
+    etat         : état au début de la journée (état initial de p par défaut, ex. periodique.regime_periodique)
+    """
+
+    def __init__(self, p, dt=10, duree=86400.0, pas_reprise=3600.0, performances=None, etat=None):
+        self.p = p
+        self.performances = performances
+        self.etat = EtatSimulation.initial(p) if etat is None else etat.copie()
+        self.dt = dt
+        self.duree = float(duree)
+        self.pas_reprise = float(pas_reprise)
+        t_steps = int(duree / dt)
+        self.t = np.arange(0, t_steps * dt, dt)
+        n = math.ceil(self.duree / self.pas_reprise)
+        self.limites = np.minimum(np.arange(n + 1) * self.pas_reprise, self.duree)
+        # Un instant d'échantillonnage sur une limite revient à la tranche qui s'y termine :
+        # les puissances y sont celles du segment qui finit en t, comme dans simuler
+        self._bornes = [0] + np.searchsorted(self.t, self.limites[1:-1], side="right").tolist() + [len(self.t)]
+        self.profil = None
+        self.points = [PointReprise(self.etat.copie(), Bilan())]
+        self.tranches = []     # séries et compteurs de chaque tranche simulée
+        self.tranches_recalculees = 0
+
+    def compatible(self, p, dt, duree, performances=None, etat=None):
+        """Les points de reprise sont-ils valables pour ces paramètres ?"""
+        etat = EtatSimulation.initial(p) if etat is None else etat
+        return (p == self.p and dt == self.dt and float(duree) == self.duree and etat == self.etat
+                and cle_stable(performances) == cle_stable(self.performances))
+
+    def calculer(self, profil):
+        """Resultat complet pour ce profil, en ne resimulant que les tranches touchées."""
+        if not isinstance(profil, ProfilTirage):
+            profil = ProfilTirage.horaire(profil, self.p.T_eau_froide)
+        t_diff = 0.0 if self.profil is None else self.profil.premiere_difference(profil)
+        k = min(int(t_diff // self.pas_reprise) if math.isfinite(t_diff) else len(self.tranches),
+                len(self.tranches))
+        del self.points[k + 1:]
+        del self.tranches[k:]
+        self.profil = profil
+
+        for h in range(k, len(self.limites) - 1):
+            point = self.points[h]
+            i0, i1 = self._bornes[h], self._bornes[h + 1]
+            res = simuler(self.p, profil, duree=self.limites[h + 1] - self.limites[h],
+                          t_sortie=self.t[i0:i1], etat=point.etat, performances=self.performances)
+            self.tranches.append(res)
+            self.points.append(PointReprise(res.etat_final, point.cumul.cumuler(res.bilan)))
+        self.tranches_recalculees = len(self.limites) - 1 - k
+        return self.resultat()
+
+    def resultat(self):
+        """Assemble les tranches en un seul Resultat (séries bout à bout, bilan cumulé)."""
+        series = {c: np.concatenate([getattr(r, c) for r in self.tranches]) for c in SERIES}
+        compteurs = {}
+        for r in self.tranches:
+            for nom, n in (r.compteurs or {}).items():
+                compteurs[nom] = compteurs.get(nom, 0) + n
+        compteurs["tranches_recalculees"] = self.tranches_recalculees
+        dernier = self.points[-1]
+        return Resultat(self.t, series["T"], series["P_pac"], series["P_chaud"], series["P_tirage"],
+                        dernier.cumul, dernier.etat.copie(), compteurs=compteurs)
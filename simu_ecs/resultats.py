@@ -0,0 +1,112 @@
+import math
+from dataclasses import dataclass, replace
+
+from .parametres import OFF
+
+
+@dataclass
+class EtatSimulation:
+    """État complet du régulateur et du ballon à l'instant t."""
+    t: float = 0.0
+    T: float = 50.0
+    pac_state: str = OFF
+    wait_timer: float = 0.0
+    chauffe_timer: float = 0.0
+    time_since_stop: float = 9999.0
+
+    @classmethod
+    def initial(cls, p):
+        return cls(T=p.T_init)
+
+    def copie(self):
+        return replace(self)
+
+
+@dataclass
+class Bilan:
+    """
+    Bilan énergétique d'une simulation (énergies en kWh, durées en s).
+
+    e_stockee : variation de l'énergie du ballon, C (T_final - T initiale)
+    e_ecretee : énergie ajoutée par la butée à l'eau froide (tirage non servi)
+    e_elec    : électricité de la PAC intégrée au COP instantané (nan si le moteur ne la calcule pas)
+    """
+    e_th_pac: float = 0.0
+    e_th_chaud: float = 0.0
+    e_tirage: float = 0.0
+    e_pertes_cuve: float = 0.0
+    e_bouclage: float = 0.0
+    e_stockee: float = 0.0
+    e_ecretee: float = 0.0
+    e_elec: float = float("nan")
+    demarrages: int = 0
+    temps_marche_pac: float = 0.0
+    temps_marche_chaud: float = 0.0
+    T_min: float = float("nan")
+    T_max: float = float("nan")
+    T_final: float = float("nan")
+    duree: float = 0.0
+
+    @property
+    def e_total_produite(self):
+        return self.e_th_pac + self.e_th_chaud
+
+    @property
+    def part_chaudiere(self):
+        """Part de la chaudière dans la production (%)."""
+        e = self.e_total_produite
+        return self.e_th_chaud / e * 100 if e > 0 else 0.0
+
+    @property
+    def residu(self):
+        """
+        Écart de fermeture du bilan (kWh) : stockage - (production - tirage - pertes).
+        Vaut e_ecretee si le calcul est exact ; le reste mesure la dérive numérique.
+        """
+        return self.e_stockee - (self.e_total_produite - self.e_tirage - self.e_pertes_cuve - self.e_bouclage)
+
+    def e_elec_pac(self, cop_moyen):
+        """Électricité de la PAC : e_elec si le moteur l'a intégrée, sinon au COP moyen."""
+        if math.isnan(self.e_elec):
+            return self.e_th_pac / cop_moyen
+        return self.e_elec
+
+    def cumuler(self, suivant):
+        """Bilan de deux périodes consécutives (self puis suivant)."""
+        if self.duree == 0:
+            return replace(suivant)
+        return Bilan(
+            e_th_pac=self.e_th_pac + suivant.e_th_pac,
+            e_th_chaud=self.e_th_chaud + suivant.e_th_chaud,
+            e_tirage=self.e_tirage + suivant.e_tirage,
+            e_pertes_cuve=self.e_pertes_cuve + suivant.e_pertes_cuve,
+            e_bouclage=self.e_bouclage + suivant.e_bouclage,
+            e_stockee=self.e_stockee + suivant.e_stockee,
+            e_ecretee=self.e_ecretee + suivant.e_ecretee,
+            e_elec=self.e_elec + suivant.e_elec,
+            demarrages=self.demarrages + suivant.demarrages,
+            temps_marche_pac=self.temps_marche_pac + suivant.temps_marche_pac,
+            temps_marche_chaud=self.temps_marche_chaud + suivant.temps_marche_chaud,
+            T_min=min(self.T_min, suivant.T_min),
+            T_max=max(self.T_max, suivant.T_max),
+            T_final=suivant.T_final,
+            duree=self.duree + suivant.duree,
+        )
+
+
+@dataclass
+class Resultat:
+    """
+    Séries temporelles (W, °C) échantillonnées sur t (s) et bilan associé.
+    T_couches : T° de chaque couche (pas, couches) pour le ballon stratifié.
+    compteurs : itérations de boucle, changements d'état, etc. du moteur (voir profilage.py).
+    """
+    t: object
+    T: object
+    P_pac: object
+    P_chaud: object
+    P_tirage: object
+    bilan: Bilan
+    etat_final: EtatSimulation = None
+    T_couches: object = None
+    compteurs: dict = None
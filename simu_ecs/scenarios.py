@@ -0,0 +1,158 @@
+"""
+Fichiers de scénarios pour le lanceur en ligne de commande (python -m simu_ecs).
+
+Les clés sont les noms des champs de Parametres (mêmes noms et unités que les
+barres latérales), plus :
+
+    nom           : libellé du scénario (par défaut scenario_<n>)
+    volume_jour   : besoin journalier à 60°C (L)
+    repartition   : 24 pourcentages horaires (défaut des simulateurs)
+    profil        : volumes horaires à 60°C (L/h), remplace volume_jour/repartition ;
+                    ou CSV de volumes horaires (voir lire_profil), chemin relatif au fichier
+    puisages      : CSV de puisages (voir puisages.py), chemin relatif au fichier
+    duree_h       : durée simulée (h)
+    dt            : pas d'échantillonnage des séries (s), 0 pour le bilan seul
+    n_couches     : 0 pour le ballon mélangé, >= 2 pour le ballon stratifié
+    hauteur_sonde : position de la sonde du ballon stratifié (% de la cuve)
+
+TOML : les clés de premier niveau sont communes, chaque table [[scenario]] les
+complète ou les remplace. CSV : une ligne par scénario, cellules vides = défaut,
+repartition et profil en nombres séparés par des espaces (virgule décimale
+acceptée avec le séparateur « ; »).
+"""
+import csv
+import os
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .parametres import Parametres
+from .puisages import Puisages
+
+REPARTITION_DEFAUT = (0, 0, 0, 0, 0, 0, 10, 15, 10, 5, 2, 2, 3, 2, 2, 2, 3, 5, 10, 15, 10, 4, 0, 0)
+CHAMPS_PARAMETRES = tuple(f.name for f in fields(Parametres))
+TEXTES = ("modele", "nom", "puisages")
+CLES = CHAMPS_PARAMETRES + ("nom", "volume_jour", "repartition", "profil", "puisages",
+                            "duree_h", "dt", "n_couches", "hauteur_sonde")
+
+
+@dataclass
+class Scenario:
+    """Un scénario prêt à simuler."""
+    nom: str
+    parametres: Parametres
+    hour_volumes: np.ndarray      # L/h à 60°C
+    puisages: Puisages = None     # remplace hour_volumes s'il est donné
+    duree_h: float = 24.0
+    dt: float = 10.0
+    n_couches: int = 0
+    hauteur_sonde: float = 40.0
+
+    @property
+    def profil(self):
+        """Profil passé aux moteurs : volumes horaires ou ProfilTirage des puisages."""
+        if self.puisages is None:
+            return self.hour_volumes
+        return self.puisages.profil(self.parametres.T_eau_froide)
+
+
+def _nombres(v):
+    if isinstance(v, str):
+        return np.array(v.split(), dtype=float)
+    return np.asarray(v, dtype=float)
+
+
+def lire_profil(chemin):
+    """Volumes horaires (L/h à 60°C) d'un CSV : une ligne par heure, dernière colonne, en-tête facultatif."""
+    with open(chemin, encoding="utf-8-sig", newline="") as f:
+        lignes = [l.strip() for l in f if l.strip()]
+    separateur = next((s for s in ";\t," if lignes and s in lignes[0]), None)
+    valeurs = []
+    for n, ligne in enumerate(lignes, start=1):
+        v = ligne.split(separateur)[-1].strip() if separateur else ligne
+        if separateur != ",":
+            v = v.replace(",", ".")
+        try:
+            valeurs.append(float(v))
+        except ValueError:
+            if n == 1:
+                continue
+            raise ValueError(f"Ligne {n} illisible dans {chemin} : {ligne}") from None
+    if not valeurs:
+        raise ValueError(f"Aucun volume horaire dans {chemin}")
+    return np.array(valeurs)
+
+
+def creer_scenario(valeurs, n=0, dossier="."):
+    """Scénario à partir d'un dictionnaire de clés (voir l'en-tête du module)."""
+    inconnues = set(valeurs) - set(CLES)
+    if inconnues:
+        raise ValueError(f"Clés inconnues : {', '.join(sorted(inconnues))} (attendu : {', '.join(CLES)})")
+    champs = {}
+    for k in CHAMPS_PARAMETRES:
+        if k in valeurs:
+            champs[k] = str(valeurs[k]) if k == "modele" else float(valeurs[k])
+    p = Parametres(**champs)
+
+    if isinstance(valeurs.get("profil"), str) and valeurs["profil"].lower().endswith(".csv"):
+        hv = lire_profil(os.path.join(dossier, valeurs["profil"]))
+    elif "profil" in valeurs:
+        hv = _nombres(valeurs["profil"])
+    else:
+        repartition = _nombres(valeurs.get("repartition", REPARTITION_DEFAUT))
+        hv = repartition / 100 * float(valeurs.get("volume_jour", 1500.0))
+    puisages = None
+    if valeurs.get("puisages"):
+        puisages = Puisages.lire(os.path.join(dossier, str(valeurs["puisages"])))
+
+    return Scenario(
+        nom=str(valeurs.get("nom") or f"scenario_{n}"),
+        parametres=p,
+        hour_volumes=hv,
+        puisages=puisages,
+        duree_h=float(valeurs.get("duree_h", 24.0)),
+        dt=float(valeurs.get("dt", 10.0)),
+        n_couches=int(float(valeurs.get("n_couches", 0))),
+        hauteur_sonde=float(valeurs.get("hauteur_sonde", 40.0)),
+    )
+
+
+def lire_toml(chemin, defauts=None):
+    """defauts : clés appliquées sous celles du fichier (ex. nom et profil d'un site, voir parc.py)."""
+    import tomllib
+    with open(chemin, "rb") as f:
+        donnees = tomllib.load(f)
+    communs = {**(defauts or {}), **{k: v for k, v in donnees.items() if k != "scenario"}}
+    tables = donnees.get("scenario", [{}])
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    return [creer_scenario({**communs, **t}, n, dossier) for n, t in enumerate(tables)]
+
+
+def lire_csv(chemin):
+    with open(chemin, encoding="utf-8-sig", newline="") as f:
+        texte = f.read()
+    try:
+        dialecte = csv.Sniffer().sniff(texte.split("\n", 1)[0], delimiters=";,\t")
+    except csv.Error:
+        raise ValueError(f"Séparateur introuvable dans {chemin} (« ; », « , » ou tabulation)") from None
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    virgule = dialecte.delimiter != ","
+    lignes = csv.DictReader(texte.splitlines(), dialect=dialecte)
+    scenarios = []
+    for n, ligne in enumerate(lignes):
+        valeurs = {k.strip(): v.strip() for k, v in ligne.items() if k and v is not None and v.strip()}
+        if virgule:
+            # Virgule décimale avec le séparateur « ; »
+            valeurs = {k: v if k in TEXTES else v.replace(",", ".") for k, v in valeurs.items()}
+        scenarios.append(creer_scenario(valeurs, n, dossier))
+    return scenarios
+
+
+def lire_scenarios(chemin):
+    """Liste de Scenario depuis un fichier .toml ou .csv."""
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension == ".toml":
+        return lire_toml(chemin)
+    if extension == ".csv":
+        return lire_csv(chemin)
+    raise ValueError(f"Format de scénarios non reconnu : {chemin} (attendu .toml ou .csv)")
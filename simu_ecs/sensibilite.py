@@ -0,0 +1,218 @@
+"""
+Analyse de sensibilité globale du bilan aux paramètres d'entrée (Morris, Sobol).
+
+Chaque facteur varie uniformément sur sa plage [bas, haut] ; les facteurs sont des
+champs de Parametres, ou volume_jour (le profil horaire est mis à l'échelle). Le
+plan d'expérience est simulé en une fois par le moteur par lot (une voie par point,
+par blocs de taille_bloc), après jours_prechauffe jours non comptés qui effacent
+l'effet de T_init. Toutes les sorties demandées sont tirées des mêmes simulations.
+
+- Morris : r trajectoires de k + 1 points sur une grille à `niveaux` niveaux, un
+  facteur déplacé à chaque pas. Effets élémentaires rapportés à la plage entière
+  du facteur : mu, mu_etoile (moyenne des valeurs absolues, classement) et sigma
+  (interactions, non-linéarités). Coût r (k + 1) simulations.
+- Sobol : plan de Saltelli (matrices A, B et les k matrices A_B^i, A dont la colonne
+  i vient de B), partagé par tous les indices. S1 par l'estimateur de Saltelli
+  (2010), ST par celui de Jansen. Coût n (k + 2) simulations.
+
+Les intervalles de confiance sont obtenus par bootstrap sur les trajectoires (Morris)
+ou sur les lignes du plan (Sobol), sans nouvelle simulation.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .lot import CHAMPS, BilanLot, MoteurLot
+
+SORTIES = ("e_th_chaud", "demarrages")
+FACTEURS_PROFIL = ("volume_jour",)
+# Termes instantanés du bilan ; les autres s'accumulent, ceux d'une journée sont la différence de deux bilans
+_INSTANTANES = ("T_min", "T_max", "T_final")
+
+
+@dataclass
+class Sensibilite:
+    """
+    Indices par sortie : {sortie: {indice: vecteur (k,)}}, dans l'ordre des facteurs.
+    Intervalles de confiance en « <indice>_bas » et « <indice>_haut ».
+    """
+    methode: str
+    facteurs: tuple
+    indices: dict
+    n_simulations: int
+    niveau: float = 0.95
+
+    @property
+    def principal(self):
+        """Indice de classement : ST (Sobol) ou mu_etoile (Morris)."""
+        return "ST" if self.methode == "sobol" else "mu_etoile"
+
+    def classement(self, sortie):
+        """Indices des facteurs, du plus influent au moins influent."""
+        return np.argsort(-np.nan_to_num(self.indices[sortie][self.principal], nan=-np.inf), kind="stable")
+
+    def table(self, sortie):
+        """Colonnes facteur, rang et indices, facteurs classés."""
+        ordre = self.classement(sortie)
+        colonnes = {"facteur": np.array(self.facteurs)[ordre], "rang": np.arange(1, len(ordre) + 1)}
+        colonnes.update({nom: v[ordre] for nom, v in self.indices[sortie].items()})
+        return colonnes
+
+
+def _verifier_volume(plages, hour_volumes):
+    # volume_jour met le profil de base à l'échelle : sans volume, rien à répartir
+    if "volume_jour" in plages and not np.sum(hour_volumes) > 0:
+        raise ValueError("Facteur volume_jour : le profil horaire de base doit avoir un volume journalier positif")
+
+
+def _verifier(plages, sorties, hour_volumes):
+    inconnus = set(plages) - set(CHAMPS) - set(FACTEURS_PROFIL)
+    if inconnus:
+        raise ValueError(f"Facteurs inconnus : {', '.join(sorted(inconnus))}")
+    if not plages:
+        raise ValueError("Aucun facteur : donner au moins une plage")
+    for nom, (bas, haut) in plages.items():
+        if not bas < haut:
+            raise ValueError(f"Plage de {nom} vide ou inversée : [{bas}, {haut}]")
+    _verifier_volume(plages, hour_volumes)
+    possibles = {f.name for f in fields(BilanLot)} - {"duree"} | {"part_chaudiere"}
+    inconnues = set(sorties) - possibles
+    if inconnues:
+        raise ValueError(f"Sorties inconnues : {', '.join(sorted(inconnues))} (attendu : {', '.join(sorted(possibles))})")
+
+
+def _journee(apres, avant):
+    """Bilan entre deux états d'un même moteur."""
+    return BilanLot(**{f.name: getattr(apres, f.name) if f.name in _INSTANTANES
+                       else getattr(apres, f.name) - getattr(avant, f.name) for f in fields(BilanLot)})
+
+
+def simuler_plan(base, hour_volumes, plages, U, sorties=SORTIES, dt=60.0, duree=86400.0, jours_prechauffe=1,
+                 taille_bloc=16384):
+    """
+    {sortie: vecteur (n,)} pour les points U (n, k) de l'hypercube unité, mis à
+    l'échelle des plages (dans l'ordre de plages).
+    """
+    _verifier_volume(plages, hour_volumes)
+    noms = list(plages)
+    bas = np.array([plages[n][0] for n in noms], dtype=float)
+    haut = np.array([plages[n][1] for n in noms], dtype=float)
+    X = bas + np.asarray(U, dtype=float) * (haut - bas)
+    hv = np.asarray(hour_volumes, dtype=float)
+    n_pre = int(round(jours_prechauffe * 86400 / dt))
+    n_jour = int(duree / dt)
+    morceaux = []
+    for debut in range(0, len(X), taille_bloc):
+        bloc = X[debut:debut + taille_bloc]
+        variations = {n: bloc[:, j] for j, n in enumerate(noms) if n in CHAMPS}
+        hv_bloc = hv
+        if "volume_jour" in plages:
+            # Profil mis à l'échelle par voie, même répartition horaire
+            hv_bloc = np.outer(bloc[:, noms.index("volume_jour")] / hv.sum(), hv)
+        moteur = MoteurLot(base, variations, hv_bloc, dt)
+        if n_pre > 0:
+            moteur.avancer(n_pre - 1)
+            avant = moteur.bilan()
+            moteur.T_min, moteur.T_max = moteur.T.copy(), moteur.T.copy()
+            moteur.avancer(n_jour)
+            morceaux.append(_journee(moteur.bilan(), avant))
+        else:
+            moteur.avancer(n_jour - 1)
+            morceaux.append(moteur.bilan())
+    bilans = BilanLot.concatener(morceaux)
+    return {s: np.asarray(getattr(bilans, s), dtype=float) for s in sorties}
+
+
+def _intervalle(echantillons, niveau):
+    """Bornes (bas, haut) par percentiles d'un tableau de bootstrap (n_bootstrap, k)."""
+    q = (1 - niveau) / 2 * 100
+    return np.percentile(echantillons, [q, 100 - q], axis=0)
+
+
+def plan_morris(rng, k, r, niveaux=4):
+    """
+    r trajectoires de Morris dans [0, 1]^k : (points (r, k + 1, k), ordre des facteurs
+    déplacés (r, k), signe des pas (r, k)).
+    """
+    delta = niveaux / (2 * (niveaux - 1))
+    base = rng.integers(0, niveaux // 2, (r, k)) / (niveaux - 1)
+    signe = rng.choice([-1.0, 1.0], (r, k))
+    ordre = np.argsort(rng.random((r, k)), axis=1)
+    X = np.empty((r, k + 1, k))
+    X[:, 0] = base + delta * (signe < 0)
+    lignes = np.arange(r)
+    for j in range(k):
+        X[:, j + 1] = X[:, j]
+        f = ordre[:, j]
+        X[lignes, j + 1, f] += signe[lignes, f] * delta
+    return X, ordre, signe * delta
+
+
+def morris(base, hour_volumes, plages, r=50, niveaux=4, sorties=SORTIES, graine=0, n_bootstrap=1000, niveau=0.95,
+           **simulation):
+    """
+    Criblage de Morris : Sensibilite avec mu, mu_etoile (et son intervalle) et sigma,
+    en unités de la sortie pour la plage entière de chaque facteur.
+    simulation : options de simuler_plan (dt, duree, jours_prechauffe, taille_bloc)
+    """
+    _verifier(plages, sorties, hour_volumes)
+    if niveaux < 2 or niveaux % 2:
+        raise ValueError("Le nombre de niveaux de Morris doit être pair")
+    if r < 2:
+        raise ValueError("Il faut au moins deux trajectoires de Morris")
+    k = len(plages)
+    rng = np.random.default_rng(graine)
+    X, ordre, pas = plan_morris(rng, k, r, niveaux)
+    Y = simuler_plan(base, hour_volumes, plages, X.reshape(-1, k), sorties, **simulation)
+    lignes = np.arange(r)[:, None]
+    tirages = rng.integers(0, r, (n_bootstrap, r))
+    indices = {}
+    for s, y in Y.items():
+        y = y.reshape(r, k + 1)
+        # Effet élémentaire du facteur déplacé au pas j de chaque trajectoire, rangé par facteur
+        ee = np.empty((r, k))
+        ee[lignes, ordre] = np.diff(y, axis=1) / pas[lignes, ordre]
+        absolus = np.abs(ee)
+        bas, haut = _intervalle(absolus[tirages].mean(axis=1), niveau)
+        indices[s] = {"mu": ee.mean(axis=0), "mu_etoile": absolus.mean(axis=0),
+                      "mu_etoile_bas": bas, "mu_etoile_haut": haut, "sigma": ee.std(axis=0, ddof=1)}
+    return Sensibilite("morris", tuple(plages), indices, r * (k + 1), niveau)
+
+
+def _indices_sobol(fA, fB, fAB):
+    """(S1, ST) pour des lots de lignes : fA, fB (..., n), fAB (k, ..., n)."""
+    V = np.var(np.concatenate([fA, fB], axis=-1), axis=-1, ddof=1)
+    S1 = np.mean(fB * (fAB - fA), axis=-1)
+    ST = np.mean((fA - fAB) ** 2, axis=-1) / 2
+    # Sortie constante sur le plan : aucun facteur n'agit
+    return (np.divide(S1, V, out=np.zeros_like(S1), where=V > 0),
+            np.divide(ST, V, out=np.zeros_like(ST), where=V > 0))
+
+
+def sobol(base, hour_volumes, plages, n=1024, sorties=SORTIES, graine=0, n_bootstrap=500, niveau=0.95, **simulation):
+    """
+    Indices de Sobol du premier ordre (S1) et totaux (ST) avec leurs intervalles.
+    simulation : options de simuler_plan (dt, duree, jours_prechauffe, taille_bloc)
+    """
+    _verifier(plages, sorties, hour_volumes)
+    if n < 2:
+        raise ValueError("Il faut au moins deux lignes au plan de Saltelli")
+    k = len(plages)
+    rng = np.random.default_rng(graine)
+    A, B = rng.random((n, k)), rng.random((n, k))
+    AB = np.repeat(A[None], k, axis=0)
+    AB[np.arange(k), :, np.arange(k)] = B.T
+    Y = simuler_plan(base, hour_volumes, plages, np.concatenate([A, B, AB.reshape(-1, k)]), sorties, **simulation)
+    tirages = rng.integers(0, n, (n_bootstrap, n))
+    indices = {}
+    for s, y in Y.items():
+        fA, fB, fAB = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n)
+        S1, ST = _indices_sobol(fA, fB, fAB)
+        # Bootstrap par paquets de tirages pour borner la mémoire (k x tirages x n)
+        paquets = np.array_split(tirages, max(1, k * n * n_bootstrap // 4_000_000))
+        S1_b, ST_b = (np.concatenate(b, axis=1) for b in
+                      zip(*(_indices_sobol(fA[t], fB[t], fAB[:, t]) for t in paquets)))
+        S1_bas, S1_haut = _intervalle(S1_b.T, niveau)
+        ST_bas, ST_haut = _intervalle(ST_b.T, niveau)
+        indices[s] = {"S1": S1, "S1_bas": S1_bas, "S1_haut": S1_haut, "ST": ST, "ST_bas": ST_bas, "ST_haut": ST_haut}
+    return Sensibilite("sobol", tuple(plages), indices, n * (k + 2), niveau)
@@ -0,0 +1,235 @@
+"""
+Stockage en colonnes sur disque des longues séries, lu par mappage mémoire.
+
+Un enregistrement est un dossier :
+- un fichier .npy par colonne (t, T, P_pac, P_chaud, P_tirage...), écrit et relu
+  par np.memmap : seules les pages touchées sont chargées en mémoire ;
+- index.json : plage de temps, bornes des pages (un jour par défaut) et agrégats
+  par page et par colonne (min, max, somme), plus le bilan
+  du moteur s'il est fourni.
+
+Les agrégats sont calculés au fil de l'écriture, par blocs : les synthèses (énergies
+journalières, T° mini par jour...) se lisent dans l'index sans ouvrir les séries,
+et l'affichage parcourt les pages une à une.
+"""
+import json
+import math
+import os
+from dataclasses import asdict
+
+import numpy as np
+
+from .resultats import Bilan
+
+COLONNES = ("t", "T", "P_pac", "P_chaud", "P_tirage")
+INDEX = "index.json"
+VERSION = 1
+
+
+class Enregistreur:
+    """
+    Écrit n échantillons au pas dt, par morceaux consécutifs (ajouter), puis l'index (fermer).
+
+    La première colonne est le temps (s), croissant ; les pages durent duree_page secondes.
+    """
+
+    def __init__(self, dossier, n, dt, duree_page=86400.0, colonnes=COLONNES, meta=None):
+        if n <= 0:
+            raise ValueError("Un enregistrement doit contenir au moins un échantillon")
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.n = int(n)
+        self.dt = float(dt)
+        self.duree_page = float(duree_page)
+        self.colonnes = tuple(colonnes)
+        self.meta = meta or {}
+        self.position = 0
+        self.t0 = None
+        self._fichiers = {
+            c: np.lib.format.open_memmap(os.path.join(dossier, c + ".npy"), mode="w+", dtype=np.float64, shape=(self.n,))
+            for c in self.colonnes
+        }
+        n_pages = max(math.ceil(self.n * self.dt / self.duree_page), 1)
+        self._min = {c: np.full(n_pages, np.inf) for c in self.colonnes[1:]}
+        self._max = {c: np.full(n_pages, -np.inf) for c in self.colonnes[1:]}
+        self._somme = {c: np.zeros(n_pages) for c in self.colonnes[1:]}
+        self._compte = np.zeros(n_pages, dtype=np.int64)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.fermer()
+        else:
+            self._fichiers = None
+
+    def ajouter(self, **morceau):
+        """Ajoute un morceau de même longueur pour chaque colonne."""
+        t = np.asarray(morceau[self.colonnes[0]], dtype=float)
+        m = len(t)
+        if self.position + m > self.n:
+            raise ValueError(f"Trop d'échantillons : {self.position + m} pour {self.n} réservés")
+        if self.t0 is None and m:
+            self.t0 = float(t[0])
+        fin = self.position + m
+        pages = np.minimum(((t - self.t0) // self.duree_page).astype(np.int64), len(self._compte) - 1)
+        np.add.at(self._compte, pages, 1)
+        for c in self.colonnes:
+            v = np.asarray(morceau[c], dtype=float)
+            if len(v) != m:
+                raise ValueError(f"Colonne {c} : {len(v)} valeurs au lieu de {m}")
+            self._fichiers[c][self.position:fin] = v
+            if c != self.colonnes[0]:
+                np.minimum.at(self._min[c], pages, v)
+                np.maximum.at(self._max[c], pages, v)
+                np.add.at(self._somme[c], pages, v)
+        self.position = fin
+
+    def fermer(self, bilan=None):
+        """Vide les colonnes sur disque et écrit l'index ; retourne le chemin du dossier."""
+        if self._fichiers is None:
+            return self.dossier
+        if self.position != self.n:
+            raise ValueError(f"Enregistrement incomplet : {self.position} échantillons sur {self.n}")
+        t = self._fichiers[self.colonnes[0]]
+        for f in self._fichiers.values():
+            f.flush()
+        # Temps croissant : les pages sont contiguës, leurs bornes sont les effectifs cumulés
+        garder = self._compte > 0
+        bornes = [0] + np.cumsum(self._compte[garder]).tolist()
+        index = {
+            "version": VERSION,
+            "colonnes": list(self.colonnes),
+            "n": self.n,
+            "dt": self.dt,
+            "t_debut": float(t[0]),
+            "t_fin": float(t[-1]) + self.dt,
+            "duree_page": self.duree_page,
+            "bornes": bornes,
+            "agregats": {
+                c: {
+                    "min": self._min[c][garder].tolist(),
+                    "max": self._max[c][garder].tolist(),
+                    "somme": self._somme[c][garder].tolist(),
+                }
+                for c in self.colonnes[1:]
+            },
+            "bilan": asdict(bilan) if bilan is not None else None,
+            "meta": self.meta,
+        }
+        with open(os.path.join(self.dossier, INDEX), "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        self._fichiers = None
+        return self.dossier
+
+
+class Enregistrement:
+    """Lecture paresseuse d'un dossier écrit par Enregistreur (voir ouvrir)."""
+
+    def __init__(self, dossier, index):
+        self.dossier = dossier
+        self.index = index
+        self._colonnes = {}
+
+    def __len__(self):
+        return self.index["n"]
+
+    @property
+    def colonnes(self):
+        return tuple(self.index["colonnes"])
+
+    @property
+    def dt(self):
+        return self.index["dt"]
+
+    @property
+    def n_pages(self):
+        return len(self.index["bornes"]) - 1
+
+    @property
+    def bilan(self):
+        b = self.index.get("bilan")
+        return Bilan(**b) if b is not None else None
+
+    def colonne(self, nom):
+        """Colonne entière en lecture seule, mappée en mémoire (rien n'est lu avant l'accès)."""
+        if nom not in self._colonnes:
+            if nom not in self.colonnes:
+                raise KeyError(f"Colonne inconnue : {nom!r} (disponibles : {', '.join(self.colonnes)})")
+            self._colonnes[nom] = np.load(os.path.join(self.dossier, nom + ".npy"), mmap_mode="r")
+        return self._colonnes[nom]
+
+    def tranche(self, k):
+        """Indices des échantillons de la page k."""
+        if not -self.n_pages <= k < self.n_pages:
+            raise IndexError(f"Page {k} hors de [0, {self.n_pages})")
+        k %= self.n_pages
+        return slice(self.index["bornes"][k], self.index["bornes"][k + 1])
+
+    def page(self, k, colonnes=None):
+        """{colonne: vue des échantillons de la page k}."""
+        s = self.tranche(k)
+        return {c: self.colonne(c)[s] for c in (colonnes or self.colonnes)}
+
+    def page_dataframe(self, k, colonnes=None):
+        import pandas as pd
+        return pd.DataFrame({c: np.asarray(v) for c, v in self.page(k, colonnes).items()})
+
+    def pages(self, colonnes=None):
+        """Itère sur les pages, une seule en mémoire à la fois."""
+        for k in range(self.n_pages):
+            yield self.page(k, colonnes)
+
+    def agregats(self, nom):
+        """{min, max, moyenne, integrale} par page, lus dans l'index (integrale = somme x dt)."""
+        a = self.index["agregats"][nom]
+        n = np.diff(self.index["bornes"])
+        somme = np.asarray(a["somme"])
+        return {
+            "min": np.asarray(a["min"]),
+            "max": np.asarray(a["max"]),
+            "moyenne": somme / n,
+            "integrale": somme * self.dt,
+        }
+
+    def par_page(self, nom, fonction):
+        """fonction(valeurs de la page) pour chaque page, sans charger la série entière."""
+        return np.array([fonction(np.asarray(self.colonne(nom)[self.tranche(k)])) for k in range(self.n_pages)])
+
+
+def ouvrir(dossier):
+    """Ouvre un enregistrement : seul l'index est lu."""
+    with open(os.path.join(dossier, INDEX), encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != VERSION:
+        raise ValueError(f"Version d'enregistrement non prise en charge : {index.get('version')}")
+    return Enregistrement(dossier, index)
+
+
+def enregistrer(dossier, res, duree_page=86400.0, meta=None):
+    """Écrit les séries d'un Resultat ; retourne l'Enregistrement."""
+    if res.t is None or len(res.t) == 0:
+        raise ValueError("Résultat sans séries : rien à enregistrer")
+    dt = float(res.t[1] - res.t[0]) if len(res.t) > 1 else 1.0
+    with Enregistreur(dossier, len(res.t), dt, duree_page, meta=meta) as e:
+        e.ajouter(**{c: getattr(res, c) for c in COLONNES})
+        e.fermer(res.bilan)
+    return ouvrir(dossier)
+
+
+def enregistrer_flux(dossier, p, hour_volumes, n_jours=365, dt=10, duree_page=86400.0, meta=None, **options):
+    """
+    Simule n_jours avec annuel.simuler_flux et écrit les séries bloc par bloc :
+    seul le bloc courant (une semaine au plus) est en mémoire.
+    """
+    from .annuel import simuler_flux
+    options.setdefault("bloc", "semaine")
+    par_jour = len(np.arange(0, 86400, dt))
+    bilan = None
+    with Enregistreur(dossier, n_jours * par_jour, dt, duree_page, meta=meta) as e:
+        for b in simuler_flux(p, hour_volumes, n_jours=n_jours, dt=dt, series=True, **options):
+            e.ajouter(**{c: getattr(b, c) for c in COLONNES})
+            bilan = b.cumul
+        e.fermer(bilan)
+    return ouvrir(dossier)
@@ -0,0 +1,246 @@
+"""
+Ballon stratifié à N couches (modèle serpentin de main3_serp.py).
+
+Couches de même volume, numérotées du bas (0) vers le haut (N-1) :
+- l'eau froide entre en bas et l'eau chaude est soutirée en haut (advection amont) ;
+- le serpentin occupe les couches basses et échange U.S/n (T_prim - T_j) avec chacune,
+  borné par la puissance disponible (PAC, plus la chaudière en secours) ;
+- conduction effective entre couches voisines, pertes UA réparties, bouclage repris
+  sur la couche haute ;
+- mélange par flottabilité : une couche plus chaude que celle du dessus est mélangée
+  avec elle (moyennes adjacentes, énergie conservée).
+
+Chaque pas résout un système tridiagonal implicite (algorithme de Thomas), stable
+pour dt = 60 s et de coût linéaire en N. La régulation est celle de la boucle à pas
+fixe, pilotée par la température de la sonde.
+"""
+import math
+
+import numpy as np
+
+from .parametres import CP_WATER, OFF, RHO_WATER, STARTING, HEATING, puissance_tirage
+from .profils import ProfilTirage
+from .resultats import Bilan, Resultat
+
+
+def thomas(a, b, c, d):
+    """
+    Résout le système tridiagonal a_j x_{j-1} + b_j x_j + c_j x_{j+1} = d_j (listes).
+    Coût O(N), sans pivotage (matrice à diagonale dominante).
+    """
+    n = len(d)
+    cp = [0.0] * n
+    dp = [0.0] * n
+    cp[0] = c[0] / b[0]
+    dp[0] = d[0] / b[0]
+    for j in range(1, n):
+        m = b[j] - a[j] * cp[j - 1]
+        cp[j] = c[j] / m
+        dp[j] = (d[j] - a[j] * dp[j - 1]) / m
+    x = [0.0] * n
+    x[-1] = dp[-1]
+    for j in range(n - 2, -1, -1):
+        x[j] = dp[j] - cp[j] * x[j + 1]
+    return x
+
+
+def melanger(T):
+    """Supprime les inversions de température par moyennes de couches adjacentes (liste)."""
+    blocs = []  # [somme, nombre]
+    for v in T:
+        blocs.append([v, 1])
+        while len(blocs) > 1 and blocs[-2][0] / blocs[-2][1] > blocs[-1][0] / blocs[-1][1]:
+            s, k = blocs.pop()
+            blocs[-1][0] += s
+            blocs[-1][1] += k
+    sortie = []
+    for s, k in blocs:
+        sortie.extend([s / k] * k)
+    return sortie
+
+
+def simuler_stratifie(p, profil, dt=60, duree=86400, n_couches=50, hauteur_serpentin=0.3,
+                      hauteur_sonde=0.4, rapport_hd=2.5, k_eff=1.0, couches=True):
+    """
+    Simule le ballon stratifié ; le Resultat porte la T° de sonde dans T et, si couches,
+    le champ T_couches (pas, couches).
+
+    profil            : volumes horaires à 60°C (L/h), ou ProfilTirage (puisages) dont
+                        la puissance est moyennée sur chaque pas
+    hauteur_serpentin : fraction basse de la hauteur occupée par le serpentin
+    hauteur_sonde     : position relative de la sonde de régulation (0 = bas, 1 = haut)
+    rapport_hd        : rapport hauteur / diamètre de la cuve
+    k_eff             : conductivité effective verticale (W/m.K), eau + paroi + brassage
+    """
+    for res in iterer_stratifie(p, profil, dt, duree, n_couches, hauteur_serpentin,
+                                hauteur_sonde, rapport_hd, k_eff, couches):
+        pass
+    return res
+
+
+def iterer_stratifie(p, profil, dt=60, duree=86400, n_couches=50, hauteur_serpentin=0.3,
+                     hauteur_sonde=0.4, rapport_hd=2.5, k_eff=1.0, couches=True, pas_morceau=None):
+    """
+    Générateur de simuler_stratifie : un Resultat partiel (séries et bilan depuis t = 0)
+    toutes les pas_morceau secondes simulées, puis le Resultat complet.
+    Les séries partielles sont des vues des tableaux en cours de remplissage.
+    """
+    N = int(n_couches)
+    if N < 2:
+        raise ValueError("Il faut au moins 2 couches")
+    t_steps = int(duree / dt)
+    time_array = np.arange(0, t_steps * dt, dt)
+
+    V = p.V_ball / 1000
+    D = (4 * V / (math.pi * rapport_hd)) ** (1 / 3)
+    H = rapport_hd * D
+    section = math.pi * D * D / 4
+    G = k_eff * section / (H / N)                    # W/K entre couches voisines
+    mc = V / N * RHO_WATER * CP_WATER                 # J/K par couche
+    ua_j = p.ua_ballon / N
+    n_serp = max(1, min(N, round(hauteur_serpentin * N)))
+    us_j = p.us_global / n_serp
+    j_sonde = min(N - 1, int(hauteur_sonde * N))
+    P_pac_nom = p.P_pac_nom * 1000
+    P_chaud_nom = p.P_chaud_nom * 1000
+    P_bouclage = p.P_bouclage_kW * 1000
+    T_arret, T_seuil, T_ef, Tp = p.T_arret, p.T_seuil, p.T_eau_froide, p.T_prim
+    if isinstance(profil, ProfilTirage):
+        # Moyenne exacte sur le pas : un puisage plus court que dt garde son énergie
+        p_demandes = np.append(0.0, np.diff(profil.energie(time_array)) / dt).tolist()
+    else:
+        n_h = len(profil)
+        p_demandes = puissance_tirage(profil, T_ef)[(time_array / 3600 % n_h).astype(int)].tolist()
+
+    Tc = [float(p.T_init)] * N
+    T = np.zeros(t_steps)
+    P_pac_act = np.zeros(t_steps)
+    P_chaud_act = np.zeros(t_steps)
+    P_tirage_act = np.zeros(t_steps)
+    T_couches = np.zeros((t_steps, N)) if couches else None
+    T[0] = Tc[j_sonde]
+    if couches:
+        T_couches[0] = Tc
+
+    pac_state = OFF
+    wait_timer, chauffe_timer, time_since_stop = 0.0, 0.0, 9999.0
+    e_cuve = 0.0
+    s_ecrete = 0.0
+    demarrages = 0
+    transitions = 0
+    marche_prec = False
+
+    def resultat(n):
+        """Resultat des n premiers points (n - 1 pas intégrés, comme pour la journée entière)."""
+        bilan = Bilan(
+            e_th_pac=np.sum(P_pac_act[:n] * dt) / 3600000,
+            e_th_chaud=np.sum(P_chaud_act[:n] * dt) / 3600000,
+            e_tirage=np.sum(P_tirage_act[:n] * dt) / 3600000,
+            e_pertes_cuve=e_cuve / 3600000,
+            e_bouclage=P_bouclage * (n - 1) * dt / 3600000,     # n - 1 pas intégrés
+            e_stockee=mc * (sum(Tc) - N * p.T_init) / 3600000,
+            e_ecretee=mc * s_ecrete / 3600000,
+            demarrages=int(demarrages),
+            temps_marche_pac=np.sum(P_pac_act[:n] > 0) * dt,
+            temps_marche_chaud=np.sum(P_chaud_act[:n] > 0) * dt,
+            T_min=float(T[:n].min()),
+            T_max=float(T[:n].max()),
+            T_final=float(T[n - 1]),
+            duree=n * dt,
+        )
+        return Resultat(time_array[:n], T[:n], P_pac_act[:n], P_chaud_act[:n], P_tirage_act[:n], bilan,
+                        T_couches=T_couches[:n] if couches else None,
+                        compteurs={"iterations": n - 1, "transitions": transitions})
+
+    n_morceau = int(pas_morceau // dt) if pas_morceau else 0
+    for i in range(1, t_steps):
+        Ts = Tc[j_sonde]
+        p_demande = p_demandes[i]
+
+        # Régulation (sonde)
+        pac_on, chaud_on = False, False
+        if pac_state == OFF:
+            time_since_stop += dt
+            if Ts <= T_seuil and time_since_stop >= (p.t_anti_cycle_min * 60):
+                pac_state = STARTING
+                wait_timer, chauffe_timer = 0.0, 0.0
+                transitions += 1
+        elif pac_state == STARTING:
+            wait_timer += dt
+            chauffe_timer += dt
+            chaud_on = chauffe_timer > (p.t_secours_min * 60)
+            if wait_timer >= (p.t_delay_min * 60):
+                pac_state = HEATING
+                transitions += 1
+        elif pac_state == HEATING:
+            if Ts >= T_arret:
+                pac_state = OFF
+                time_since_stop = 0.0
+                transitions += 1
+            else:
+                pac_on = True
+                chauffe_timer += dt
+                chaud_on = chauffe_timer > (p.t_secours_min * 60)
+
+        # Débit soutiré (mitigeur : l'énergie demandée fixe le débit à la T° de sortie)
+        m_dot = p_demande / (CP_WATER * max(Tc[-1] - T_ef, 1.0))
+        adv = m_dot * CP_WATER
+
+        # Serpentin : implicite tant que l'échange reste sous la puissance disponible
+        P_dispo = (P_pac_nom if pac_on else 0.0) + (P_chaud_nom if chaud_on else 0.0)
+        echange_libre = sum(us_j * max(Tp - Tc[j], 0.0) for j in range(n_serp))
+        implicite = P_dispo > 0 and echange_libre <= P_dispo
+        sources = [0.0] * N
+        if P_dispo > 0 and not implicite:
+            for j in range(n_serp):
+                sources[j] = P_dispo * us_j * max(Tp - Tc[j], 0.0) / echange_libre
+        sources[-1] -= P_bouclage
+
+        a = [0.0] * N
+        b = [0.0] * N
+        c = [0.0] * N
+        d = [0.0] * N
+        for j in range(N):
+            bj = mc / dt + ua_j + adv
+            dj = mc / dt * Tc[j] + ua_j * p.T_amb + sources[j]
+            if j > 0:
+                a[j] = -(G + adv)
+                bj += G
+            else:
+                dj += adv * T_ef
+            if j < N - 1:
+                c[j] = -G
+                bj += G
+            if implicite and j < n_serp and Tc[j] < Tp:
+                bj += us_j
+                dj += us_j * Tp
+            b[j] = bj
+            d[j] = dj
+        Tsol = thomas(a, b, c, d)
+
+        # Puissances effectives du pas (sur la solution implicite, avant mélange)
+        if implicite:
+            p_echange = sum(us_j * (Tp - Tsol[j]) for j in range(n_serp) if Tc[j] < Tp)
+        else:
+            p_echange = P_dispo
+        p_pac = min(P_pac_nom, p_echange) if pac_on else 0.0
+        p_chaud = max(0.0, p_echange - p_pac) if chaud_on else 0.0
+        p_tirage = adv * (Tsol[-1] - T_ef)
+        e_cuve += sum(ua_j * (v - p.T_amb) for v in Tsol) * dt
+
+        T_melange = melanger(Tsol)
+        Tn = [max(T_ef, v) for v in T_melange]
+        s_ecrete += sum(Tn) - sum(T_melange)
+
+        Tc = Tn
+        T[i] = Tc[j_sonde]
+        P_pac_act[i], P_chaud_act[i], P_tirage_act[i] = p_pac, p_chaud, p_tirage
+        if couches:
+            T_couches[i] = Tc
+        marche = p_pac > 0
+        demarrages += marche and not marche_prec
+        marche_prec = marche
+        if n_morceau and (i + 1) % n_morceau == 0 and i + 1 < t_steps:
+            yield resultat(i + 1)
+
+    yield resultat(t_steps)
@@ -0,0 +1,109 @@
+"""
+Simulation en tâche de fond, pour ne pas bloquer le script Streamlit.
+
+Une TacheSimulation consomme dans un thread un générateur de Resultat partiels
+(ex. stratifie.iterer_stratifie avec pas_morceau) : le script lit à chaque rerun la
+progression et le dernier Resultat partiel, qu'il affiche aussitôt. L'annulation est
+coopérative : elle est prise en compte entre deux morceaux, le générateur est alors
+refermé. Une tâche est repérée par la clé de ses entrées ; quand les entrées
+changent, l'application annule la tâche en cours et en lance une nouvelle.
+"""
+import threading
+
+
+class TacheSimulation:
+    """
+    cle       : empreinte des entrées (cle_stable), pour reconnaître une tâche périmée
+    morceaux  : générateur de Resultat partiels, le dernier étant le Resultat complet
+    duree     : durée simulée totale (s), pour la progression
+    """
+
+    def __init__(self, cle, morceaux, duree):
+        self.cle = cle
+        self.duree = float(duree)
+        self._morceaux = morceaux
+        self._annulation = threading.Event()
+        # Protège le dernier morceau, son numéro et la fin : attendre ne peut manquer un morceau
+        self._condition = threading.Condition()
+        self._partiel = None
+        self._numero = 0          # morceaux reçus
+        self._vu = 0              # numéro du dernier morceau rendu par attendre
+        self._resultat = None
+        self.erreur = None
+        self._fini = False
+        self._arret = False
+        self._thread = threading.Thread(target=self._executer, name=f"simulation-{cle[:8]}", daemon=True)
+
+    def demarrer(self):
+        self._thread.start()
+        return self
+
+    def _executer(self):
+        try:
+            for res in self._morceaux:
+                with self._condition:
+                    self._partiel = res
+                    self._numero += 1
+                    self._condition.notify_all()
+                if self._annulation.is_set():
+                    break
+            else:
+                # Le Resultat complet est publié avec la fin : jamais un morceau antérieur
+                with self._condition:
+                    self._resultat = self._partiel
+                    self._fini = True
+        except Exception as e:
+            self.erreur = e
+        finally:
+            self._morceaux.close()
+            with self._condition:
+                self._arret = True
+                self._condition.notify_all()
+
+    def annuler(self, attente=None):
+        """Demande l'arrêt au prochain morceau ; attend la fin du thread au plus `attente` s."""
+        self._annulation.set()
+        if attente is not None:
+            self._thread.join(attente)
+
+    @property
+    def annulee(self):
+        return self._annulation.is_set()
+
+    @property
+    def en_cours(self):
+        return self._thread.is_alive()
+
+    @property
+    def terminee(self):
+        """Simulation menée à son terme (ni annulée, ni en erreur)."""
+        return self._fini and not self.en_cours
+
+    @property
+    def resultat(self):
+        """Resultat complet, None tant que la simulation n'est pas menée à son terme."""
+        with self._condition:
+            return self._resultat
+
+    @property
+    def partiel(self):
+        """Dernier Resultat reçu (None avant le premier morceau)."""
+        with self._condition:
+            return self._partiel
+
+    @property
+    def progression(self):
+        with self._condition:
+            res, fini = self._partiel, self._fini
+        if fini:
+            return 1.0
+        if res is None or self.duree <= 0:
+            return 0.0
+        return min(res.bilan.duree / self.duree, 1.0)
+
+    def attendre(self, delai):
+        """Attend un morceau non encore rendu (ou la fin) au plus `delai` s ; retourne le dernier Resultat."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._numero != self._vu or self._arret, delai)
+            self._vu = self._numero
+            return self._partiel
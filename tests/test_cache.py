@@ -0,0 +1,34 @@
+"""
+Cache des résultats : `cle in cache` répond comme obtenir, niveaux et péremption compris.
+"""
+import time
+
+from simu_ecs import CacheResultats, Parametres, ProfilTirage, cle_stable
+
+
+def test_cle_stable():
+    assert cle_stable(Parametres(), [1.0, 2.0]) == cle_stable(Parametres(), [1.0, 2.0])
+    assert cle_stable(Parametres()) != cle_stable(Parametres(V_ball=500.0))
+    profil = ProfilTirage([0.0, 3600.0], [0.0, 5000.0], 86400.0)
+    assert cle_stable(profil) == cle_stable(ProfilTirage([0.0, 3600.0], [0.0, 5000.0], 86400.0))
+    assert cle_stable(profil) != cle_stable(ProfilTirage([0.0, 3600.0], [0.0, 5000.0]))
+
+
+def test_appartenance_niveau_disque(tmp_path):
+    CacheResultats(dossier=str(tmp_path)).mettre("a", 1)
+    cache = CacheResultats(dossier=str(tmp_path))
+    assert "a" in cache and "b" not in cache
+    assert cache.misses == cache.hits == 0
+    assert cache.obtenir("a") == 1
+    assert cache.hits == 1 and cache.hits_disque == 0      # remontée en mémoire par `in`
+
+
+def test_appartenance_perimee(tmp_path, monkeypatch):
+    cache = CacheResultats(age_max=60, dossier=str(tmp_path))
+    cache.mettre("a", 1)
+    assert "a" in cache
+    plus_tard = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: plus_tard)
+    assert "a" not in cache
+    assert cache.obtenir("a") is None
+    assert not list(tmp_path.iterdir())
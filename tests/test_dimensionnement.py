@@ -0,0 +1,60 @@
+"""
+Dimensionnement et front de Pareto : profil de puisages et carte de performances transmis au moteur.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import CacheResultats, CartePAC, Parametres, PerformancesPAC, Puisages
+from simu_ecs.dimensionnement import Contraintes, dimensionner, evaluer
+from simu_ecs.pareto import explorer
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+CONTRAINTES = Contraintes(part_chaudiere_max=10.0, T_min=45.0, demarrages_h_max=3)
+
+
+def _carte(p, facteur):
+    """Carte plate : puissance nominale × facteur et COP moyen, quelles que soient les T°."""
+    return PerformancesPAC(CartePAC([-10.0, 30.0], [20.0, 70.0], np.full(4, p.cop_moyen),
+                                    np.full(4, p.P_pac_nom * facteur)), [7.0])
+
+
+def test_carte_nominale_sans_effet():
+    p = Parametres(modele="serpentin")
+    sans = evaluer(p, HOUR_VOLUMES, CONTRAINTES)
+    avec = evaluer(p, HOUR_VOLUMES, CONTRAINTES, performances=_carte(p, 1.0))
+    assert avec.bilan.e_th_pac == pytest.approx(sans.bilan.e_th_pac, rel=1e-9)
+    assert avec.ecarts == pytest.approx(sans.ecarts)
+
+
+def test_carte_et_puisages_transmis():
+    p = Parametres(modele="pac_fixe")
+    cache = CacheResultats()
+    nominal = dimensionner(p, HOUR_VOLUMES, "V_ball", CONTRAINTES, cache=cache)
+    reduite = dimensionner(p, HOUR_VOLUMES, "V_ball", CONTRAINTES, cache=cache, performances=_carte(p, 0.9))
+    # Clés distinctes : aucune évaluation de la carte lue dans le cache de la puissance nominale
+    assert cache.hits == 0
+    # PAC 10 % sous sa puissance nominale : la part chaudière n'est tenue à aucun volume
+    assert nominal.faisable and not reduite.faisable
+    assert reduite.evaluation.bilan.part_chaudiere > CONTRAINTES.part_chaudiere_max
+    # Le profil de puisages est celui simulé, jusque dans les clés du cache
+    profil = Puisages(debuts=[7 * 3600.0, 19 * 3600.0], durees=900.0, debits=12.0, T_livree=45.0).profil(p.T_eau_froide)
+    dim = dimensionner(p, profil, "V_ball", CONTRAINTES, cache=cache)
+    assert cache.hits == 0
+    for ev in dim.evaluations:
+        assert ev.bilan.e_tirage == pytest.approx(profil.energie(86400.0) / 3.6e6, rel=1e-9)
+
+
+def test_front_sur_le_profil_et_la_carte():
+    p = Parametres(modele="pac_fixe")
+    profil = Puisages(debuts=[7 * 3600.0, 19 * 3600.0], durees=900.0, debits=12.0, T_livree=45.0).profil(p.T_eau_froide)
+    options = dict(variables=("V_ball",), n_evaluations=8, cache=CacheResultats())
+    horaire = explorer(p, HOUR_VOLUMES, **options)
+    puisages = explorer(p, profil, **options)
+    carte = explorer(p, HOUR_VOLUMES, performances=_carte(p, 0.9), **options)
+    # Mêmes volumes tirés (même graine), évalués sur le profil et la carte de chaque exploration
+    assert options["cache"].hits == 0
+    for autre in (puisages, carte):
+        assert [pt.valeurs for pt in autre.points] == [pt.valeurs for pt in horaire.points]
+    assert all(a.e_th_chaud != b.e_th_chaud for a, b in zip(puisages.points, horaire.points))
+    assert all(a.e_th_chaud > b.e_th_chaud for a, b in zip(carte.points, horaire.points))
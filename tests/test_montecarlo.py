@@ -0,0 +1,52 @@
+"""
+Monte Carlo : journées tirées autour d'un profil horaire ou d'un cycle de puisages.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import CartePAC, Parametres, PerformancesPAC, ProfilTirage, Puisages
+from simu_ecs.montecarlo import Alea, profil_aleatoire, simuler_monte_carlo
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+PUISAGES = Puisages(debuts=np.array([7 * 3600.0, 7.5 * 3600, 19 * 3600, 23.9 * 3600]),
+                    durees=np.array([300.0, 600.0, 900.0, 1200.0]), debits=np.array([8.0, 10.0, 9.0, 6.0]),
+                    T_livree=np.array([40.0, 45.0, 42.0, 40.0]))
+
+
+@pytest.mark.parametrize("source", ["horaire", "puisages"])
+def test_sans_alea_profil_inchange(source):
+    profil = ProfilTirage.horaire(HOUR_VOLUMES, 10.0) if source == "horaire" else PUISAGES.profil(10.0)
+    jour = profil_aleatoire(np.random.default_rng(0), profil, 10.0, Alea(0.0, 0.0, 0.0))
+    t = np.linspace(0.0, 86400.0, 10001)[:-1]
+    np.testing.assert_allclose(jour.valeurs(t), profil.valeurs(t), atol=1e-9)
+
+
+def test_energie_suit_le_facteur_de_volume():
+    # Sans bruit horaire, le décalage conserve l'énergie du jour, mise à l'échelle du seul facteur de volume
+    profil = PUISAGES.profil(10.0)
+    alea = Alea(0.3, 0.0, 45.0)
+    jour = profil_aleatoire(np.random.default_rng(1), profil, 10.0, alea)
+    facteur = profil_aleatoire(np.random.default_rng(1), ProfilTirage([0.0], [1.0], 86400.0), 10.0, alea).puissances[0]
+    assert jour.energie(86400.0) == pytest.approx(facteur * profil.energie(86400.0), rel=1e-9)
+
+
+def test_monte_carlo_puisages():
+    profil = PUISAGES.profil(Parametres().T_eau_froide)
+    mc = simuler_monte_carlo(Parametres(modele="serpentin"), profil, 64, graine=3, processus=1)
+    nominal = profil.energie(86400.0) / 3.6e6
+    assert len(mc) == 64
+    assert np.median(mc.valeurs("e_tirage")) == pytest.approx(nominal, rel=0.2)
+    with pytest.raises(ValueError):
+        simuler_monte_carlo(Parametres(), ProfilTirage([0.0], [1000.0]), 4, processus=1)
+
+
+def test_carte_transmise_aux_jours():
+    p = Parametres(modele="echangeur")
+    sans = simuler_monte_carlo(p, HOUR_VOLUMES, 16, graine=5, processus=1)
+    carte = CartePAC([-10.0, 30.0], [20.0, 70.0], np.full(4, p.cop_moyen), np.full(4, p.P_pac_nom))
+    nominale = simuler_monte_carlo(p, HOUR_VOLUMES, 16, graine=5, processus=1, performances=PerformancesPAC(carte, [7.0]))
+    np.testing.assert_allclose(nominale.valeurs("e_th_pac"), sans.valeurs("e_th_pac"), rtol=1e-9)
+    carte = CartePAC([-10.0, 30.0], [20.0, 70.0], np.full(4, p.cop_moyen), np.full(4, p.P_pac_nom * 0.7))
+    reduite = simuler_monte_carlo(p, HOUR_VOLUMES, 16, graine=5, processus=1, performances=PerformancesPAC(carte, [7.0]))
+    assert np.all(reduite.valeurs("e_th_chaud") > sans.valeurs("e_th_chaud"))
@@ -0,0 +1,70 @@
+"""
+Moteurs du ballon mélangé comparés à la boucle à pas fixe (reference.py), et fermeture
+du bilan : le résidu est l'énergie ajoutée par la butée à l'eau froide, rien d'autre.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import MODELES, Parametres, simuler, simuler_lot, simuler_pas_fixe, simuler_stratifie
+from simu_ecs.bench import _indicateurs, _tolerance
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+# Petit ballon sans chaudière sous un fort tirage : la T° bute sur l'eau froide
+ECRETAGE = dict(V_ball=300.0, P_pac_nom=5.0, P_chaud_nom=0.0)
+HOUR_VOLUMES_FORTS = HOUR_VOLUMES * 2
+
+
+@pytest.fixture(scope="module")
+def references():
+    """Boucle à pas fixe dt = 1 s, un jour, par modèle."""
+    return {m: simuler_pas_fixe(Parametres(modele=m), HOUR_VOLUMES, 1, 86400) for m in MODELES}
+
+
+@pytest.mark.parametrize("modele", MODELES)
+def test_evenements_proche_pas_fixe_1s(modele, references):
+    # Moteur exact (limite dt -> 0) contre la boucle à 1 s, aux tolérances du banc
+    ref = _indicateurs(references[modele].bilan)
+    res = _indicateurs(simuler(Parametres(modele=modele), HOUR_VOLUMES, duree=86400.0).bilan)
+    for indicateur, valeur in res.items():
+        assert abs(valeur - ref[indicateur]) <= _tolerance(indicateur, ref, 1), indicateur
+
+
+@pytest.mark.parametrize("modele", MODELES)
+def test_evenements_series_suivent_pas_fixe(modele, references):
+    ref = references[modele]
+    res = simuler(Parametres(modele=modele), HOUR_VOLUMES, duree=86400.0, t_sortie=ref.t)
+    assert res.T[0] == ref.T[0]
+    # Un cycle décalé de quelques secondes écarte localement les courbes, pas leur moyenne
+    assert abs(np.mean(res.T) - np.mean(ref.T)) < 0.05
+
+
+@pytest.mark.parametrize("modele", MODELES)
+def test_lot_identique_pas_fixe(modele):
+    # Même schéma voie par voie : le lot reproduit la boucle à l'arrondi près, voie par voie
+    p = Parametres(modele=modele)
+    lot = simuler_lot(p, {"V_ball": np.array([p.V_ball, 500.0])}, HOUR_VOLUMES, 5, 86400)
+    refs = [simuler_pas_fixe(Parametres(modele=modele, V_ball=v), HOUR_VOLUMES, 5, 86400) for v in (p.V_ball, 500.0)]
+    for k, ref in enumerate(refs):
+        b = lot.scenario(k)
+        assert b.demarrages == ref.bilan.demarrages
+        for nom in ("e_th_pac", "e_th_chaud", "e_tirage", "e_pertes_cuve", "e_bouclage", "T_final", "T_min"):
+            assert getattr(b, nom) == pytest.approx(getattr(ref.bilan, nom), rel=1e-9, abs=1e-9), nom
+
+
+@pytest.mark.parametrize("modele", MODELES)
+@pytest.mark.parametrize("hour_volumes, options", [(HOUR_VOLUMES, {}), (HOUR_VOLUMES_FORTS, ECRETAGE)],
+                         ids=["normal", "ecretage"])
+def test_residu_egal_ecretage(modele, hour_volumes, options):
+    p = Parametres(modele=modele, **options)
+    bilans = [
+        simuler_pas_fixe(p, hour_volumes, 10, 86400).bilan,
+        simuler(p, hour_volumes, duree=86400.0).bilan,
+        simuler_stratifie(p, hour_volumes, 60, 86400, n_couches=10, couches=False).bilan,
+    ]
+    lot = simuler_lot(p, {"V_ball": np.array([p.V_ball, 2 * p.V_ball])}, hour_volumes, 10, 86400)
+    bilans += [lot.scenario(k) for k in range(len(lot))]
+    if options:
+        assert bilans[0].e_ecretee > 1.0
+    for b in bilans:
+        assert b.residu == pytest.approx(b.e_ecretee, abs=1e-8)
@@ -0,0 +1,53 @@
+"""
+Régime périodique : l'état trouvé est ramené à lui-même par son cycle, indépendamment
+du point de départ, et le bilan est rapporté à une période moyenne.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import EtatSimulation, Parametres, simuler
+from simu_ecs.periodique import _meme_etat, regime_periodique
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+
+
+def _retour(p, regime, tol_T=1e-3):
+    """Le cycle simulé depuis regime.etat revient à regime.etat."""
+    fin = simuler(p, HOUR_VOLUMES, duree=regime.n_cycle * 86400.0, etat=regime.etat).etat_final
+    return _meme_etat(regime.etat, fin, p, tol_T, 1.0)
+
+
+@pytest.mark.parametrize("options", [dict(modele="serpentin"), dict(modele="pac_fixe", V_ball=500.0)],
+                         ids=["serpentin", "pac_fixe"])
+def test_regime_journalier(options):
+    p = Parametres(**options)
+    regime = regime_periodique(p, HOUR_VOLUMES)
+    assert regime.converge and regime.n_cycle == 1
+    assert _retour(p, regime)
+    assert regime.bilan == regime.resultat.bilan
+    # Même régime depuis un ballon froid ou chaud
+    for T in (20.0, 65.0):
+        autre = regime_periodique(p, HOUR_VOLUMES, etat=EtatSimulation(T=T))
+        assert autre.n_cycle == 1
+        assert autre.bilan.e_th_pac == pytest.approx(regime.bilan.e_th_pac, abs=0.05)
+        assert autre.etat.T == pytest.approx(regime.etat.T, abs=0.05)
+
+
+def test_cycle_de_plusieurs_periodes():
+    # PAC à puissance fixe : la relance a lieu un jour sur deux
+    p = Parametres(modele="pac_fixe")
+    regime = regime_periodique(p, HOUR_VOLUMES)
+    assert regime.converge and regime.n_cycle == 2
+    assert _retour(p, regime)
+    b, cycle = regime.bilan, regime.resultat.bilan
+    assert b.e_th_pac == pytest.approx(cycle.e_th_pac / 2)
+    assert b.demarrages == pytest.approx(cycle.demarrages / 2)
+    assert b.T_min == cycle.T_min
+
+
+def test_quasi_periodique_pas_de_cycle_long():
+    # Dérive lente d'un gros ballon : meilleur retour approché, pas un cycle de plusieurs semaines
+    regime = regime_periodique(Parametres(modele="echangeur", V_ball=1000), HOUR_VOLUMES)
+    assert not regime.converge
+    assert regime.n_cycle <= 7
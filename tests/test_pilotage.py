@@ -0,0 +1,41 @@
+"""
+Pilotage optimisé : la programmation dynamique suit le moteur, carte de performances comprise.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import CartePAC, Parametres, PerformancesPAC
+from simu_ecs.pilotage import cout_simulation, optimiser
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+HEURES = np.arange(24)
+TARIF = np.where((HEURES >= 22) | (HEURES < 6), 0.15, 0.25)
+PV = np.where((HEURES >= 10) & (HEURES < 16), 2.0, 0.0)
+
+
+def _carte(p, cop, puissance):
+    return CartePAC([-10.0, 30.0], [20.0, 70.0], np.asarray(cop, dtype=float), np.asarray(puissance, dtype=float))
+
+
+def test_carte_nominale_sans_effet():
+    p = Parametres(modele="pac_fixe")
+    sans = optimiser(p, HOUR_VOLUMES, TARIF, PV)
+    plate = PerformancesPAC(_carte(p, np.full(4, p.cop_moyen), np.full(4, p.P_pac_nom)), [7.0])
+    avec = optimiser(p, HOUR_VOLUMES, TARIF, PV, performances=plate)
+    assert avec.cout == pytest.approx(sans.cout, rel=1e-9)
+    assert avec.cout_hysteresis == pytest.approx(sans.cout_hysteresis, rel=1e-9)
+
+
+@pytest.mark.parametrize("modele", ["pac_fixe", "serpentin"])
+def test_carte_prevu_egal_rejeu(modele):
+    # Puissance et COP variables d'heure en heure : le coût prévu est celui du rejeu avec la carte
+    p = Parametres(modele=modele)
+    T_ext = 7 + 6 * np.sin((HEURES - 9) / 24 * 2 * np.pi)
+    carte = PerformancesPAC(_carte(p, [2.0, 1.5, 4.5, 3.2], np.array([0.7, 0.6, 1.3, 1.1]) * p.P_pac_nom), T_ext)
+    pilotage = optimiser(p, HOUR_VOLUMES, TARIF, PV, performances=carte)
+    assert pilotage.cout_prevu == pytest.approx(pilotage.cout_programme, rel=1e-3)
+    assert pilotage.cout <= pilotage.cout_hysteresis
+    assert pilotage.cout_hysteresis == pytest.approx(
+        cout_simulation(p, HOUR_VOLUMES, TARIF, PV, performances=carte), rel=1e-12)
+    assert pilotage.cout_hysteresis != pytest.approx(cout_simulation(p, HOUR_VOLUMES, TARIF, PV), rel=1e-3)
@@ -0,0 +1,78 @@
+"""
+Re-simulation incrémentale : après une retouche du profil, le résultat assemblé depuis
+les points de reprise est celui d'une simulation complète, et seules les tranches
+postérieures à la retouche sont recalculées.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import EtatSimulation, MODELES, Parametres, simuler
+from simu_ecs.reprise import SimulationIncrementale
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+SERIES = ("T", "P_pac", "P_chaud", "P_tirage")
+CUMULS = ("e_th_pac", "e_th_chaud", "e_tirage", "e_pertes_cuve", "e_bouclage", "e_stockee", "e_ecretee",
+          "temps_marche_pac", "temps_marche_chaud", "T_min", "T_max", "T_final")
+
+
+def _comparer(inc, res_inc, p, hour_volumes, etat=None):
+    complet = simuler(p, hour_volumes, duree=inc.duree, t_sortie=inc.t, etat=etat)
+    for c in SERIES:
+        np.testing.assert_allclose(getattr(res_inc, c), getattr(complet, c), rtol=1e-9, atol=1e-6, err_msg=c)
+    assert res_inc.bilan.demarrages == complet.bilan.demarrages
+    for nom in CUMULS:
+        assert getattr(res_inc.bilan, nom) == pytest.approx(getattr(complet.bilan, nom), rel=1e-9, abs=1e-9), nom
+    assert res_inc.etat_final.pac_state == complet.etat_final.pac_state
+    assert res_inc.etat_final.T == pytest.approx(complet.etat_final.T, abs=1e-9)
+
+
+@pytest.mark.parametrize("modele", MODELES)
+def test_retouche_egale_simulation_complete(modele):
+    p = Parametres(modele=modele)
+    inc = SimulationIncrementale(p, dt=10)
+    _comparer(inc, inc.calculer(HOUR_VOLUMES), p, HOUR_VOLUMES)
+    assert inc.tranches_recalculees == 24
+
+    retouche = HOUR_VOLUMES.copy()
+    retouche[18] *= 2
+    res = inc.calculer(retouche)
+    assert inc.tranches_recalculees == 24 - 18
+    _comparer(inc, res, p, retouche)
+
+
+def test_profil_inchange_ne_recalcule_rien():
+    p = Parametres()
+    inc = SimulationIncrementale(p, dt=60)
+    premier = inc.calculer(HOUR_VOLUMES)
+    second = inc.calculer(HOUR_VOLUMES.copy())
+    assert inc.tranches_recalculees == 0
+    assert second.bilan == premier.bilan
+    np.testing.assert_array_equal(second.T, premier.T)
+
+
+def test_retouches_successives_et_retour():
+    # Chaque retouche part du profil d'origine : y revenir ne recalcule que depuis la dernière (21h)
+    p = Parametres(modele="serpentin")
+    inc = SimulationIncrementale(p, dt=60)
+    origine = inc.calculer(HOUR_VOLUMES)
+    for h, facteur in ((20, 0.5), (7, 1.5), (21, 3.0)):
+        retouche = HOUR_VOLUMES.copy()
+        retouche[h] *= facteur
+        _comparer(inc, inc.calculer(retouche), p, retouche)
+    retour = inc.calculer(HOUR_VOLUMES)
+    assert inc.tranches_recalculees == 24 - 21
+    np.testing.assert_allclose(retour.T, origine.T, rtol=1e-12)
+
+
+def test_etat_initial_et_compatibilite():
+    p = Parametres(modele="echangeur")
+    etat = EtatSimulation(T=48.0, pac_state="OFF", time_since_stop=120.0)
+    inc = SimulationIncrementale(p, dt=30, etat=etat)
+    retouche = HOUR_VOLUMES.copy()
+    retouche[12] += 100
+    inc.calculer(HOUR_VOLUMES)
+    _comparer(inc, inc.calculer(retouche), p, retouche, etat=etat)
+    assert inc.compatible(p, 30, 86400, etat=etat)
+    assert not inc.compatible(p, 30, 86400)
+    assert not inc.compatible(Parametres(modele="echangeur", V_ball=p.V_ball + 100), 30, 86400, etat=etat)
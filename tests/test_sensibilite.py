@@ -0,0 +1,27 @@
+"""
+Analyse de sensibilité : entrées refusées avant toute simulation.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import Parametres
+from simu_ecs.cli import main
+from simu_ecs.sensibilite import morris, simuler_plan, sobol
+
+
+@pytest.mark.parametrize("analyse", [morris, sobol])
+def test_volume_jour_sans_profil_refuse(analyse):
+    with pytest.raises(ValueError, match="volume_jour"):
+        analyse(Parametres(), np.zeros(24), {"volume_jour": (500.0, 2000.0)})
+    with pytest.raises(ValueError, match="volume_jour"):
+        simuler_plan(Parametres(), np.zeros(24), {"volume_jour": (500.0, 2000.0)}, np.full((2, 1), 0.5))
+
+
+def test_plage_en_double_refusee(tmp_path, capsys):
+    scenario = tmp_path / "site.toml"
+    scenario.write_text('[[scenario]]\nnom = "base"\n')
+    code = main(["sensibilite", str(scenario), "--plage", "ua_ballon=0.5:3", "--plage", "ua_ballon=1:2",
+                 "-n", "4", "--sortie", str(tmp_path / "sortie")])
+    assert code == 2
+    assert "ua_ballon" in capsys.readouterr().err
+    assert not (tmp_path / "sortie").exists()
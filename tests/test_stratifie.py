@@ -0,0 +1,37 @@
+"""
+Ballon stratifié : résultats partiels du générateur, fermeture du bilan, cas limites.
+"""
+import numpy as np
+import pytest
+
+from simu_ecs import Parametres, simuler_stratifie
+from simu_ecs.scenarios import REPARTITION_DEFAUT
+from simu_ecs.stratifie import iterer_stratifie
+
+HOUR_VOLUMES = np.asarray(REPARTITION_DEFAUT, dtype=float) / 100 * 1500
+
+
+def test_morceaux_egaux_simulations_courtes():
+    # Le Resultat partiel à t est celui d'une simulation de durée t ; le dernier, la journée
+    p = Parametres(modele="serpentin")
+    morceaux = list(iterer_stratifie(p, HOUR_VOLUMES, 60, 86400, n_couches=10, pas_morceau=6 * 3600))
+    assert len(morceaux) == 4
+    for n, morceau in enumerate(morceaux[:-1], start=1):
+        court = simuler_stratifie(p, HOUR_VOLUMES, 60, n * 6 * 3600, n_couches=10)
+        assert morceau.bilan == court.bilan
+        np.testing.assert_array_equal(morceau.T, court.T)
+        np.testing.assert_array_equal(morceau.T_couches, court.T_couches)
+    complet = simuler_stratifie(p, HOUR_VOLUMES, 60, 86400, n_couches=10)
+    assert morceaux[-1].bilan == complet.bilan
+    np.testing.assert_array_equal(morceaux[-1].T, complet.T)
+
+
+def test_bilan_ferme():
+    res = simuler_stratifie(Parametres(modele="serpentin"), HOUR_VOLUMES, 60, 86400, n_couches=20)
+    assert res.T_couches.shape == (1440, 20)
+    assert res.bilan.residu == pytest.approx(res.bilan.e_ecretee, abs=1e-8)
+
+
+def test_une_couche_refusee():
+    with pytest.raises(ValueError):
+        simuler_stratifie(Parametres(), HOUR_VOLUMES, n_couches=1)
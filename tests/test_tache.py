@@ -0,0 +1,36 @@
+"""
+Tâche de fond : aucun morceau manqué par attendre, Resultat complet publié avec la fin.
+"""
+import threading
+
+from simu_ecs.tache import TacheSimulation
+
+
+def _morceaux(n, relais):
+    for i in range(n):
+        relais.wait(5)
+        relais.clear()
+        yield i
+
+
+def test_attendre_rend_chaque_morceau_et_le_resultat_final():
+    relais = threading.Event()
+    tache = TacheSimulation("0123456789", _morceaux(5, relais), 5).demarrer()
+    for i in range(5):
+        relais.set()
+        assert tache.attendre(5) == i
+    tache._thread.join(5)
+    assert tache.terminee and tache.resultat == 4 and tache.progression == 1.0
+    # Plus rien à attendre : retour immédiat sur le dernier morceau
+    assert tache.attendre(5) == 4
+
+
+def test_annulation_sans_resultat():
+    relais = threading.Event()
+    tache = TacheSimulation("0123456789", _morceaux(5, relais), 5).demarrer()
+    relais.set()
+    assert tache.attendre(5) == 0
+    tache.annuler()
+    relais.set()
+    tache._thread.join(5)
+    assert not tache.terminee and tache.resultat is None